@@ -0,0 +1 @@
+"""Offline benchmarks of the client, run against a local mock of the api"""
@@ -0,0 +1,374 @@
+"""
+Local mock of the BigDataCloud API, emulating every endpoint of `config.MODES_AND_PARAMS`
+with realistic payloads, configurable latency and error injection
+
+    python -m benchmarks.mockserver --port 8080 --latency 0.02 --error-rate 0.01
+
+then point a client at it with `client.API_BASE_URL = 'http://127.0.0.1:8080/data'`
+"""
+
+import json, time, random, argparse, threading
+from urllib.parse import urlsplit, parse_qsl
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from bigdatacloud.config import MODES_AND_PARAMS
+
+
+CITIES = [
+    ('IE', 'IRL', 372, 'Ireland', 'Europe', 'EU', 'Leinster', 'IE-L', 'Dublin', 'D02', 53.3498, -6.2603, 'Europe/Dublin', 'EUR', '353'),
+    ('GB', 'GBR', 826, 'United Kingdom of Great Britain and Northern Ireland (the)', 'Europe', 'EU', 'England', 'GB-ENG',
+     'London', 'SW1A', 51.5072, -0.1276, 'Europe/London', 'GBP', '44'),
+    ('US', 'USA', 840, 'United States of America (the)', 'North America', 'NA', 'California', 'US-CA', 'San Jose', '95113',
+     37.3382, -121.8863, 'America/Los_Angeles', 'USD', '1'),
+    ('NG', 'NGA', 566, 'Nigeria', 'Africa', 'AF', 'Lagos', 'NG-LA', 'Lagos', '100001', 6.5244, 3.3792, 'Africa/Lagos', 'NGN', '234'),
+    ('JP', 'JPN', 392, 'Japan', 'Asia', 'AS', 'Tokyo', 'JP-13', 'Tokyo', '100-0001', 35.6762, 139.6503, 'Asia/Tokyo', 'JPY', '81'),
+]
+
+TIMEZONE_OFFSETS = {'Europe/Dublin': 0, 'Europe/London': 0, 'America/Los_Angeles': -28800,
+                    'Africa/Lagos': 3600, 'Asia/Tokyo': 32400, 'Australia/Sydney': 36000}
+
+
+def _pick(value:str):
+    """:return: the city a request value maps to, the same one every time"""
+
+    return CITIES[sum(map(ord, str(value))) % len(CITIES)]
+
+
+def _country(city, lang='en'):
+    code, alpha3, m49, name, continent, continent_code, *_, currency, calling = city
+    return {
+        'isoAlpha2': code, 'isoAlpha3': alpha3, 'm49Code': m49, 'name': name, 'isoName': name,
+        'isoNameFull': f"the {name}", 'isoAdminLanguages': [{'isoAlpha3': 'eng', 'isoAlpha2': 'en',
+                                                               'isoName': 'English', 'nativeName': 'English'}],
+        'unRegion': f"{continent}/{continent}", 'currency': {'numericCode': m49, 'code': currency,
+                                                             'name': currency, 'minorUnits': 2},
+        'wbRegion': {'id': 'ECS', 'iso2Code': 'Z7', 'value': continent},
+        'wbIncomeLevel': {'id': 'HIC', 'iso2Code': 'XD', 'value': 'High income'},
+        'callingCode': calling, 'countryFlagEmoji': '', 'isIndependent': True,
+    }
+
+
+def _timezone(tz, utc_reference=None):
+    offset = TIMEZONE_OFFSETS.get(tz, 0)
+    now = int(utc_reference or time.time())
+    return {
+        'ianaTimeId': tz, 'displayName': f"(UTC{offset // 3600:+03d}:00) {tz}", 'effectiveTimeZoneFull': tz,
+        'effectiveTimeZoneShort': tz.split('/')[-1][:4].upper(), 'utcOffsetSeconds': offset,
+        'utcOffset': f"{offset // 3600:+03d}:00", 'isDaylightSavingTime': False,
+        'localTime': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(now + offset)),
+    }
+
+
+def _locality_info(city):
+    code, _, _, name, continent, _, subdivision, iso_subdivision, locality, *_ = city
+    administrative = [
+        {'name': name, 'description': 'country', 'order': 2, 'adminLevel': 2, 'isoCode': code, 'wikidataId': 'Q27',
+         'geonameId': 2963597},
+        {'name': subdivision, 'description': 'province', 'order': 4, 'adminLevel': 4, 'isoCode': iso_subdivision,
+         'wikidataId': 'Q133', 'geonameId': 7521314},
+        {'name': locality, 'description': 'capital city', 'order': 6, 'adminLevel': 6, 'wikidataId': 'Q1761',
+         'geonameId': 2964574},
+    ]
+    informative = [
+        {'name': continent, 'description': 'continent', 'order': 1, 'isoCode': 'EU', 'wikidataId': 'Q46',
+         'geonameId': 6255148},
+        {'name': 'Central European Time', 'description': 'time zone', 'order': 3},
+        {'name': f"{locality} Region", 'description': 'statistical region', 'order': 5, 'wikidataId': 'Q1140'},
+    ]
+    return {'administrative': administrative, 'informative': informative}
+
+
+def _location(city, lang='en'):
+    *_, subdivision, iso_subdivision, locality, postcode, lat, lon, tz, _, _ = city
+    return {
+        'continent': city[4], 'continentCode': city[5], 'isoPrincipalSubdivision': subdivision,
+        'isoPrincipalSubdivisionCode': iso_subdivision, 'city': locality, 'localityName': locality,
+        'postcode': postcode, 'latitude': lat, 'longitude': lon, 'plusCode': '9C5M8PRX+',
+        'timeZone': _timezone(tz), 'localityInfo': _locality_info(city),
+    }
+
+
+def _network(ip):
+    first = str(ip).split('.')[0]
+    return {
+        'registry': 'RIPE', 'registryStatus': 'assigned', 'registeredCountry': 'IE', 'registeredCountryName': 'Ireland',
+        'organisation': 'Example Networks Ltd', 'isReachableGlobally': True, 'isBogon': False,
+        'bgpPrefix': f"{first}.0.0.0/8", 'bgpPrefixNetworkAddress': f"{first}.0.0.0",
+        'bgpPrefixLastAddress': f"{first}.255.255.255", 'totalAddresses': 16777216,
+        'carriers': [{'asn': 'AS15169', 'asnNumeric': 15169, 'organisation': 'Example Networks Ltd', 'name': 'EXAMPLE',
+                      'registry': 'ARIN', 'registeredCountry': 'US', 'registeredCountryName': 'United States of America',
+                      'registrationDate': '2000-03-30', 'registrationLastChange': '2012-02-24',
+                      'totalIpv4Addresses': 8698103, 'totalIpv4Prefixes': 435, 'totalIpv4BogonPrefixes': 0,
+                      'rank': 53, 'rankText': '#53 out of 70,663'}],
+        'viaCarriers': [{'asn': 'AS3356', 'asnNumeric': 3356, 'organisation': 'Level 3 Parent, LLC',
+                         'registeredCountry': 'US', 'totalIpv4Addresses': 29000000, 'rank': 5}],
+        'subnets': [{'network': f"{first}.8.8.0", 'firstAddress': f"{first}.8.8.0", 'lastAddress': f"{first}.8.8.255",
+                     'mask': 24, 'totalAddresses': 256}],
+    }
+
+
+def ip_geolocation(params, full=False):
+    ip = params.get('ip', '37.228.253.39')
+    city = _pick(ip)
+    body = {
+        'ip': ip, 'localityLanguageRequested': params.get('localityLanguage', 'en'), 'isReachableGlobally': True,
+        'country': _country(city), 'location': _location(city), 'lastUpdated': '2020-05-01T12:00:00.0000000Z',
+    }
+    if full:
+        body.update(network=_network(ip), confidence='high', confidenceArea=[
+            {'latitude': city[10] + d / 100, 'longitude': city[11] - d / 100} for d in range(12)],
+            securityThreat='unknown', hazardReport={'isKnownAsTorServer': False, 'isKnownAsVpn': False,
+                                                    'isKnownAsProxy': False, 'isSpamhausDrop': False,
+                                                    'isBogon': False, 'isUnreachable': False, 'hostingLikelihood': 0})
+    return body
+
+
+def ip_geolocation_with_confidence(params):
+    body = ip_geolocation(params)
+    city = _pick(body['ip'])
+    body.update(confidence='moderate', confidenceArea=[
+        {'latitude': city[10] + d / 100, 'longitude': city[11] - d / 100} for d in range(12)])
+    return body
+
+
+def reverse_geocode(params):
+    city = _pick(params.get('latitude', '') + params.get('longitude', ''))
+    return {
+        'latitude': float(params.get('latitude') or city[10]), 'longitude': float(params.get('longitude') or city[11]),
+        'lookupSource': 'coordinates', 'plusCode': '9C5M8PRX+', 'localityLanguageRequested': params.get('localityLanguage', 'en'),
+        'continent': city[4], 'continentCode': city[5], 'countryName': city[3], 'countryCode': city[0],
+        'principalSubdivision': city[6], 'principalSubdivisionCode': city[7], 'city': city[8],
+        'locality': city[8], 'postcode': city[9], 'localityInfo': _locality_info(city),
+    }
+
+
+def user_agent_info(params):
+    ua = params.get('userAgentRaw', '')
+    mobile = 'Mobile' in ua or 'iPhone' in ua
+    return {
+        'device': 'iPhone' if 'iPhone' in ua else 'Other', 'os': 'iOS 7.0' if 'iPhone' in ua else 'Other',
+        'userAgent': 'Mobile Safari' if mobile else 'Other', 'type': 'Mobile' if mobile else 'Desktop',
+        'isSpider': 'bot' in ua.lower(), 'isMobile': mobile, 'userAgentDisplay': f"{'Mobile Safari' if mobile else 'Other'}",
+        'userAgentRaw': ua, 'userAgentVersion': '7.0',
+    }
+
+
+def timezone_info(params, tz=None):
+    tz = tz or params.get('timeZoneId') or _pick(params.get('ip', params.get('latitude', '')))[12]
+    body = _timezone(tz, params.get('utcReference'))
+    body.update(utcTime=time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(int(params.get('utcReference') or time.time()))),
+                atomicTime=None, dstEffectiveSince=None, dstEffectiveUntil=None)
+    return body
+
+
+def asn_info(params, full=False):
+    asn = str(params.get('asn', 'AS15169')).upper()
+    number = int(''.join(filter(str.isdigit, asn)) or 0)
+    body = {
+        'asn': f"AS{number}", 'asnNumeric': number, 'organisation': 'Example Networks Ltd', 'name': 'EXAMPLE',
+        'registry': 'ARIN', 'registeredCountry': 'US', 'registeredCountryName': 'United States of America',
+        'registrationDate': '2000-03-30', 'registrationLastChange': '2012-02-24', 'totalIpv4Addresses': 8698103,
+        'totalIpv4Prefixes': 435, 'totalIpv4BogonPrefixes': 0, 'rank': 53, 'rankText': '#53 out of 70,663',
+    }
+    if full:
+        body.update(receivingFrom=[{'asn': 'AS3356', 'asnNumeric': 3356, 'organisation': 'Level 3 Parent, LLC',
+                                    'registeredCountry': 'US', 'rank': 5} for _ in range(10)],
+                    confirmedCountries=[{'isoAlpha2': city[0], 'name': city[3]} for city in CITIES])
+    return body
+
+
+def _page(params, total:int, record):
+    offset, size = int(params.get('offset') or 0), int(params.get('batchSize') or 1)
+    return [record(i) for i in range(offset, min(offset + size, total))]
+
+
+def tor_exit_nodes_list(params, total:int=1200):
+    nodes = _page(params, total, lambda i: {'ip': f"185.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+                                            'country': 'DE', 'carriers': [{'asn': 'AS24940', 'asnNumeric': 24940}]})
+    return {'nodes': nodes, 'total': total}
+
+
+def prefixes_list(params, total:int=1200):
+    bogons = params.get('bogonsOnly') in ('True', 'true', '1')
+    prefixes = _page(params, total, lambda i: {'bgpPrefix': f"{10 + i // 256 % 200}.{i % 256}.0.0/16",
+                                               'bgpPrefixNetworkAddress': f"{10 + i // 256 % 200}.{i % 256}.0.0",
+                                               'bgpPrefixLastAddress': f"{10 + i // 256 % 200}.{i % 256}.255.255",
+                                               'isBogon': bogons, 'isAcquired': False, 'country': 'US',
+                                               'registry': 'ARIN', 'asn': 'AS15169', 'asnNumeric': 15169})
+    return {'prefixes': prefixes, 'total': total}
+
+
+def phone_number_validate(params):
+    number = params.get('number', '')
+    city = _pick(params.get('countryCode') or params.get('ip', ''))
+    return {
+        'isValid': 7 <= len(number) <= 15, 'e164Format': f"+{city[14]}{number.lstrip('0')}",
+        'internationalFormat': f"+{city[14]} {number.lstrip('0')}", 'nationalFormat': number,
+        'location': city[8], 'lineType': 'MOBILE', 'country': _country(city),
+    }
+
+
+def email_verify(params):
+    address = params.get('emailAddress', '')
+    domain = address.rpartition('@')[2]
+    return {
+        'inputData': address, 'isValid': bool(domain), 'isSyntaxValid': '@' in address,
+        'isMailServerDefined': bool(domain), 'isKnownSpammerDomain': False, 'isDisposable': domain.endswith('.invalid'),
+    }
+
+
+# Payload of every endpoint, as a function of the request's query params
+PAYLOADS = {
+    'ip-geolocation': ip_geolocation,
+    'ip-geolocation-full': lambda params: ip_geolocation(params, full=True),
+    'ip-geolocation-with-confidence': ip_geolocation_with_confidence,
+    'reverse-geocode-client': reverse_geocode,
+    'reverse-geocode': reverse_geocode,
+    'client-info': lambda params: dict(ip_geolocation({'ip': '37.228.253.39'}),
+                                       userAgent=user_agent_info({'userAgentRaw': 'python-requests'})),
+    'am-i-roaming': lambda params: {'isRoaming': False, 'countryCode': 'IE', 'countryName': 'Ireland',
+                                    'location': reverse_geocode(params)},
+    'user-agent-info': user_agent_info,
+    'client-ip': lambda params: {'ipString': '37.228.253.39', 'ipNumeric': 635763751, 'ipType': 'IPv4'},
+    'timezone-by-ip': timezone_info,
+    'timezone-info': timezone_info,
+    'timezone-by-location': timezone_info,
+    'country-by-ip': lambda params: {'ip': params.get('ip'), 'country': _country(_pick(params.get('ip', ''))),
+                                     'lastUpdated': '2020-05-01T12:00:00.0000000Z'},
+    'country-info': lambda params: _country(next((c for c in CITIES if c[0] == params.get('code', '').upper()), CITIES[0])),
+    'asn-info': asn_info,
+    'asn-info-full': lambda params: asn_info(params, full=True),
+    'tor-exit-nodes-list': tor_exit_nodes_list,
+    'address-space-stats-ipv4': lambda params: {'totalAddresses': 4294967296, 'bogonAddresses': 592708865,
+                                                'announcedAddresses': 3117698432, 'registries': [
+                                                    {'registry': registry, 'totalAddresses': 16777216 * 50}
+                                                    for registry in ('ARIN', 'RIPE', 'APNIC', 'LACNIC', 'AFRINIC')]},
+    'network-by-ip': lambda params: _network(params.get('ip', '37.228.253.39')),
+    'prefixes-list': prefixes_list,
+    'network-by-cidr': lambda params: dict(_network(params.get('cidr', '8.0.0.0/8').split('/')[0]),
+                                           depthLimit=int(params.get('depthLimit') or 1)),
+    'phone-number-validate-by-ip': phone_number_validate,
+    'phone-number-validate': phone_number_validate,
+    'email-verify': email_verify,
+}
+
+# Endpoints requiring the api key
+KEYED = frozenset(path for endpoints in MODES_AND_PARAMS.values() for path, query in endpoints.items() if 'key' in query)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    # Sends the headers and body in one segment, so delayed ACKs don't skew latencies
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        endpoint = parts.path.rsplit('/', 1)[-1]
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+
+        delay = server.latency + (server.jitter and server.random.uniform(0, server.jitter))
+        if delay:
+            time.sleep(delay)
+
+        with server.lock:
+            server.requests += 1
+            failing = server.error_rate and server.random.random() < server.error_rate
+            status = server.random.choice(server.error_statuses) if failing else 200
+
+        if endpoint not in PAYLOADS:
+            status, body = 404, {'error': f"Unknown endpoint {endpoint}"}
+        elif endpoint in KEYED and not params.get('key'):
+            status, body = 401, {'error': 'API key is missing'}
+        elif status != 200:
+            body = {'error': 'Injected failure'}
+        else:
+            body = PAYLOADS[endpoint](params)
+
+        payload = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        if self.close_connection:
+            # Asked for by the client, so it doesn't reuse the connection
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class MockServer:
+    """
+    Local mock of the BigDataCloud API, run in a background thread
+
+    :param: :latency: Seconds each response is delayed by
+    :param: :jitter: Upper bound of an extra, random delay in seconds
+    :param: :error_rate: Share of requests failed with one of `error_statuses`
+    :param: :error_statuses: Statuses of the injected failures
+    :param: :seed: Seed of the random jitter and failures, for repeatable runs
+    :param: :host: Host to listen on
+    :param: :port: Port to listen on. Defaults to any free port
+    """
+
+    def __init__(self, *, latency:float=0, jitter:float=0, error_rate:float=0, error_statuses=(500, 503, 429),
+                 seed:int=None, host:str='127.0.0.1', port:int=0):
+        self._server = ThreadingHTTPServer((host, port), MockHandler)
+        self._server.daemon_threads = True
+        self._server.lock = threading.Lock()
+        self._server.requests = 0
+        self._server.latency = latency
+        self._server.jitter = jitter
+        self._server.error_rate = error_rate
+        self._server.error_statuses = tuple(error_statuses)
+        self._server.random = random.Random(seed)
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/data"
+
+    @property
+    def requests(self):
+        """Number of requests received"""
+
+        return self._server.requests
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local mock of the BigDataCloud API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0, help="Seconds each response is delayed by")
+    parser.add_argument('--jitter', type=float, default=0, help="Upper bound of an extra, random delay")
+    parser.add_argument('--error-rate', type=float, default=0, help="Share of requests failed")
+    args = parser.parse_args()
+
+    server = MockServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        host=args.host, port=args.port)
+    print(f"Serving the mock api at {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,65 @@
+"""
+Memory benchmark of results kept as decoded dicts versus `bigdatacloud.models`
+
+    python -m benchmarks.models
+"""
+
+import json, random, tracemalloc
+
+from bigdatacloud.models import IPGeolocation
+
+
+CITIES = [
+    ('IE', 'Ireland', 'Europe', 'EU', 'Leinster', 'Dublin', 'Europe/Dublin'),
+    ('GB', 'United Kingdom of Great Britain and Northern Ireland (the)', 'Europe', 'EU', 'England', 'London', 'Europe/London'),
+    ('US', 'United States of America (the)', 'North America', 'NA', 'California', 'San Jose', 'America/Los_Angeles'),
+    ('NG', 'Nigeria', 'Africa', 'AF', 'Lagos', 'Lagos', 'Africa/Lagos'),
+    ('JP', 'Japan', 'Asia', 'AS', 'Tokyo', 'Tokyo', 'Asia/Tokyo'),
+]
+
+
+def sample_response(i:int):
+    """:return: raw JSON bytes shaped like an `ip_geolocation` response"""
+
+    code, country, continent, continent_code, subdivision, city, tz = random.choice(CITIES)
+
+    return json.dumps({
+        'ip': f"{10 + i % 200}.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+        'localityLanguageRequested': 'en',
+        'isReachableGlobally': True,
+        'country': {'isoAlpha2': code, 'name': country, 'isoName': country, 'callingCode': '353',
+                    'currency': {'numericCode': 978, 'code': 'EUR', 'name': 'Euro', 'minorUnits': 2}},
+        'location': {'continent': continent, 'continentCode': continent_code, 'isoPrincipalSubdivision': subdivision,
+                     'city': city, 'localityName': city, 'postcode': '', 'latitude': 53.35, 'longitude': -6.26,
+                     'timeZone': {'ianaTimeId': tz, 'displayName': tz, 'utcOffsetSeconds': 3600}},
+        'lastUpdated': '2020-05-01T00:00:00',
+    }).encode()
+
+
+def measure(build, raws):
+    """:return: (bytes allocated, results) for the results built from `raws`"""
+
+    tracemalloc.start()
+    results = [build(raw) for raw in raws]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return size, results
+
+
+def run(count:int=100000):
+    """
+    :return: dict of bytes per result, keyed by representation
+    """
+
+    raws = [sample_response(i) for i in range(count)]
+
+    dicts, _ = measure(json.loads, raws)
+    models, _ = measure(IPGeolocation.from_response, raws)
+
+    return {'dict': dicts / count, 'model': models / count}
+
+
+if __name__ == '__main__':
+    for name, size in run().items():
+        print(f"{name:<6} {size:8.0f} bytes/result")
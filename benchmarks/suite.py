@@ -0,0 +1,256 @@
+"""
+Benchmark suite of the client, run offline against `benchmarks.mockserver`
+
+    python -m benchmarks.suite                      # runs, saves and compares with the previous run
+    python -m benchmarks.suite --compare base.json  # compares with a given run instead
+    python -m benchmarks.suite --only latency,decode --no-save
+
+Results are saved as JSON under `benchmarks/results`. Metrics worse than the
+compared run by more than `--threshold` are reported as regressions, and make
+the run exit with status 1 under `--strict`
+"""
+
+import os, sys, json, time, timeit, asyncio, argparse, platform, subprocess
+from statistics import median
+
+from bigdatacloud import BigDataCloud, __version__
+from bigdatacloud.response import loads, LazyResponse
+
+from . import models, validation
+from .mockserver import MockServer, ip_geolocation
+
+try:
+    from bigdatacloud.aio import AsyncBigDataCloud, aiohttp
+except ImportError:
+    aiohttp = None
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def _ips(count:int):
+    return [f"{10 + i // 65536 % 200}.{i // 256 % 256}.{i % 256}.1" for i in range(count)]
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud('API_KEY', **dict(dict(pool_maxsize=32), **kwargs))
+    client.API_BASE_URL = server.url
+    return client
+
+
+def bench_latency(calls:int=500):
+    """
+    Latency of single, sequential calls over a kept-alive connection, and over a new
+    connection per call, as without connection reuse. The mock server is plain HTTP,
+    so only the TCP handshake is saved here; against the api, TLS adds to it
+    """
+
+    results = {}
+
+    with MockServer() as server:
+        for name, reuse in (('latency', True), ('latency.fresh', False)):
+            timings = []
+
+            with _client(server) as client:
+                if not reuse:
+                    # Has the server close the connection after every response
+                    client._session.headers['Connection'] = 'close'
+
+                for ip in _ips(calls):
+                    started = time.perf_counter()
+                    client.ip_geolocation(ip=ip)
+                    timings.append(time.perf_counter() - started)
+
+            timings.sort()
+            results[f"{name}.p50"] = (median(timings) * 1e3, 'ms', False)
+            results[f"{name}.p95"] = (timings[int(len(timings) * .95)] * 1e3, 'ms', False)
+
+    return results
+
+
+def bench_throughput(count:int=1000, workers=(1, 4, 16, 64), latency:float=.005):
+    """
+    Throughput of bulk lookups against a server adding `latency` to every response,
+    for each number of `workers`, and with asyncio
+    """
+
+    results = {}
+
+    with MockServer(latency=latency) as server:
+        for size in workers:
+            with _client(server, pool_maxsize=max(size, 32)) as client:
+                started = time.perf_counter()
+                client.ip_geolocation_many(_ips(count), workers=size)
+                results[f"throughput.threads.{size}"] = (count / (time.perf_counter() - started), 'calls/s', True)
+
+        if aiohttp is not None:
+            async def bulk():
+                async with AsyncBigDataCloud('API_KEY', max_concurrency=64) as client:
+                    client.API_BASE_URL = server.url
+                    started = time.perf_counter()
+                    await client.ip_geolocation_many(_ips(count))
+                    return time.perf_counter() - started
+
+            results['throughput.asyncio'] = (count / asyncio.run(bulk()), 'calls/s', True)
+
+    return results
+
+
+def bench_email(count:int=100000, domains:int=500, latency:float=.005):
+    """Throughput of `email_verify_many` over `count` addresses sharing `domains` domains"""
+
+    # One in fifty addresses is malformed, and some domains are written in upper case
+    addresses = [f"user{i}@domain{i % domains}.com" if i % 50 else f"user{i}domain{i % domains}.com"
+                 for i in range(count)]
+    addresses[1::7] = [address.upper() for address in addresses[1::7]]
+
+    with MockServer(latency=latency) as server, _client(server) as client:
+        started = time.perf_counter()
+        client.email_verify_many(addresses, workers=16)
+        elapsed = time.perf_counter() - started
+
+        return {'email.throughput': (count / elapsed, 'addresses/s', True),
+                'email.calls': (server.requests, 'calls', False)}
+
+
+def bench_validation(number:int=20000):
+    """Per-call overhead of argument validation"""
+
+    return {f"validation.{name}": (modes['validated'], 'ns', False)
+            for name, modes in validation.run(number).items()}
+
+
+def bench_decode(count:int=5000):
+    """Cost of decoding a full geolocation response, eagerly and lazily"""
+
+    raw = json.dumps(ip_geolocation({'ip': '37.228.253.39'}, full=True)).encode()
+    results = {'decode.payload': (len(raw), 'bytes', False)}
+
+    for name, decode in (('json', json.loads), ('loads', loads),
+                         ('lazy_field', lambda raw: LazyResponse(raw)['ip']),
+                         ('lazy_passthrough', lambda raw: LazyResponse(raw).raw)):
+        elapsed = min(timeit.repeat(lambda: decode(raw), number=count, repeat=3))
+        results[f"decode.{name}"] = (elapsed / count * 1e6, 'us', False)
+
+    return results
+
+
+def bench_memory(count:int=20000):
+    """Memory held per `ip_geolocation` result"""
+
+    return {f"memory.{name}": (size, 'bytes/result', False) for name, size in models.run(count).items()}
+
+
+BENCHMARKS = {
+    'latency': bench_latency,
+    'throughput': bench_throughput,
+    'email': bench_email,
+    'validation': bench_validation,
+    'decode': bench_decode,
+    'memory': bench_memory,
+}
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(only=None):
+    """
+    :return: the results, with the environment they were measured in
+    """
+
+    metrics = {}
+    for name, bench in BENCHMARKS.items():
+        if not only or name in only:
+            metrics.update(bench())
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _commit(),
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'metrics': {name: {'value': value, 'unit': unit, 'higher_is_better': higher}
+                    for name, (value, unit, higher) in metrics.items()},
+    }
+
+
+def save(results:dict, directory:str=RESULTS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{results['timestamp'].replace(':', '')}-{results['commit'] or 'local'}.json")
+
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    return path
+
+
+def latest(directory:str=RESULTS_DIR):
+    """:return: path of the latest saved run, if any"""
+
+    if not os.path.isdir(directory):
+        return None
+
+    runs = sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+    return os.path.join(directory, runs[-1]) if runs else None
+
+
+def compare(results:dict, baseline:dict, threshold:float=.1):
+    """
+    :return: list of (`metric`, `baseline`, `value`, `change`, `regressed`) of the metrics both runs have,
+             `change` being relative, positive when better
+    """
+
+    rows = []
+
+    for name, metric in results['metrics'].items():
+        base = baseline['metrics'].get(name)
+        if not base or not base['value']:
+            continue
+
+        change = (metric['value'] - base['value']) / base['value']
+        if not metric['higher_is_better']:
+            change = -change
+        rows.append((name, base['value'], metric['value'], change, change < -threshold))
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--only', help=f"Comma-separated benchmarks to run, of {', '.join(BENCHMARKS)}")
+    parser.add_argument('--compare', help="Saved run to compare with. Defaults to the latest one")
+    parser.add_argument('--threshold', type=float, default=.1, help="Relative change reported as a regression")
+    parser.add_argument('--no-save', action='store_true', help="Doesn't save the results")
+    parser.add_argument('--strict', action='store_true', help="Exits with status 1 on regressions")
+    args = parser.parse_args(argv)
+
+    baseline_path = args.compare or latest()
+    results = run(args.only.split(',') if args.only else None)
+
+    for name, metric in results['metrics'].items():
+        print(f"{name:<36} {metric['value']:>12.2f} {metric['unit']}")
+
+    if not args.no_save:
+        print(f"\nSaved to {save(results)}")
+
+    if not baseline_path:
+        return 0
+
+    with open(baseline_path) as f:
+        rows = compare(results, json.load(f), args.threshold)
+
+    print(f"\nCompared with {baseline_path}")
+    for name, base, value, change, regressed in rows:
+        print(f"{name:<36} {base:>12.2f} -> {value:>12.2f} {change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+
+    return 1 if args.strict and any(row[-1] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Microbenchmark of the per-call overhead of argument validation
+
+    python -m benchmarks.validation
+"""
+
+import timeit
+
+from bigdatacloud.utils import validate_args
+
+
+class Client:
+    """Stand-in client whose methods do nothing but validation"""
+
+    def __init__(self, validate:bool=True):
+        self.validate = validate
+
+    @validate_args
+    def ip_geolocation(self, *, ip:str='', lang:str='en'):
+        pass
+
+    @validate_args
+    def reverse_geocode(self, *, latitude:str='', longitude:str='', lang:str='en'):
+        pass
+
+    @validate_args
+    def phone_number_validate(self, *, number:str='', country_code:str='', lang:str='en'):
+        pass
+
+    @validate_args
+    def email_verify(self, *, email_address:str=''):
+        pass
+
+
+CALLS = {
+    'ip_geolocation': dict(ip='37.228.253.39', lang='zu'),
+    'reverse_geocode': dict(latitude='53.349804', longitude='-6.260310', lang='en'),
+    'phone_number_validate': dict(number='08794425261', country_code='ie', lang='en'),
+    'email_verify': dict(email_address='josiahakinremi@gmail.com'),
+}
+
+
+def run(number:int=100000):
+    """
+    :return: dict of per-call overhead in nanoseconds, keyed by `method` then `validated`/`trusted`
+    """
+
+    results = {}
+
+    for name, kwargs in CALLS.items():
+        results[name] = {}
+        for mode, client in (('validated', Client()), ('trusted', Client(validate=False))):
+            method = getattr(client, name)
+            elapsed = min(timeit.repeat(lambda: method(**kwargs), number=number, repeat=3))
+            results[name][mode] = elapsed / number * 1e9
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, modes in run().items():
+        print(f"{name:<24} validated {modes['validated']:8.0f} ns   trusted {modes['trusted']:8.0f} ns")
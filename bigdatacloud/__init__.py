@@ -6,11 +6,23 @@ __license__ = 'MIT'
 
 
 
+import time
 from requests import Session
+from itertools import count
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
 from urllib.parse import urlencode
 
-from .utils import validate_args
-from .config import MODES_AND_PARAMS, ISO_639_1_CODES
+from .utils import validate_args, SUPPORTED_LANGUAGES
+from .endpoints import ENDPOINTS, Endpoint
+from .scheduler import RequestScheduler
+from .singleflight import SingleFlight
+from .models import MODELS
+from .response import LazyResponse, loads
+from .instrumentation import RequestEvent, emit
+from .emails import EmailDomainCache
+from .useragents import UserAgentCache, read_user_agents
 
 
 class BigDataCloud:
@@ -19,17 +31,96 @@ class BigDataCloud:
     Kindly visit https://www.bigdatacloud.com/ for further information
     
     :param: :api_key: API key needed for authorization
+    :param: :pool_connections: Number of host connection pools to cache
+    :param: :pool_maxsize: Maximum number of connections kept alive per host
+    :param: :pool_block: Whether to block, when the pool is exhausted, until a connection is free
+    :param: :cache: Optional response cache, a `bigdatacloud.cache.BaseCache` such as `MemoryCache()`
+    :param: :cache_ttls: Cache lifetimes in seconds keyed by api category or endpoint, 
+                         overriding `config.CACHE_TTLS`. A lifetime of 0 disables caching
+    :param: :scheduler: `bigdatacloud.scheduler.RequestScheduler` setting timeouts, retries and
+                        rate limit. Defaults to one with timeouts and 3 retries, but no rate limit
+    :param: :coalesce: Whether concurrent identical requests share a single api call, and its response
+    :param: :validate: Whether arguments are validated before querying the api. 
+                       Turn off for trusted, pre-sanitized input
+    :param: :response_mode: 'json' to return decoded responses, 'lazy' to return 
+                            `bigdatacloud.response.LazyResponse` objects holding the raw 
+                            bytes, only decoded when a field is accessed, or 'model' to 
+                            return the compact results of `bigdatacloud.models` where 
+                            the endpoint has one
+    :param: :keep_raw: Whether results of `response_mode='model'` keep the raw response,
+                       available from their `raw`
+    :param: :hooks: Callables passed a `bigdatacloud.instrumentation.RequestEvent` after every
+                    call, reporting its timing phases, status, size and cache outcome.
+                    See `PrometheusHook` and `OpenTelemetryHook` there
+    :param: :countries: Optional `bigdatacloud.countries.CountrySnapshot` answering
+                        `country_info` locally, for the languages it has
+    :param: :email_domains: `bigdatacloud.emails.EmailDomainCache` of the domains
+                            `email_verify_many` has verified. Defaults to a new one
+    :param: :user_agents: `bigdatacloud.useragents.UserAgentCache` of the user agents
+                          `user_agent_info_many` has parsed. Defaults to a new one
+
+    The client keeps its HTTP connections alive between calls. Call `close()` when done,
+    or use the client as a context manager
     """
 
     # API Base URL
     API_BASE_URL = 'https://api.bigdatacloud.net/data'
     # Languages BigDataCloud supports
-    SUPPORTED_LANGUAGES = list(ISO_639_1_CODES.values())
+    SUPPORTED_LANGUAGES = SUPPORTED_LANGUAGES
+    # Shapes responses can be returned in
+    RESPONSE_MODES = ('json', 'lazy', 'model')
+    # Coalesces concurrent identical requests
+    _SINGLE_FLIGHT = SingleFlight
     
-    def __init__(self, api_key:str=''):
-        self.api_key = api_key
+    def __init__(self, api_key:str='', *, pool_connections:int=10, pool_maxsize:int=10, pool_block:bool=False,
+                 cache=None, cache_ttls:dict=None, scheduler:RequestScheduler=None, coalesce:bool=True,
+                 validate:bool=True, response_mode:str='json', keep_raw:bool=False, hooks=None, countries=None,
+                 email_domains:EmailDomainCache=None, user_agents:UserAgentCache=None):
+        self._setup(api_key, cache, cache_ttls, scheduler, coalesce, validate, response_mode, keep_raw, hooks,
+                    countries, email_domains, user_agents)
         self._session = Session()
 
+        adapter = HTTPAdapter(pool_connections=pool_connections, 
+                              pool_maxsize=pool_maxsize, 
+                              pool_block=pool_block)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def _setup(self, api_key:str, cache, cache_ttls:dict, scheduler:RequestScheduler, coalesce:bool, validate:bool,
+               response_mode:str, keep_raw:bool, hooks, countries, email_domains:EmailDomainCache,
+               user_agents:UserAgentCache):
+        """
+        Internal function that sets up the state the sync and async clients share,
+        their sessions aside. See the class's params
+        """
+
+        if response_mode not in self.RESPONSE_MODES:
+            raise ValueError(f"`response_mode` should be one of {', '.join(self.RESPONSE_MODES)}, not {response_mode}")
+
+        self.api_key = api_key
+        self.cache = cache
+        self.scheduler = scheduler or RequestScheduler()
+        self._flights = self._SINGLE_FLIGHT() if coalesce else None
+        self.validate = validate
+        self.response_mode = response_mode
+        self.keep_raw = keep_raw
+        self.hooks = tuple(hooks or ())
+        self.countries = countries
+        self.email_domains = email_domains if email_domains is not None else EmailDomainCache()
+        self.user_agents = user_agents if user_agents is not None else UserAgentCache()
+        self._cache_ttls = self._resolve_cache_ttls(cache_ttls)
+
+    def close(self):
+        """Closes the underlying session and releases its pooled connections"""
+
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def _format_url(self, endpoint:str, values:dict={}):
         """
         Internal function that helps to format the url to the 
@@ -45,38 +136,268 @@ class BigDataCloud:
 
         return url
     
-    def _make_request(self, url):
+    @staticmethod
+    def _resolve_cache_ttls(overrides:dict=None):
+        """
+        Internal function that resolves the cache lifetime of each endpoint, 
+        overrides by endpoint taking precedence over overrides by category
         """
-        Internal function that makes a GET request to the API
+
+        overrides = overrides or {}
+
+        return {name: overrides.get(endpoint.path, overrides.get(endpoint.category, endpoint.ttl))
+                for name, endpoint in ENDPOINTS.items()}
+
+    def _cache_key(self, endpoint:Endpoint, params:dict):
+        """
+        Internal function that builds the cache key of a request from its
+        endpoint and query params, leaving out the api key
+
+        :return: (`key` -> str, `ttl` -> float), `key` being None if the request isn't cached
+        """
+
+        ttl = self._cache_ttls[endpoint.name]
+        if self.cache is None or not ttl:
+            return None, 0
+
+        key = f"{endpoint.path}?{urlencode([(k, v) for k, v in params.items() if k != 'key'])}"
+
+        return key, ttl
+
+    def _call(self, name:str, *args, fresh:bool=False):
+        """
+        Internal function that queries an endpoint of the registry, `args` 
+        being its arguments in the order of the endpoint's `args`. With `fresh`,
+        the api is queried even if the response is cached, and its response cached
 
         :return: JSON response from the api
         """
 
-        with self._session as s:
-            resp = s.get(url)
-            resp.raise_for_status()
+        endpoint = ENDPOINTS[name]
+        params = dict(zip(endpoint.params, args))
+
+        if endpoint.needs_key:
+            params['key'] = self.api_key
+
+        if self.hooks:
+            return self._traced_request(endpoint, params, fresh)
+
+        return self._request(endpoint, params, fresh=fresh)
+
+    def _start_event(self, endpoint:Endpoint, params:dict):
+        """Internal function that starts the event reported to the hooks"""
+
+        return RequestEvent(endpoint.name, endpoint.path, {k: v for k, v in params.items() if k != 'key'},
+                            time.time())
+
+    def _finish_event(self, event:RequestEvent, started:float):
+        """Internal function that reports a finished event to the hooks"""
+
+        event.duration = time.perf_counter() - started
+        emit(self.hooks, event)
+
+    def _cached(self, endpoint:Endpoint, params:dict, event:RequestEvent=None, fresh:bool=False):
+        """
+        Internal function that looks a request up in the cache, unless `fresh`
+
+        :return: (`key`, `ttl`, `resp`), `key` being None if the request isn't
+                 cached, and `resp` None unless the cache answered it
+        """
+
+        key, ttl = self._cache_key(endpoint, params)
+        if key is None:
+            return None, 0, None
+
+        cached = None if fresh else self.cache.get(key)
+        if event is not None:
+            event.cache_hit = cached is not None
+        if cached is not None and isinstance(cached, bytes):
+            cached = self._decode(cached, endpoint)
 
-        return resp.json()        
+        return key, ttl, cached
 
-    def _retrieve_url_params(self, category:str, index:int, *args):
+    def _fetched(self, raw:bytes, endpoint:Endpoint, key:str, ttl:float, event:RequestEvent=None):
         """
-        Extracts url parameters from a given api category and index
-        
-        :return: (`endpoint` -> str, `qp` -> dict)
+        Internal function that decodes a response fetched from the api, and caches it
+
+        :return: the decoded response
+        """
+
+        started = time.perf_counter()
+        resp = self._decode(raw, endpoint)
+        if event is not None:
+            event.decode = time.perf_counter() - started
+        if key is not None:
+            self.cache.set(key, raw if self.cache.raw else resp, ttl)
+
+        return resp
+
+    def _traced_request(self, endpoint:Endpoint, params:dict, fresh:bool=False):
+        """
+        Internal function that makes the request, then reports it to the hooks
+
+        :return: JSON response from the api
+        """
+
+        event = self._start_event(endpoint, params)
+        started = time.perf_counter()
+
+        try:
+            return self._request(endpoint, params, event, fresh)
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            self._finish_event(event, started)
+
+    def _request(self, endpoint:Endpoint, params:dict, event:RequestEvent=None, fresh:bool=False):
         """
+        Internal function that answers a request from the cache when 
+        possible, or joins an identical request already in flight, 
+        querying the api otherwise. `event`, when given, records which
+        of them answered, and the timing of any request to the api.
+        `fresh` skips the cache lookup
 
-        endpoint = list(MODES_AND_PARAMS[category])[index]
-        params = MODES_AND_PARAMS[category][endpoint]   
+        :return: JSON response from the api
+        """
+
+        key, ttl, cached = self._cached(endpoint, params, event, fresh)
+        if cached is not None:
+            return cached
+
+        url = self._format_url(endpoint.path, params)
+
+        def fetch():
+            if event is not None:
+                event.coalesced = False
+            return self._fetched(self._make_request(url, event), endpoint, key, ttl, event)
+
+        if self._flights is None:
+            return fetch()
+        if event is not None:
+            # Left set only when another caller's request answers this one
+            event.coalesced = True
+
+        return self._flights.do(url, fetch)
+
+    def _decode(self, raw:bytes, endpoint:Endpoint):
+        """
+        Internal function that shapes a raw response as per `response_mode`
+
+        :return: decoded JSON, a `LazyResponse` or a `bigdatacloud.models.Model`
+        """
+
+        if self.response_mode == 'lazy':
+            return LazyResponse(raw)
+
+        if self.response_mode == 'model' and endpoint.name in MODELS:
+            return MODELS[endpoint.name].from_response(raw, keep_raw=self.keep_raw)
+
+        return loads(raw)
+
+    def _local(self, resp):
+        """
+        Internal function that returns a response answered locally, 
+        the way endpoint methods return theirs
+        """
+
+        return resp
+
+    @property
+    def coalesced(self):
+        """Number of calls answered by an identical request already in flight"""
+
+        return self._flights.coalesced if self._flights is not None else 0
+
+    def _make_request(self, url, event:RequestEvent=None):
+        """
+        Internal function that makes a GET request to the API, retrying
+        throttled and failed requests as the scheduler decides. `event`,
+        when given, records the attempts, their timing, status and size
+
+        :return: raw JSON response from the api
+        """
+
+        scheduler = self.scheduler
 
-        if 'key' in params:
-            values = list(args)
-            values.append(self.api_key)
-        else:
-            values = args
+        for attempt in count():
+            wait = scheduler.reserve()
+            if wait:
+                time.sleep(wait)
+            if event is not None:
+                event.attempts, event.wait = attempt + 1, event.wait + wait
+                started = time.perf_counter()
 
-        qp = dict(zip(params, values))
+            try:
+                resp = self._session.get(url, timeout=scheduler.timeout)
+            except (ConnectionError, Timeout):
+                delay = scheduler.retry_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                if event is not None:
+                    # `elapsed` runs until the headers are parsed, the body being read after
+                    elapsed = resp.elapsed.total_seconds()
+                    event.response += elapsed
+                    event.transfer += max(time.perf_counter() - started - elapsed, 0)
+                    event.status, event.bytes = resp.status_code, len(resp.content)
 
-        return endpoint, qp
+                delay = scheduler.retry_delay(attempt, resp.status_code, resp.headers.get('Retry-After'))
+                if delay is None:
+                    resp.raise_for_status()
+                    return resp.content
+
+            if event is not None:
+                event.wait += delay
+            time.sleep(delay)
+
+    def _map_unique(self, method, param:str, values, workers:int, **kwargs):
+        """
+        Internal function that calls `method` once per distinct value of `param`
+        over a thread pool sharing the client's connection pool
+
+        :return: list of results in the order of `values`. A failed lookup 
+                 holds the raised exception in place of its result
+        """
+
+        unique = list(dict.fromkeys(values))
+
+        def call(value):
+            try:
+                return method(**{param: value}, **kwargs)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = dict(zip(unique, pool.map(call, unique)))
+
+        return [results[value] for value in values]
+
+    def _iter_pages(self, method, list_key:str, offset:int, batch_size:int, **kwargs):
+        """
+        Internal function that streams the records of a paginated api, fetching 
+        the next page in the background while the current one is consumed.
+        At most two pages are held in memory at a time
+
+        :return: generator of records
+        """
+
+        def fetch(page_offset):
+            return method(batch_size=batch_size, offset=page_offset, **kwargs).get(list_key, [])
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            upcoming = executor.submit(fetch, offset)
+
+            while upcoming is not None:
+                page = upcoming.result()
+                offset += len(page)
+                upcoming = executor.submit(fetch, offset) if len(page) == batch_size else None
+
+                yield from page
+                del page
+        finally:
+            executor.shutdown(wait=False)
 
     @validate_args
     def ip_geolocation(self, *, ip:str='', lang:str='en'):
@@ -87,13 +408,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English        
         """
 
-        category = 'ip_geolocation'
-        index = 0
-
-        endpoint, params = self._retrieve_url_params(category, index, ip, lang)
-        url = self._format_url(endpoint, params)
-        
-        return self._make_request(url)
+        return self._call('ip_geolocation', ip, lang)
 
     @validate_args
     def ip_geolocation_full(self, *, ip:str='', lang:str='en'):
@@ -104,13 +419,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English            
         """        
 
-        category = 'ip_geolocation'
-        index = 1
-
-        endpoint, params = self._retrieve_url_params(category, index, ip, lang)
-        url = self._format_url(endpoint, params)
-        
-        return self._make_request(url)
+        return self._call('ip_geolocation_full', ip, lang)
 
     @validate_args
     def ip_geolocation_with_confidence(self, *, ip:str='', lang:str='en'):
@@ -121,13 +430,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English            
         """        
 
-        category = 'ip_geolocation'
-        index = 2
-
-        endpoint, params = self._retrieve_url_params(category, index, ip, lang)
-        url = self._format_url(endpoint, params)
-        
-        return self._make_request(url)
+        return self._call('ip_geolocation_with_confidence', ip, lang)
 
     @validate_args
     def reverse_geocode_client(self, *, latitude:str='', longitude:str='', lang:str='en'):
@@ -141,13 +444,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English    
         """
 
-        index = 0
-        category = 'geocoding'
-
-        endpoint, params = self._retrieve_url_params(category, index, latitude, longitude, lang)
-        url = self._format_url(endpoint, params)
-        
-        return self._make_request(url)
+        return self._call('reverse_geocode_client', latitude, longitude, lang)
 
     @validate_args
     def reverse_geocode(self, *, latitude:str='', longitude:str='', lang:str='en'):
@@ -162,25 +459,13 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English            
         """        
 
-        index = 1
-        category = 'geocoding'
-
-        endpoint, params = self._retrieve_url_params(category, index, latitude, longitude, lang)
-        url = self._format_url(endpoint, params)
-        
-        return self._make_request(url)
+        return self._call('reverse_geocode', latitude, longitude, lang)
 
     @validate_args
     def client_info(self):
         """Get client information of the initiator of the request to the api"""        
 
-        index = 0
-        category = 'client_info'
-
-        endpoint, params = self._retrieve_url_params(category, index)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('client_info')
 
     @validate_args
     def am_i_roaming(self, *, latitude:str='', longitude:str=''):
@@ -193,13 +478,7 @@ class BigDataCloud:
                             Expected values are in [-180, 180] range.              
         """          
 
-        index = 1
-        category = 'client_info'
-
-        endpoint, params = self._retrieve_url_params(category, index, latitude, longitude)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('am_i_roaming', latitude, longitude)
 
     @validate_args
     def user_agent_info(self, *, user_agent_raw:str=''):
@@ -209,13 +488,7 @@ class BigDataCloud:
         :param: :user_agent_raw: User agent string
         """  
 
-        index = 2
-        category = 'client_info'
-
-        endpoint, params = self._retrieve_url_params(category, index, user_agent_raw)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('user_agent_info', user_agent_raw)
 
     @validate_args
     def client_ip(self):
@@ -224,13 +497,7 @@ class BigDataCloud:
         It also offers proxy detection by examining the X-Forwarded-For (XFF) HTTP header field
         """  
 
-        index = 3
-        category = 'client_info'
-
-        endpoint, params = self._retrieve_url_params(category, index)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('client_ip')
 
     @validate_args
     def timezone_by_ip(self, *, ip:str='', utc_reference:int=0):
@@ -243,13 +510,7 @@ class BigDataCloud:
                                 When omitted or invalid, the current time is assumed        
         """  
 
-        index = 0
-        category = 'timezone'
-
-        endpoint, params = self._retrieve_url_params(category, index, ip, utc_reference)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('timezone_by_ip', ip, utc_reference)
 
     @validate_args    
     def timezone_info(self, *, timezone_id:str='', utc_reference:int=0):
@@ -263,13 +524,7 @@ class BigDataCloud:
                         When omitted or invalid, the current time is assumed
         """          
 
-        index = 1
-        category = 'timezone'
-
-        endpoint, params = self._retrieve_url_params(category, index, timezone_id, utc_reference)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('timezone_info', timezone_id, utc_reference)
 
     @validate_args
     def timezone_by_location(self, *, latitude:str='', longitude:str='', utc_reference:int=0):
@@ -286,13 +541,7 @@ class BigDataCloud:
                                 When omitted or invalid, the current time is assumed
         """  
 
-        index = 2
-        category = 'timezone'
-
-        endpoint, params = self._retrieve_url_params(category, index, latitude, longitude, utc_reference)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('timezone_by_location', latitude, longitude, utc_reference)
 
     @validate_args
     def country_by_ip(self, *, ip:str='', lang:str='en'):
@@ -304,13 +553,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English    
         """
 
-        index = 0
-        category = 'country_info'
-
-        endpoint, params = self._retrieve_url_params(category, index, ip, lang)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('country_by_ip', ip, lang)
 
     @validate_args
     def country_info(self, *, code:str='', lang:str='en'):
@@ -326,13 +569,12 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format.
         """
 
-        index = 1
-        category = 'country_info'
-
-        endpoint, params = self._retrieve_url_params(category, index, code, lang)
-        url = self._format_url(endpoint, params)
+        if self.countries is not None:
+            raw = self.countries.raw(code, lang)
+            if raw is not None:
+                return self._local(self._decode(raw, ENDPOINTS['country_info']))
 
-        return self._make_request(url)
+        return self._call('country_info', code, lang)
 
     @validate_args
     def asn_info(self, *, asn:str='', lang:str='en'):
@@ -344,13 +586,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format.
         """
 
-        index = 0
-        category = 'asn_info'
-
-        endpoint, params = self._retrieve_url_params(category, index, asn, lang)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('asn_info', asn, lang)
 
     @validate_args
     def asn_info_full(self, *, asn:str='', lang:str='en'):
@@ -363,13 +599,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format.   
         """
 
-        index = 1
-        category = 'asn_info'
-
-        endpoint, params = self._retrieve_url_params(category, index, asn, lang)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('asn_info_full', asn, lang)
 
     @validate_args
     def tor_exit_nodes_list(self, *, batch_size:int=1, offset:int=0, lang:str='en'):
@@ -381,25 +611,13 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format.         
         """
 
-        index = 0
-        category = 'insights'
-
-        endpoint, params = self._retrieve_url_params(category, index, batch_size, offset, lang)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('tor_exit_nodes_list', batch_size, offset, lang)
 
     @validate_args
     def address_space_stats_ipv4(self):
         """Returns most recent IPv4 address space registration and BGP """
 
-        index = 1
-        category = 'insights'
-
-        endpoint, params = self._retrieve_url_params(category, index)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('address_space_stats_ipv4')
 
     @validate_args
     def network_by_ip(self, *, ip:str='', lang:str='en'):
@@ -411,13 +629,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English         
         """
 
-        index = 0
-        category = 'network'
-
-        endpoint, params = self._retrieve_url_params(category, index, ip, lang)
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('network_by_ip', ip, lang)
 
     @validate_args
     def prefixes_list(self, *, bogons_only:bool=False, batch_size:int=1, offset:int=0, lang:str='en'):
@@ -430,13 +642,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format.        
         """
 
-        index = 1
-        category = 'network'
-
-        endpoint, params = self._retrieve_url_params(category, index, bogons_only, batch_size, offset, lang) 
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('prefixes_list', bogons_only, batch_size, offset, lang)
 
     @validate_args
     def network_by_cidr(self, *, cidr:str='', depth_limit:int=1,  bogons_only:bool=False, asn:str='', lang:str='en'):
@@ -451,13 +657,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format.        
         """
 
-        index = 2
-        category = 'network'
-
-        endpoint, params = self._retrieve_url_params(category, index, cidr, depth_limit, bogons_only, asn, lang) 
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('network_by_cidr', cidr, depth_limit, bogons_only, asn, lang)
 
     @validate_args
     def phone_number_validate_by_ip(self, *, number:str='', ip:str='', lang:str='en'):
@@ -470,13 +670,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English      
         """
 
-        index = 0
-        category = 'phone_number'
-
-        endpoint, params = self._retrieve_url_params(category, index, number, ip, lang) 
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('phone_number_validate_by_ip', number, ip, lang)
 
     @validate_args
     def phone_number_validate(self, *, number:str='', country_code:str='', lang:str='en'):
@@ -492,13 +686,7 @@ class BigDataCloud:
         :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English          
         """
 
-        index = 1
-        category = 'phone_number'
-
-        endpoint, params = self._retrieve_url_params(category, index, number, country_code, lang) 
-        url = self._format_url(endpoint, params)
-
-        return self._make_request(url)
+        return self._call('phone_number_validate', number, country_code, lang)
 
     @validate_args
     def email_verify(self, *, email_address:str=''):
@@ -508,14 +696,143 @@ class BigDataCloud:
 
         :param: :email_address: The email address to be verified.
         """
-        index = 0
-        category = 'email_validation'
 
-        endpoint, params = self._retrieve_url_params(category, index, email_address) 
-        url = self._format_url(endpoint, params)
+        return self._call('email_verify', email_address)
+
+    def ip_geolocation_many(self, ips, *, lang:str='en', workers:int=8):
+        """
+        Get IP Geolocation data for many IP addresses concurrently. 
+        Duplicate addresses are looked up once.
+
+        :param: :ips: Iterable of IPv4 IP addresses in a string format
+        :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English
+        :param: :workers: Number of concurrent lookups. Keep `pool_maxsize` at least as large
+
+        :return: list of results in the order of `ips`. A failed lookup holds its exception instead
+        """
+
+        return self._map_unique(self.ip_geolocation, 'ip', list(ips), workers, lang=lang)
+
+    def country_by_ip_many(self, ips, *, lang:str='en', workers:int=8):
+        """
+        Get country information for many IP addresses concurrently. 
+        Duplicate addresses are looked up once.
+
+        :param: :ips: Iterable of IPv4 IP addresses in a string format
+        :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English
+        :param: :workers: Number of concurrent lookups. Keep `pool_maxsize` at least as large
+
+        :return: list of results in the order of `ips`. A failed lookup holds its exception instead
+        """
+
+        return self._map_unique(self.country_by_ip, 'ip', list(ips), workers, lang=lang)
+
+    def network_by_ip_many(self, ips, *, lang:str='en', workers:int=8):
+        """
+        Get network information for many IP addresses concurrently. 
+        Duplicate addresses are looked up once.
+
+        :param: :ips: Iterable of IPv4 IP addresses in a string format
+        :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English
+        :param: :workers: Number of concurrent lookups. Keep `pool_maxsize` at least as large
+
+        :return: list of results in the order of `ips`. A failed lookup holds its exception instead
+        """
+
+        return self._map_unique(self.network_by_ip, 'ip', list(ips), workers, lang=lang)
+
+    def timezone_by_ip_many(self, ips, *, utc_reference:int=0, workers:int=8):
+        """
+        Get time zone information for many IP addresses concurrently. 
+        Duplicate addresses are looked up once.
+
+        :param: :ips: Iterable of IPv4 IP addresses in a string format
+        :param: :utc_reference: UTC time reference in Unix Time Seconds format. 
+                                When omitted or invalid, the current time is assumed
+        :param: :workers: Number of concurrent lookups. Keep `pool_maxsize` at least as large
+
+        :return: list of results in the order of `ips`. A failed lookup holds its exception instead
+        """
+
+        return self._map_unique(self.timezone_by_ip, 'ip', list(ips), workers, utc_reference=utc_reference)
+
+    def email_verify_many(self, addresses, *, workers:int=8):
+        """
+        Verifies many email addresses, sending at most one address per domain.
+        Addresses of invalid syntax are rejected locally, and the others are
+        answered from the facts of their domain, cached in `email_domains`
+
+        :param: :addresses: Iterable of email addresses
+        :param: :workers: Number of concurrent lookups. Keep `pool_maxsize` at least as large
+
+        :return: list of results in the order of `addresses`. A failed lookup holds its exception instead
+        """
+
+        batch = self.email_domains.batch(addresses)
+        sent = batch.representatives()
+
+        while sent:
+            batch.absorb(self._map_unique(self.email_verify, 'email_address', sent, workers))
+            sent = batch.representatives()
+
+        return batch.results()
+
+    def user_agent_info_many(self, user_agents, *, workers:int=8):
+        """
+        Parses many user agent strings, sending only those not in `user_agents`
+        to the api, concurrently and once each. The rest are answered from it
+
+        :param: :user_agents: Iterable of raw user agent strings
+        :param: :workers: Number of concurrent lookups. Keep `pool_maxsize` at least as large
+
+        :return: list of results in the order of `user_agents`. A failed lookup holds its exception instead
+        """
+
+        batch = self.user_agents.batch(user_agents)
+        return batch.results(self._map_unique(self.user_agent_info, 'user_agent_raw', batch.unseen, workers))
+
+    def prewarm_user_agents(self, path:str, *, workers:int=8):
+        """
+        Parses the user agent strings of a file, one per line, into `user_agents`,
+        e.g. the most common ones seen in production, at startup
+
+        :return: number of user agents cached
+        """
+
+        results = self.user_agent_info_many(read_user_agents(path), workers=workers)
+        return sum(not isinstance(result, Exception) for result in results)
+
+    def iter_tor_exit_nodes(self, *, offset:int=0, batch_size:int=1000, lang:str='en'):
+        """
+        Streams every active TOR exit node, page by page, prefetching the next page
+        in the background. To resume an interrupted walk, pass the starting `offset`
+        plus the number of nodes already consumed
+
+        :param: :offset: Number of entries to skip
+        :param: :batch_size: Nodes fetched per request. Maximum value = 1000
+        :param: :lang: Preferred language for locality names in ISO 639-1 format.
+
+        :return: generator of nodes
+        """
+
+        return self._iter_pages(self.tor_exit_nodes_list, 'nodes', offset, batch_size, lang=lang)
+
+    def iter_prefixes(self, *, bogons_only:bool=False, offset:int=0, batch_size:int=1000, lang:str='en'):
+        """
+        Streams every IPv4 address space route/prefix, page by page, prefetching the next
+        page in the background. To resume an interrupted walk, pass the starting `offset`
+        plus the number of prefixes already consumed
+
+        :param: :bogons_only: Limit to bogon routes only or not. Default (False) – no limit
+        :param: :offset: Number of entries to skip
+        :param: :batch_size: Prefixes fetched per request. Maximum value = 1000
+        :param: :lang: Preferred language for locality names in ISO 639-1 format.
+
+        :return: generator of prefixes
+        """
+
+        return self._iter_pages(self.prefixes_list, 'prefixes', offset, batch_size, bogons_only=bogons_only, lang=lang)
 
-        return self._make_request(url)
-    
     def __repr__(self):
         """`eval()`-able string representation"""
 
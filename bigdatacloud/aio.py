@@ -0,0 +1,323 @@
+import time
+import asyncio
+from itertools import count
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from . import BigDataCloud
+from .endpoints import Endpoint
+from .scheduler import RequestScheduler
+from .singleflight import AsyncSingleFlight
+from .instrumentation import RequestEvent
+from .emails import EmailDomainCache
+from .useragents import UserAgentCache, read_user_agents
+
+
+class AsyncBigDataCloud(BigDataCloud):
+    """
+    Asyncio client for the BigDataCloud APIs. Offers the same methods as `BigDataCloud`,
+    each returning an awaitable instead of the response. Requires `aiohttp`
+
+    :param: :api_key: API key needed for authorization
+    :param: :max_concurrency: Maximum number of requests in flight at any time
+    :param: :max_connections: Maximum number of pooled connections. Defaults to `max_concurrency`
+    :param: :keepalive_timeout: Seconds an idle connection is kept alive for reuse
+    :param: :cache: Optional response cache, a `bigdatacloud.cache.BaseCache` such as `MemoryCache()`.
+                    Caches that may block, such as `SQLiteCache`, are read and written in a thread
+    :param: :cache_ttls: Cache lifetimes in seconds keyed by api category or endpoint
+    :param: :scheduler: `bigdatacloud.scheduler.RequestScheduler` setting timeouts, retries and rate limit
+    :param: :coalesce: Whether concurrent identical requests share a single api call, and its response
+    :param: :validate: Whether arguments are validated before querying the api. 
+                       Turn off for trusted, pre-sanitized input
+    :param: :response_mode: 'json' to return decoded responses, 'lazy' to return 
+                            `bigdatacloud.response.LazyResponse` objects, or 'model' to 
+                            return the compact results of `bigdatacloud.models`
+    :param: :keep_raw: Whether results of `response_mode='model'` keep the raw response
+    :param: :hooks: Callables passed a `bigdatacloud.instrumentation.RequestEvent` after every
+                    call. Unlike `BigDataCloud`, DNS and connection times are reported too
+    :param: :countries: Optional `bigdatacloud.countries.CountrySnapshot` answering `country_info` locally
+    :param: :email_domains: `bigdatacloud.emails.EmailDomainCache` of the domains `email_verify_many` has verified
+    :param: :user_agents: `bigdatacloud.useragents.UserAgentCache` of the user agents `user_agent_info_many` has parsed
+
+    Use as an async context manager, or await `close()` when done
+    """
+
+    _SINGLE_FLIGHT = AsyncSingleFlight
+
+    def __init__(self, api_key:str='', *, max_concurrency:int=100, max_connections:int=0, keepalive_timeout:float=30,
+                 cache=None, cache_ttls:dict=None, scheduler:RequestScheduler=None, coalesce:bool=True,
+                 validate:bool=True, response_mode:str='json', keep_raw:bool=False, hooks=None, countries=None,
+                 email_domains:EmailDomainCache=None, user_agents:UserAgentCache=None):
+        if aiohttp is None:
+            raise ImportError("AsyncBigDataCloud requires `aiohttp`. Install it with `pip install aiohttp`")
+
+        self._setup(api_key, cache, cache_ttls, scheduler, coalesce, validate, response_mode, keep_raw, hooks,
+                    countries, email_domains, user_agents)
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections or max_concurrency
+        self.keepalive_timeout = keepalive_timeout
+        self._session = None
+        self._semaphore = None
+
+    def _get_session(self):
+        """
+        Internal function that lazily creates the session, as it
+        has to be created from within a running event loop
+        """
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                             keepalive_timeout=self.keepalive_timeout)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.scheduler.connect_timeout,
+                                            sock_read=self.scheduler.read_timeout)
+            trace_configs = [self._trace_config()] if self.hooks else []
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=trace_configs)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        return self._session
+
+    @staticmethod
+    def _trace_config():
+        """
+        Internal function that builds the aiohttp tracing adding DNS and connection 
+        times to the `RequestEvent` passed as `trace_request_ctx`
+        """
+
+        def timer(phase:str, end:bool):
+            async def on_signal(session, context, params):
+                event = context.trace_request_ctx
+                if event is None:
+                    return
+                if not end:
+                    setattr(context, phase, time.perf_counter())
+                else:
+                    setattr(event, phase, (getattr(event, phase) or 0) + time.perf_counter() - getattr(context, phase))
+            return on_signal
+
+        config = aiohttp.TraceConfig()
+        config.on_dns_resolvehost_start.append(timer('dns', False))
+        config.on_dns_resolvehost_end.append(timer('dns', True))
+        config.on_connection_create_start.append(timer('connect', False))
+        config.on_connection_create_end.append(timer('connect', True))
+
+        return config
+
+    async def _local(self, resp):
+        return resp
+
+    async def _cache_io(self, func, *args):
+        """
+        Internal function that calls `func`, which reads or writes the cache, in
+        the loop's default executor if the cache may block, e.g. on a SQLite lock
+        """
+
+        if self.cache is None or not self.cache.blocking:
+            return func(*args)
+
+        return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    async def _traced_request(self, endpoint:Endpoint, params:dict, fresh:bool=False):
+        """
+        Internal function that makes the request, then reports it to the hooks
+
+        :return: JSON response from the api
+        """
+
+        event = self._start_event(endpoint, params)
+        started = time.perf_counter()
+
+        try:
+            return await self._request(endpoint, params, event, fresh)
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            self._finish_event(event, started)
+
+    async def _request(self, endpoint:Endpoint, params:dict, event:RequestEvent=None, fresh:bool=False):
+        """
+        Internal function that answers a request from the cache when 
+        possible, or joins an identical request already in flight, 
+        querying the api otherwise. `event`, when given, records which
+        of them answered, and the timing of any request to the api.
+        `fresh` skips the cache lookup
+
+        :return: JSON response from the api
+        """
+
+        key, ttl, cached = await self._cache_io(self._cached, endpoint, params, event, fresh)
+        if cached is not None:
+            return cached
+
+        url = self._format_url(endpoint.path, params)
+
+        async def fetch():
+            if event is not None:
+                event.coalesced = False
+            raw = await self._make_request(url, event)
+            if key is None:
+                return self._fetched(raw, endpoint, key, ttl, event)
+            return await self._cache_io(self._fetched, raw, endpoint, key, ttl, event)
+
+        if self._flights is None:
+            return await fetch()
+        if event is not None:
+            # Left set only when another caller's request answers this one
+            event.coalesced = True
+
+        return await self._flights.do(url, fetch)
+
+    async def _make_request(self, url, event:RequestEvent=None):
+        """
+        Internal function that makes a GET request to the API, retrying
+        throttled and failed requests as the scheduler decides. `event`,
+        when given, records the attempts, their timing, status and size
+
+        :return: raw JSON response from the api
+        """
+
+        session = self._get_session()
+        scheduler = self.scheduler
+
+        for attempt in count():
+            wait = scheduler.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+            if event is not None:
+                event.attempts, event.wait = attempt + 1, event.wait + wait
+
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    if event is not None:
+                        opening = (event.dns or 0) + (event.connect or 0)
+                    async with session.get(url, trace_request_ctx=event) as resp:
+                        delay = scheduler.retry_delay(attempt, resp.status, resp.headers.get('Retry-After'))
+                        if event is None:
+                            if delay is None:
+                                resp.raise_for_status()
+                                return await resp.read()
+                        else:
+                            headers = time.perf_counter()
+                            raw = await resp.read()
+                            # Less the DNS and connection times of this attempt, reported apart
+                            event.response += headers - started - ((event.dns or 0) + (event.connect or 0) - opening)
+                            event.transfer += time.perf_counter() - headers
+                            event.status, event.bytes = resp.status, len(raw)
+                            if delay is None:
+                                resp.raise_for_status()
+                                return raw
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = scheduler.retry_delay(attempt)
+                if delay is None:
+                    raise
+
+            if event is not None:
+                event.wait += delay
+            await asyncio.sleep(delay)
+
+    async def _map_unique(self, method, param:str, values, workers:int, **kwargs):
+        """
+        Internal function that awaits `method` once per distinct value of `param`.
+        `workers` is unused, as concurrency is capped by `max_concurrency`
+
+        :return: list of results in the order of `values`. A failed lookup 
+                 holds the raised exception in place of its result
+        """
+
+        unique = list(dict.fromkeys(values))
+
+        async def call(value):
+            return await method(**{param: value}, **kwargs)
+
+        responses = await asyncio.gather(*(call(value) for value in unique), return_exceptions=True)
+        results = dict(zip(unique, responses))
+
+        return [results[value] for value in values]
+
+    async def email_verify_many(self, addresses, *, workers:int=8):
+        """
+        Verifies many email addresses, awaiting at most one address per domain.
+        See `BigDataCloud.email_verify_many`
+        """
+
+        batch = self.email_domains.batch(addresses)
+        sent = batch.representatives()
+
+        while sent:
+            batch.absorb(await self._map_unique(self.email_verify, 'email_address', sent, workers))
+            sent = batch.representatives()
+
+        return batch.results()
+
+    async def user_agent_info_many(self, user_agents, *, workers:int=8):
+        """
+        Parses many user agent strings, awaiting only those not in `user_agents`.
+        See `BigDataCloud.user_agent_info_many`
+        """
+
+        batch = self.user_agents.batch(user_agents)
+        return batch.results(await self._map_unique(self.user_agent_info, 'user_agent_raw', batch.unseen, workers))
+
+    async def prewarm_user_agents(self, path:str, *, workers:int=8):
+        """
+        Parses the user agent strings of a file, one per line, into `user_agents`
+
+        :return: number of user agents cached
+        """
+
+        results = await self.user_agent_info_many(read_user_agents(path), workers=workers)
+        return sum(not isinstance(result, Exception) for result in results)
+
+    async def _iter_pages(self, method, list_key:str, offset:int, batch_size:int, **kwargs):
+        """
+        Internal function that streams the records of a paginated api, fetching 
+        the next page in the background while the current one is consumed.
+        At most two pages are held in memory at a time
+
+        :return: async generator of records
+        """
+
+        async def fetch(page_offset):
+            resp = await method(batch_size=batch_size, offset=page_offset, **kwargs)
+            return resp.get(list_key, [])
+
+        upcoming = asyncio.ensure_future(fetch(offset))
+        try:
+            while upcoming is not None:
+                page = await upcoming
+                offset += len(page)
+                upcoming = asyncio.ensure_future(fetch(offset)) if len(page) == batch_size else None
+
+                for record in page:
+                    yield record
+                del page
+        finally:
+            if upcoming is not None:
+                upcoming.cancel()
+
+    async def close(self):
+        """Closes the underlying session and releases its pooled connections"""
+
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def __enter__(self):
+        raise TypeError("Use `async with` with AsyncBigDataCloud")
+
+    def __exit__(self, *exc):
+        pass
+
+    def __repr__(self):
+        """`eval()`-able string representation"""
+
+        return f"AsyncBigDataCloud(api_key='{self.api_key}')"
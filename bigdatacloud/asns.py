@@ -0,0 +1,304 @@
+import os, json, time, zlib, struct, warnings, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import CACHE_TTLS
+from .response import LazyResponse, loads
+
+
+_MAGIC = b'BDCASN1\n'
+# Record of an ASN: number, time fetched, length of its compressed JSON
+_RECORD = struct.Struct('<IdI')
+
+
+def normalize_asn(asn):
+    """
+    :return: the integer of an AS number written 'AS123', 'ASN123', '123' or 123
+    """
+
+    if isinstance(asn, int) and not isinstance(asn, bool):
+        number = asn
+    else:
+        text = str(asn).strip().upper()
+        for prefix in ('ASN', 'AS'):
+            if text.startswith(prefix):
+                text = text[len(prefix):]
+                break
+        if not text.isdigit():
+            raise ValueError(f"{asn} is not a valid AS number")
+        number = int(text)
+
+    if not 0 <= number < 2 ** 32:
+        raise ValueError(f"{asn} is not a valid AS number")
+
+    return number
+
+
+class ASNStore:
+    """
+    Local store of `asn_info` (or `asn_info_full`) responses, keyed by AS number
+    however written, and kept as compressed JSON. The `hot` most recently used
+    are also kept decoded.
+
+    `get_asn` never waits for the api: an ASN not stored yet returns None, and one
+    older than `max_age` returns its stored response, both being fetched in the
+    background, at most `workers` at a time. Background failures are counted in
+    `failures`, the last one kept in `last_error`.
+
+    Stored ASNs are re-fetched past the client's response cache
+
+    :param: :client: A `BigDataCloud` instance, with `response_mode` 'json' or 'lazy'
+    :param: :full: Whether to store `asn_info_full` rather than `asn_info` responses
+    :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English
+    :param: :max_age: Seconds after which a stored response is refreshed
+    :param: :workers: Maximum number of concurrent lookups
+    :param: :hot: Number of responses kept decoded
+    """
+
+    def __init__(self, client, *, full:bool=False, lang:str='en', max_age:float=CACHE_TTLS['asn_info'],
+                 workers:int=8, hot:int=1024):
+        if client is not None and client.response_mode == 'model':
+            raise ValueError("ASNs are stored from full responses, not from `response_mode='model'`")
+
+        self.client = client
+        self.full = full
+        self.lang = lang
+        self.max_age = max_age
+        self.workers = workers
+        self.hot = hot
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.failures = 0
+        self.last_error = None
+        self._entries = {}
+        self._decoded = OrderedDict()
+        self._fetching = set()
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _fetch(self, number:int):
+        """
+        Internal function that fetches an ASN and stores its response
+
+        :return: the decoded response
+        """
+
+        try:
+            # A stored ASN may also be in the response cache, as old as it
+            resp = self.client._call('asn_info_full' if self.full else 'asn_info', f"AS{number}", self.lang,
+                                     fresh=number in self._entries)
+        finally:
+            with self._lock:
+                self._fetching.discard(number)
+
+        raw = resp.raw if isinstance(resp, LazyResponse) else json.dumps(resp, separators=(',', ':')).encode()
+        resp = resp.json() if isinstance(resp, LazyResponse) else resp
+
+        with self._lock:
+            self._entries[number] = (time.time(), zlib.compress(raw))
+            self._remember(number, resp)
+
+        return resp
+
+    def _remember(self, number:int, resp):
+        self._decoded[number] = resp
+        self._decoded.move_to_end(number)
+        if len(self._decoded) > self.hot:
+            self._decoded.popitem(last=False)
+
+    def _fetch_later(self, number:int):
+        """Internal function that fetches an ASN in the background, unless already being fetched"""
+
+        with self._lock:
+            if number in self._fetching or self.client is None:
+                return
+            self._fetching.add(number)
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers)
+
+        self._pool.submit(self._fetch_quietly, number)
+
+    def _fetch_quietly(self, number:int):
+        """Internal function that fetches an ASN in the background, recording any failure"""
+
+        try:
+            self._fetch(number)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+                self.last_error = e
+            warnings.warn(f"Fetching AS{number} failed: {e!r}", RuntimeWarning)
+
+    def _stored(self, number:int):
+        """
+        :return: (the decoded response, whether it's stale), or (None, False)
+        """
+
+        with self._lock:
+            entry = self._entries.get(number)
+            if entry is None:
+                return None, False
+
+            fetched, blob = entry
+            resp = self._decoded.get(number)
+            if resp is None:
+                resp = loads(zlib.decompress(blob))
+                self._remember(number, resp)
+            else:
+                self._decoded.move_to_end(number)
+
+        return resp, time.time() - fetched > self.max_age
+
+    def _fresh(self, number:int):
+        entry = self._entries.get(number)
+        return entry is not None and time.time() - entry[0] <= self.max_age
+
+    def get_asn(self, asn):
+        """
+        Looks an ASN up in the store, without waiting for the api
+
+        :param: :asn: AS number, e.g. 'AS123', 'ASN123', '123' or 123
+
+        :return: the stored response, or None if the ASN isn't stored yet
+        """
+
+        number = normalize_asn(asn)
+        resp, stale = self._stored(number)
+
+        with self._lock:
+            if resp is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.stale += stale
+
+        if resp is None or stale:
+            self._fetch_later(number)
+
+        return resp
+
+    def asn_info(self, asn):
+        """
+        Looks an ASN up in the store, querying the api if it isn't stored or is stale
+
+        :param: :asn: AS number, e.g. 'AS123', 'ASN123', '123' or 123
+
+        :return: JSON response from the api
+        """
+
+        number = normalize_asn(asn)
+        resp, stale = self._stored(number)
+
+        with self._lock:
+            if resp is not None and not stale:
+                self.hits += 1
+                return resp
+
+            self.misses += 1
+            self._fetching.add(number)
+
+        return self._fetch(number)
+
+    def preload(self, asns, *, workers:int=0):
+        """
+        Fetches many ASNs concurrently, skipping those stored and fresh
+
+        :param: :asns: Iterable of AS numbers, in any of the accepted forms
+        :param: :workers: Number of concurrent lookups. Defaults to the store's `workers`
+
+        :return: list of the ASNs that couldn't be fetched, paired with the raised exception
+        """
+
+        numbers = [number for number in dict.fromkeys(map(normalize_asn, asns)) if not self._fresh(number)]
+
+        def fetch(number):
+            try:
+                self._fetch(number)
+            except Exception as e:
+                return number, e
+
+        with ThreadPoolExecutor(max_workers=workers or self.workers) as pool:
+            return [failure for failure in pool.map(fetch, numbers) if failure is not None]
+
+    def refresh(self, *, workers:int=0):
+        """
+        Re-fetches every stored ASN older than `max_age`
+
+        :return: list of the ASNs that couldn't be fetched, paired with the raised exception
+        """
+
+        now = time.time()
+        with self._lock:
+            stale = [number for number, (fetched, _) in self._entries.items() if now - fetched > self.max_age]
+
+        return self.preload(stale, workers=workers)
+
+    def stats(self):
+        """
+        :return: dict of store statistics
+        """
+
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'stale': self.stale, 'failures': self.failures,
+                    'size': len(self._entries),
+                    'bytes': sum(len(blob) for _, blob in self._entries.values())}
+
+    def save(self, path:str):
+        """Saves the stored responses to disk"""
+
+        with self._lock:
+            entries = list(self._entries.items())
+
+        with open(f"{path}.tmp", 'wb') as f:
+            f.write(_MAGIC)
+            for number, (fetched, blob) in entries:
+                f.write(_RECORD.pack(number, fetched, len(blob)))
+                f.write(blob)
+
+        os.replace(f"{path}.tmp", path)
+
+    def load(self, path:str):
+        """
+        Loads responses previously saved with `save()`, keeping their age
+
+        :return: number of ASNs loaded
+        """
+
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if not data.startswith(_MAGIC):
+            raise ValueError(f"{path} is not an ASN store file")
+
+        offset, entries = len(_MAGIC), {}
+        while offset < len(data):
+            number, fetched, length = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            entries[number] = (fetched, data[offset:offset + length])
+            offset += length
+
+        with self._lock:
+            self._entries.update(entries)
+            for number in entries:
+                self._decoded.pop(number, None)
+
+        return len(entries)
+
+    def close(self):
+        """Waits for background lookups to finish"""
+
+        with self._lock:
+            pool, self._pool = self._pool, None
+
+        if pool is not None:
+            pool.shutdown()
+
+    def __contains__(self, asn):
+        return normalize_asn(asn) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"ASNStore(full={self.full}, size={len(self._entries)})"
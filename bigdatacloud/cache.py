@@ -0,0 +1,270 @@
+import json, time, sqlite3, threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class BaseCache:
+    """
+    Interface of response caches used by `BigDataCloud`. Keys are strings and
+    values the responses of the api, as returned to the caller or, if `raw` 
+    is True, as raw JSON bytes
+    """
+
+    # Whether the cache stores raw JSON bytes rather than the responses themselves
+    raw = False
+    # Whether `get` and `set` may block on I/O, so `AsyncBigDataCloud` calls them in a thread
+    blocking = False
+
+    def get(self, key:str):
+        """
+        Retrieves a cached response
+
+        :return: the response, or its raw JSON bytes, or None when absent or expired
+        """
+        raise NotImplementedError
+
+    def set(self, key:str, value, ttl:float):
+        """Caches a response for `ttl` seconds"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Removes every cached response"""
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        :return: dict of cache statistics
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Releases any resource held by the cache"""
+        pass
+
+
+class MemoryCache(BaseCache):
+    """
+    Thread-safe, size-bounded in-memory response cache. Entries expire after their
+    time-to-live and the least recently used entry is evicted once `maxsize` is reached.
+
+    Cached responses are shared between callers and should be treated as read-only
+
+    :param: :maxsize: Maximum number of responses kept
+    """
+
+    def __init__(self, maxsize:int=10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Retrieves a cached response
+
+        :return: the response, or None when absent or expired
+        """
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+    def set(self, key, value, ttl:float):
+        """Caches a response for `ttl` seconds"""
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Removes every cached response"""
+
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """
+        :return: dict of `hits`, `misses`, `evictions` and current `size`
+        """
+
+        return dict(hits=self.hits, misses=self.misses, evictions=self.evictions, size=len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache(BaseCache):
+    """
+    Persistent response cache stored in a SQLite database in WAL mode, so that
+    several processes on the same host can share it and it survives restarts.
+
+    Expired entries are purged by a background compaction, which also evicts the 
+    entries closest to expiry once the stored responses exceed `max_bytes`.
+    Responses are stored, and retrieved, as raw JSON bytes
+
+    :param: :path: Path to the database file. Created if missing
+    :param: :max_bytes: Maximum size of the stored responses, in bytes
+    :param: :compact_interval: Seconds between background compactions. 0 disables them
+    :param: :timeout: Seconds to wait for a lock held by another process
+    :param: :pool_size: Maximum number of idle connections kept open for reuse.
+                        Connections opened past it, by more concurrent threads, are closed after use
+    """
+
+    raw = True
+    blocking = True
+
+    def __init__(self, path:str, *, max_bytes:int=256 * 1024 * 1024, compact_interval:float=300, timeout:float=5,
+                 pool_size:int=8):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._idle = []
+        self._closed = threading.Event()
+
+        with self._connection() as conn:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS responses "
+                         "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)")
+
+        if compact_interval:
+            thread = threading.Thread(target=self._compact_periodically, args=(compact_interval,), daemon=True)
+            thread.start()
+
+    @contextmanager
+    def _connection(self):
+        """
+        Internal function that lends the calling thread an idle connection, or a new one,
+        and takes it back once done. At most `pool_size` idle connections are kept open,
+        so short-lived threads, e.g. of bulk lookups, don't leave connections behind
+        """
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                self.connections += 1
+
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                keep = not self._closed.is_set() and len(self._idle) < self.pool_size
+                if keep:
+                    self._idle.append(conn)
+                else:
+                    self.connections -= 1
+            if not keep:
+                conn.close()
+
+    def get(self, key:str):
+        with self._connection() as conn:
+            row = conn.execute("SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+
+        with self._lock:
+            if row is None or row[1] < time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return bytes(row[0])
+
+    def set(self, key:str, value, ttl:float):
+        if isinstance(value, bytes):
+            raw = value
+        else:
+            raw = json.dumps(value, separators=(',', ':')).encode()
+
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses (key, value, expires) VALUES (?, ?, ?)",
+                         (key, raw, time.time() + ttl))
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def compact(self):
+        """
+        Purges expired entries, evicts the entries closest to expiry while the stored 
+        responses exceed `max_bytes`, then returns the freed pages to the file system
+        """
+
+        with self._connection() as conn:
+            conn.execute("DELETE FROM responses WHERE expires < ?", (time.time(),))
+
+            count, size = conn.execute("SELECT COUNT(*), TOTAL(LENGTH(key) + LENGTH(value)) FROM responses").fetchone()
+
+            if size > self.max_bytes:
+                excess = int((size - self.max_bytes) / (size / count)) + 1
+                conn.execute("DELETE FROM responses WHERE key IN "
+                             "(SELECT key FROM responses ORDER BY expires LIMIT ?)", (excess,))
+                with self._lock:
+                    self.evictions += excess
+
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def _compact_periodically(self, interval:float):
+        """Internal function that runs the background compaction"""
+
+        while not self._closed.wait(interval):
+            try:
+                self.compact()
+            except sqlite3.OperationalError:
+                # Another process holds the lock, the next run will catch up
+                pass
+
+    def stats(self):
+        """
+        :return: dict of `hits`, `misses`, `evictions` and current `size`
+        """
+
+        with self._connection() as conn:
+            size, = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+
+        return dict(hits=self.hits, misses=self.misses, evictions=self.evictions, size=size)
+
+    def close(self):
+        """Stops the background compaction and closes every connection, those in use once returned"""
+
+        self._closed.set()
+
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.connections -= len(idle)
+
+        for conn in idle:
+            conn.close()
+
+    def __len__(self):
+        return self.stats()['size']
@@ -0,0 +1,213 @@
+"""
+Bulk enrichment of CSV or JSONL files, streamed row by row:
+
+    python -m bigdatacloud ip_geolocation -i visits.csv -o enriched.csv --fields country.isoAlpha2,location.city
+
+Each row is enriched with the response of the endpoint method, its arguments being read
+from the row's columns of the same name (see `--arg` and `--set` otherwise). Rows are
+written in their input order, and memory stays flat however large the input is
+"""
+
+import os
+import csv
+import sys
+import json
+import argparse
+from itertools import islice
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from . import BigDataCloud
+from .cache import MemoryCache, SQLiteCache
+from .endpoints import ENDPOINTS
+from .response import project
+from .scheduler import RequestScheduler
+
+
+def _pairs(values):
+    """Internal function that parses repeated NAME=VALUE options into a dict"""
+
+    pairs = {}
+
+    for value in values or ():
+        name, sep, other = value.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, not {value}")
+        pairs[name] = other
+
+    return pairs
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='bigdatacloud', description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('method', choices=sorted(ENDPOINTS), help="Endpoint method enriching each row")
+    parser.add_argument('-i', '--input', default='-', help="Input file. Defaults to stdin")
+    parser.add_argument('-o', '--output', default='-', help="Output file. Defaults to stdout")
+    parser.add_argument('-f', '--format', choices=('csv', 'jsonl'),
+                        help="Format of the input and output. Guessed from the input's extension, else CSV")
+    parser.add_argument('-a', '--arg', action='append', metavar='ARG=COLUMN',
+                        help="Reads a method argument from a differently named column. Repeatable")
+    parser.add_argument('-s', '--set', action='append', metavar='ARG=VALUE',
+                        help="Passes the same value of a method argument for every row, e.g. lang=fr. Repeatable")
+    parser.add_argument('--fields', help="Comma-separated dotted response fields to keep. Defaults to the whole response")
+    parser.add_argument('--prefix', default='bigdatacloud', help="Name of the added column, or prefix of the added columns")
+    parser.add_argument('--api-key', default=os.environ.get('BIGDATACLOUD_API_KEY', ''),
+                        help="Api key. Defaults to the BIGDATACLOUD_API_KEY environment variable")
+    parser.add_argument('-w', '--workers', type=int, default=8, help="Number of concurrent lookups")
+    parser.add_argument('--cache', help="SQLite cache file, shared between runs. Defaults to an in-memory cache")
+    parser.add_argument('--checkpoint', help="Checkpoint file, from which an interrupted run resumes")
+    parser.add_argument('--checkpoint-every', type=int, default=1000, metavar='ROWS',
+                        help="Number of rows written between checkpoints")
+    parser.add_argument('--rate', type=float, default=0, help="Maximum requests per second. Defaults to no limit")
+    parser.add_argument('--retries', type=int, default=3, help="Number of retries of failed requests")
+
+    return parser
+
+
+def _read_checkpoint(path:str):
+    """
+    :return: (number of input rows done, size of the output then), or (0, 0) without a checkpoint
+    """
+
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return 0, 0
+
+    return checkpoint['rows'], checkpoint.get('offset')
+
+
+def _write_checkpoint(path:str, rows:int, sink):
+    sink.flush()
+    offset = sink.tell() if sink.seekable() else None
+
+    # Written aside then renamed, so an interruption never leaves a torn checkpoint
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump({'rows': rows, 'offset': offset}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+class Enricher:
+    """
+    Enriches a stream of rows through an endpoint method, keeping at most
+    a bounded window of lookups in flight
+
+    :param: :client: A `BigDataCloud` instance
+    :param: :method: Name of the endpoint method
+    :param: :columns: Maps method arguments to the columns they're read from
+    :param: :constants: Method arguments passed for every row
+    :param: :fields: Dotted response fields to keep, or None for the whole response
+    :param: :workers: Number of concurrent lookups
+    """
+
+    def __init__(self, client:BigDataCloud, method:str, *, columns:dict=None, constants:dict=None,
+                 fields:list=None, workers:int=8):
+        args = ENDPOINTS[method].args
+
+        self.method = getattr(client, method)
+        self.constants = constants or {}
+        self.columns = {arg: (columns or {}).get(arg, arg) for arg in args if arg not in self.constants}
+        self.fields = fields
+        self.workers = workers
+
+    def _lookup(self, row:dict):
+        kwargs = dict(self.constants)
+        kwargs.update((arg, row[column]) for arg, column in self.columns.items() if row.get(column) not in (None, ''))
+
+        try:
+            resp = self.method(**kwargs)
+            return (project(resp, self.fields) if self.fields else resp), None
+        except Exception as e:
+            return None, str(e) or type(e).__name__
+
+    def enrich(self, rows):
+        """
+        :return: generator of (`row`, `response`, `error`) in the order of `rows`
+        """
+
+        window = deque()
+        # Enough lookups queued to keep every worker busy, but never the whole input
+        limit = self.workers * 4
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for row in rows:
+                window.append((row, pool.submit(self._lookup, row)))
+
+                while len(window) >= limit or (window and window[0][1].done()):
+                    row, future = window.popleft()
+                    yield (row, *future.result())
+
+            while window:
+                row, future = window.popleft()
+                yield (row, *future.result())
+
+
+def _open(path:str, mode:str):
+    if path == '-':
+        return open((sys.stdin if 'r' in mode else sys.stdout).fileno(), mode, newline='', closefd=False)
+    return open(path, mode, newline='', encoding='utf-8')
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        columns, constants = _pairs(args.arg), _pairs(args.set)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    fmt = args.format or ('jsonl' if args.input.endswith(('.jsonl', '.ndjson')) else 'csv')
+    fields = args.fields.split(',') if args.fields else None
+    skip, offset = _read_checkpoint(args.checkpoint) if args.checkpoint else (0, 0)
+
+    cache = SQLiteCache(args.cache) if args.cache else MemoryCache()
+    scheduler = RequestScheduler(retries=args.retries, rate=args.rate)
+    client = BigDataCloud(args.api_key, pool_maxsize=args.workers, cache=cache, scheduler=scheduler)
+    enricher = Enricher(client, args.method, columns=columns, constants=constants, fields=fields, workers=args.workers)
+
+    with client, _open(args.input, 'r') as source, _open(args.output, 'a' if skip else 'w') as sink:
+        if skip and offset is not None and sink.seekable():
+            # Drops the rows written after the last checkpoint, as they're enriched again
+            sink.truncate(offset)
+
+        if fmt == 'csv':
+            reader = csv.DictReader(source)
+            added = [f"{args.prefix}.{field}" for field in fields] if fields else [args.prefix]
+            writer = csv.DictWriter(sink, fieldnames=list(reader.fieldnames or ()) + added + [f"{args.prefix}.error"],
+                                    extrasaction='ignore')
+            if not skip:
+                writer.writeheader()
+        else:
+            reader = map(json.loads, filter(str.strip, source))
+
+        written = skip
+        try:
+            for row, resp, error in enricher.enrich(islice(reader, skip, None)):
+                if fmt == 'csv':
+                    if fields:
+                        row.update((f"{args.prefix}.{field}", (resp or {}).get(field)) for field in fields)
+                    else:
+                        row[args.prefix] = json.dumps(resp) if resp is not None else None
+                    row[f"{args.prefix}.error"] = error
+                    writer.writerow(row)
+                else:
+                    row[args.prefix] = resp
+                    if error:
+                        row[f"{args.prefix}.error"] = error
+                    sink.write(json.dumps(row, default=str) + '\n')
+
+                written += 1
+                if args.checkpoint and written % args.checkpoint_every == 0:
+                    _write_checkpoint(args.checkpoint, written, sink)
+        except KeyboardInterrupt:
+            if args.checkpoint:
+                _write_checkpoint(args.checkpoint, written, sink)
+            return 130
+
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    return 0
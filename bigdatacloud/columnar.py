@@ -0,0 +1,241 @@
+import math
+from array import array
+from collections import namedtuple
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+Column = namedtuple('Column', 'name field dtype')
+Column.__doc__ = """
+    Column of a batch result
+
+    :param: :name: Name of the column
+    :param: :field: Dotted path of the response field, list items being addressed by index
+    :param: :dtype: 'str', 'float', 'int' or 'bool'
+    """
+
+IP_GEOLOCATION_SCHEMA = (
+    Column('latitude', 'location.latitude', 'float'),
+    Column('longitude', 'location.longitude', 'float'),
+    Column('countryCode', 'country.isoAlpha2', 'str'),
+    Column('subdivision', 'location.isoPrincipalSubdivision', 'str'),
+    Column('city', 'location.city', 'str'),
+    Column('timeZone', 'location.timeZone.ianaTimeId', 'str'),
+    Column('confidence', 'confidence', 'str'),
+)
+
+IP_GEOLOCATION_FULL_SCHEMA = IP_GEOLOCATION_SCHEMA + (
+    Column('asn', 'network.carriers.0.asnNumeric', 'int'),
+    Column('organisation', 'network.organisation', 'str'),
+)
+
+REVERSE_GEOCODE_SCHEMA = (
+    Column('countryCode', 'countryCode', 'str'),
+    Column('subdivision', 'principalSubdivision', 'str'),
+    Column('city', 'city', 'str'),
+    Column('locality', 'locality', 'str'),
+    Column('postcode', 'postcode', 'str'),
+)
+
+FORMATS = ('dict', 'numpy', 'arrow', 'pandas')
+
+
+def _resolve(value, parts):
+    """Internal function that follows a split dotted path through a response"""
+
+    for part in parts:
+        if isinstance(value, Mapping):
+            value = value.get(part)
+        elif isinstance(value, list) and part.isdigit():
+            value = value[int(part)] if int(part) < len(value) else None
+        else:
+            value = getattr(value, part, None)
+
+        if value is None:
+            return None
+
+    return value
+
+
+def _float(value):
+    """Internal function that converts a value to a float, NaN if it isn't a number"""
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _allocate(dtype:str, size:int, fmt:str):
+    """Internal function that preallocates a column, missing values being NaN or None"""
+
+    if fmt == 'dict':
+        return array('d', [math.nan]) * size if dtype == 'float' else [None] * size
+
+    if dtype == 'float' or (dtype == 'int' and fmt == 'numpy'):
+        return numpy.full(size, numpy.nan)
+
+    return numpy.empty(size, dtype=object)
+
+
+def _finish(columns:dict, schema, fmt:str):
+    """Internal function that converts the filled columns to the requested format"""
+
+    if fmt in ('dict', 'numpy'):
+        return columns
+
+    if fmt == 'pandas':
+        return pandas.DataFrame(columns)
+
+    types = dict(str=pyarrow.string(), float=pyarrow.float64(), int=pyarrow.int64(), bool=pyarrow.bool_())
+    dtypes = {column.name: column.dtype for column in schema}
+
+    return pyarrow.table({name: pyarrow.array(values, type=types[dtypes.get(name, 'str')], from_pandas=True)
+                          for name, values in columns.items()})
+
+
+def _key_column(values:list, dtype:str, fmt:str):
+    """Internal function that builds a one-dimensional column of the inputs"""
+
+    if dtype == 'float':
+        values = [_float(value) for value in values]
+        return array('d', values) if fmt == 'dict' else numpy.asarray(values, dtype=float)
+
+    if fmt == 'dict':
+        return values
+
+    column = numpy.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _lookup_columns(method, inputs:list, keys, build_kwargs, schema, fmt:str, workers:int):
+    """
+    Internal function that looks up every distinct input concurrently, writing each
+    response's fields straight into preallocated columns as the response arrives.
+    `keys` are the `Column`s of the inputs themselves, their `field` indexing into each input
+
+    :return: dict of columns in the requested format, with an `error` column
+             holding the error message of any failed lookup
+    """
+
+    if fmt not in FORMATS:
+        raise ValueError(f"`fmt` should be one of {', '.join(FORMATS)}, not {fmt}")
+    if fmt != 'dict' and numpy is None:
+        raise ImportError(f"The '{fmt}' format requires `numpy`")
+    if fmt == 'arrow' and pyarrow is None:
+        raise ImportError("The 'arrow' format requires `pyarrow`")
+    if fmt == 'pandas' and pandas is None:
+        raise ImportError("The 'pandas' format requires `pandas`")
+
+    size = len(inputs)
+    # Whether each column is allocated as floats, which values that aren't numbers are written to as NaN
+    paths = [(column.name, column.field.split('.'), column.dtype == 'float' or (column.dtype == 'int' and fmt == 'numpy'))
+             for column in schema]
+    columns = {key.name: _key_column([value[int(key.field)] for value in inputs] if key.field else inputs,
+                                     key.dtype, fmt) for key in keys}
+    columns.update((column.name, _allocate(column.dtype, size, fmt)) for column in schema)
+    errors = columns['error'] = [None] * size if fmt == 'dict' else numpy.empty(size, dtype=object)
+
+    positions = {}
+    for i, value in enumerate(inputs):
+        positions.setdefault(value, []).append(i)
+
+    def absorb(done):
+        for future in done:
+            rows = positions[pending.pop(future)]
+
+            try:
+                resp = future.result()
+            except Exception as e:
+                for i in rows:
+                    errors[i] = str(e) or type(e).__name__
+                continue
+
+            for name, parts, floating in paths:
+                value = _resolve(resp, parts)
+                if value is None:
+                    continue
+                if floating:
+                    value = _float(value)
+
+                column = columns[name]
+                for i in rows:
+                    column[i] = value
+
+    pending = {}
+    # Enough lookups queued to keep every worker busy, but never the whole input
+    limit = workers * 4
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for value in positions:
+            pending[pool.submit(method, **build_kwargs(value))] = value
+            if len(pending) >= limit:
+                absorb(wait(pending, return_when=FIRST_COMPLETED).done)
+
+        absorb(as_completed(list(pending)))
+
+    return _finish(columns, tuple(keys) + tuple(schema), fmt)
+
+
+def ip_geolocation_columns(client, ips, *, schema=None, fmt:str='dict', full:bool=False, lang:str='en', workers:int=8):
+    """
+    Geolocates many IP addresses concurrently into columns, without building a row per result
+
+    :param: :client: A `BigDataCloud` instance
+    :param: :ips: Iterable of IPv4 addresses, e.g. a list, NumPy array or pandas Series
+    :param: :schema: Tuple of `Column`. Defaults to `IP_GEOLOCATION_SCHEMA`,
+                     or `IP_GEOLOCATION_FULL_SCHEMA` when `full` is True
+    :param: :fmt: 'dict' (lists and arrays), 'numpy' (dict of NumPy arrays), 'arrow' (pyarrow.Table) or 'pandas'
+    :param: :full: Whether to query `ip_geolocation_full`, which includes network details such as the ASN
+    :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English
+    :param: :workers: Number of concurrent lookups. Keep the client's `pool_maxsize` at least as large
+
+    :return: columns in the requested format: `ip`, the columns of the schema, and `error`
+    """
+
+    method = client.ip_geolocation_full if full else client.ip_geolocation
+    schema = schema or (IP_GEOLOCATION_FULL_SCHEMA if full else IP_GEOLOCATION_SCHEMA)
+    keys = (Column('ip', '', 'str'),)
+
+    return _lookup_columns(method, list(ips), keys, lambda ip: dict(ip=ip, lang=lang), schema, fmt, workers)
+
+
+def reverse_geocode_columns(client, coordinates, *, schema=REVERSE_GEOCODE_SCHEMA, fmt:str='dict', lang:str='en', workers:int=8):
+    """
+    Reverse geocodes many coordinates concurrently into columns, without building a row per result
+
+    :param: :client: A `BigDataCloud` instance
+    :param: :coordinates: Iterable of (`latitude`, `longitude`) pairs, given as strings
+    :param: :schema: Tuple of `Column`. Defaults to `REVERSE_GEOCODE_SCHEMA`
+    :param: :fmt: 'dict' (lists and arrays), 'numpy' (dict of NumPy arrays), 'arrow' (pyarrow.Table) or 'pandas'
+    :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English
+    :param: :workers: Number of concurrent lookups. Keep the client's `pool_maxsize` at least as large
+
+    :return: columns in the requested format: `latitude` and `longitude` (as floats),
+             the columns of the schema, and `error`
+    """
+
+    def build_kwargs(pair):
+        latitude, longitude = pair
+        return dict(latitude=latitude, longitude=longitude, lang=lang)
+
+    pairs = [tuple(map(str, pair)) for pair in coordinates]
+    keys = (Column('latitude', '0', 'float'), Column('longitude', '1', 'float'))
+
+    return _lookup_columns(client.reverse_geocode, pairs, keys, build_kwargs, schema, fmt, workers)
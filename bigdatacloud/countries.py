@@ -0,0 +1,206 @@
+import os, json, mmap, struct, threading
+
+from .config import ISO_3166_1_ALPHA_2
+from .response import LazyResponse, loads
+
+
+_MAGIC = b'BDCCTY1\n'
+# Index record of a country: alpha-2, alpha-3, numeric code, offset and length of its JSON
+_RECORD = struct.Struct('<2s3sHII')
+_COUNT = struct.Struct('<I')
+
+
+class _Table:
+    """A memory-mapped snapshot file of one language"""
+
+    __slots__ = ('file', 'data', 'codes')
+
+    def __init__(self, path:str):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.data[:len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a country snapshot file")
+
+        count, = _COUNT.unpack_from(self.data, len(_MAGIC))
+        start = len(_MAGIC) + _COUNT.size
+        self.codes = {}
+
+        for i in range(count):
+            alpha2, alpha3, numeric, offset, length = _RECORD.unpack_from(self.data, start + i * _RECORD.size)
+            span = (offset, length)
+            self.codes[alpha2.decode()] = span
+            if alpha3.strip(b'\0'):
+                self.codes[alpha3.decode()] = span
+            if numeric:
+                self.codes[str(numeric)] = span
+
+    def get(self, code:str):
+        span = self.codes.get(code)
+        if span is None:
+            return None
+
+        offset, length = span
+        return self.data[offset:offset + length]
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+def _normalize(code):
+    """:return: a country code as keyed in the snapshot, e.g. 'IE', 'IRL' or '372'"""
+
+    code = str(code).strip().upper()
+    return str(int(code)) if code.isdigit() else code
+
+
+class CountrySnapshot:
+    """
+    Local snapshot of `country_info` for every country, stored as one compact
+    file per language under `directory`. Each file is memory-mapped the first
+    time its language is looked up, and only the countries asked for are decoded.
+
+    Countries are looked up by ISO 3166-1 alpha-2, alpha-3 or numeric code.
+    Pass the snapshot to `BigDataCloud(countries=...)` to have `country_info`
+    answered from it
+
+    :param: :directory: Directory of the snapshot files
+    """
+
+    def __init__(self, directory:str):
+        self.directory = directory
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def path(self, lang:str='en'):
+        """:return: path of the snapshot file of a language"""
+
+        return os.path.join(self.directory, f"country-info.{lang}.bdc")
+
+    def build(self, client, *, lang:str='en', codes=ISO_3166_1_ALPHA_2, workers:int=8):
+        """
+        Fetches every country in one language from the api, past the client's cache and
+        `countries`, and saves them, replacing any previous snapshot of the language.
+        Countries the api fails to return are left out. If it fails to return any,
+        the first error is raised and the previous snapshot kept
+
+        :param: :client: A `BigDataCloud` instance, with `response_mode` 'json' or 'lazy'.
+                         `AsyncBigDataCloud` isn't supported
+        :param: :codes: Country codes to fetch. Defaults to every ISO 3166-1 country
+        :param: :workers: Number of concurrent lookups
+
+        :return: number of countries saved
+        """
+
+        from .aio import AsyncBigDataCloud
+
+        if isinstance(client, AsyncBigDataCloud):
+            raise TypeError("Snapshots are built with a `BigDataCloud` client, not an `AsyncBigDataCloud` one")
+        if client.response_mode == 'model':
+            raise ValueError("Snapshots are built from full responses, not from `response_mode='model'`")
+
+        def fetch(code, lang):
+            # Past `client.countries`, which may be this very snapshot, and the response cache
+            return client._call('country_info', code, lang, fresh=True)
+
+        results = client._map_unique(fetch, 'code', list(codes), workers, lang=lang)
+        countries = [result for result in results if not isinstance(result, Exception)]
+        if not countries and results:
+            raise next(result for result in results if isinstance(result, Exception))
+
+        blobs = [country.raw if isinstance(country, LazyResponse) else
+                 json.dumps(country, separators=(',', ':'), ensure_ascii=False).encode() for country in countries]
+        decoded = [country.json() if isinstance(country, LazyResponse) else country for country in countries]
+
+        offset = len(_MAGIC) + _COUNT.size + _RECORD.size * len(blobs)
+        records = []
+        for country, blob in zip(decoded, blobs):
+            records.append(_RECORD.pack(country['isoAlpha2'].encode(), (country.get('isoAlpha3') or '').encode(),
+                                        int(country.get('m49Code') or 0), offset, len(blob)))
+            offset += len(blob)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(lang)
+        # Written aside then renamed, as readers may have the previous file mapped
+        with open(f"{path}.tmp", 'wb') as f:
+            f.write(_MAGIC)
+            f.write(_COUNT.pack(len(blobs)))
+            f.writelines(records)
+            f.writelines(blobs)
+        os.replace(f"{path}.tmp", path)
+
+        # Only dropped: readers may still hold the previous table, which is unmapped once they let go of it
+        with self._lock:
+            self._tables.pop(lang, None)
+
+        return len(blobs)
+
+    def _table(self, lang:str):
+        table = self._tables.get(lang)
+        if table is not None:
+            return table
+
+        with self._lock:
+            if lang not in self._tables:
+                path = self.path(lang)
+                self._tables[lang] = _Table(path) if os.path.exists(path) else None
+            return self._tables[lang]
+
+    def has(self, lang:str='en'):
+        """:return: whether the snapshot has countries in `lang`"""
+
+        return self._table(lang) is not None
+
+    def raw(self, code, lang:str='en'):
+        """
+        :return: the raw JSON bytes of a country, or None if it isn't in the snapshot
+        """
+
+        table = self._table(lang)
+        return table.get(_normalize(code)) if table is not None else None
+
+    def country_info(self, *, code, lang:str='en'):
+        """
+        Local equivalent of `BigDataCloud.country_info`
+
+        :param: :code: ISO 3166-1 alpha-2, alpha-3 or numeric code
+        :param: :lang: Language of the snapshot to look the country up in
+
+        :return: the country, as returned by the api, or None if it isn't in the snapshot
+        """
+
+        raw = self.raw(code, lang)
+        return loads(raw) if raw is not None else None
+
+    def expand(self, resp:dict, *, lang:str='en'):
+        """
+        Fills in the `country` of a `country_by_ip` or `ip_geolocation` response
+        from the snapshot, so responses can be stored with only the country's
+        `isoAlpha2` and expanded locally when needed
+
+        :return: the response, with its full `country` when found in the snapshot
+        """
+
+        country = resp.get('country') or {}
+        code = country.get('isoAlpha2') if isinstance(country, dict) else None
+        full = self.country_info(code=code, lang=lang) if code else None
+
+        if full is not None:
+            resp = dict(resp, country=full)
+
+        return resp
+
+    def close(self):
+        """Unmaps every loaded snapshot file"""
+
+        with self._lock:
+            tables, self._tables = self._tables, {}
+
+        for table in tables.values():
+            if table is not None:
+                table.close()
+
+    def __repr__(self):
+        return f"CountrySnapshot(directory={self.directory!r})"
@@ -0,0 +1,222 @@
+import re, time, threading
+from collections import OrderedDict
+
+from .config import CACHE_TTLS
+
+
+# Facts the api reports about an address that only depend on its domain
+DOMAIN_FACTS = ('isValid', 'isMailServerDefined', 'isKnownSpammerDomain', 'isDisposable')
+
+# Dot-separated atoms, of the characters `validate_args` accepts
+_LOCAL_PART = re.compile(r"^[A-Za-z0-9+_-]+(?:\.[A-Za-z0-9+_-]+)*$")
+_LABEL = re.compile(r"^[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?$")
+
+
+def split_address(address:str):
+    """
+    Normalizes an email address, stripping surrounding whitespace and lower-casing
+    its domain, and checks its syntax as per RFC 5321, without quoted local parts
+    or the rarer special characters
+
+    :return: the (`address`, `domain`) normalized, or None if the syntax is invalid
+    """
+
+    if not isinstance(address, str):
+        return None
+
+    local, at, domain = address.strip().rpartition('@')
+    domain = domain.lower().rstrip('.')
+    labels = domain.split('.')
+
+    if not at or len(local) > 64 or len(domain) > 253 or len(labels) < 2 or not _LOCAL_PART.match(local):
+        return None
+    if not all(_LABEL.match(label) for label in labels) or not labels[-1].isalpha():
+        return None
+
+    return f"{local}@{domain}", domain
+
+
+def _field(resp, key:str):
+    try:
+        return resp[key]
+    except (KeyError, TypeError):
+        return None
+
+
+class EmailDomainCache:
+    """
+    Cache of the facts `email_verify` reports about domains: whether a mail server
+    is defined, and whether the domain is disposable or a known spammer's. Once a
+    domain is known, its addresses are verified locally.
+
+    `BigDataCloud.email_verify_many` keeps one per client
+
+    :param: :maxsize: Maximum number of domains cached, the least recently used being evicted
+    :param: :ttl: Seconds the facts of a domain are kept for
+    """
+
+    def __init__(self, *, maxsize:int=100000, ttl:float=CACHE_TTLS['email_validation']):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._domains = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, domain:str):
+        """
+        :return: dict of the facts of a domain, or None if it isn't cached
+        """
+
+        with self._lock:
+            entry = self._domains.get(domain)
+            if entry is None or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+
+            self._domains.move_to_end(domain)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, domain:str, resp):
+        """Caches the facts of a domain, from an `email_verify` response for one of its addresses"""
+
+        facts = {key: _field(resp, key) for key in DOMAIN_FACTS}
+
+        with self._lock:
+            self._domains[domain] = (facts, time.monotonic() + self.ttl)
+            self._domains.move_to_end(domain)
+            if len(self._domains) > self.maxsize:
+                self._domains.popitem(last=False)
+
+    def batch(self, addresses):
+        """:return: an `EmailBatch` verifying `addresses` against the cache"""
+
+        return EmailBatch(self, addresses)
+
+    def stats(self):
+        """
+        :return: dict of cache statistics
+        """
+
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._domains)}
+
+    def clear(self):
+        """Forgets every domain"""
+
+        with self._lock:
+            self._domains.clear()
+
+    def __len__(self):
+        return len(self._domains)
+
+    def __repr__(self):
+        return f"EmailDomainCache(domains={len(self._domains)})"
+
+
+def answer(address:str, facts:dict):
+    """
+    :return: an `email_verify` response for a syntactically valid address of a known domain
+    """
+
+    return dict(inputData=address, isSyntaxValid=True, **facts)
+
+
+def rejected(address):
+    """
+    :return: an `email_verify` response for an address of invalid syntax
+    """
+
+    return {'inputData': address, 'isValid': False, 'isSyntaxValid': False, 'isMailServerDefined': False,
+            'isKnownSpammerDomain': False, 'isDisposable': False}
+
+
+class EmailBatch:
+    """
+    Verification of many addresses, in rounds sending at most one address per
+    unknown domain. Addresses whose syntax is invalid are rejected locally, and
+    the others are answered from their domain's facts once known.
+
+    Drive it with `representatives()` and `absorb()` until there's nothing left to send
+
+    :param: :domains: The `EmailDomainCache`
+    :param: :addresses: Iterable of email addresses
+    """
+
+    def __init__(self, domains:EmailDomainCache, addresses):
+        self.domains = domains
+        self.entries = [(address, split_address(address)) for address in addresses]
+        self.answers = {}
+        self.failed = {}
+        self.pending = OrderedDict()
+        self._sent = []
+
+        known = {}
+        for _, parsed in self.entries:
+            if parsed is None:
+                continue
+
+            normalized, domain = parsed
+            if domain in self.pending:
+                self.pending[domain][normalized] = None
+            elif domain not in known:
+                known[domain] = self.domains.get(domain)
+                if known[domain] is None:
+                    self.pending[domain] = OrderedDict.fromkeys([normalized])
+
+        self.known = {domain: facts for domain, facts in known.items() if facts is not None}
+
+    def representatives(self):
+        """
+        :return: list of the addresses to send to the api next, one per unknown domain
+        """
+
+        self._sent = [(domain, next(iter(addresses))) for domain, addresses in self.pending.items()]
+        return [address for _, address in self._sent]
+
+    def absorb(self, responses):
+        """
+        Takes the api's responses to the last `representatives()`, in their order.
+        A domain is known from the first of its addresses the api finds syntactically
+        valid. Should the api fail, the domain's other addresses fail alike
+        """
+
+        for (domain, address), resp in zip(self._sent, responses):
+            addresses = self.pending[domain]
+            del addresses[address]
+
+            if isinstance(resp, Exception):
+                self.failed[domain] = resp
+            elif _field(resp, 'isSyntaxValid') is False:
+                self.answers[address] = resp
+                if addresses:
+                    continue
+            else:
+                self.answers[address] = resp
+                self.domains.put(domain, resp)
+                self.known[domain] = {key: _field(resp, key) for key in DOMAIN_FACTS}
+
+            del self.pending[domain]
+
+    def results(self):
+        """
+        :return: list of responses in the order of the addresses. A failed lookup
+                 holds the raised exception in place of its response
+        """
+
+        results = []
+        for address, parsed in self.entries:
+            if parsed is None:
+                results.append(rejected(address))
+                continue
+
+            normalized, domain = parsed
+            if normalized in self.answers:
+                results.append(self.answers[normalized])
+            elif domain in self.known:
+                results.append(answer(normalized, self.known[domain]))
+            else:
+                results.append(self.failed[domain])
+
+        return results
@@ -0,0 +1,53 @@
+import re
+from types import MappingProxyType
+from collections import namedtuple
+
+from .utils import validators_for
+from .config import MODES_AND_PARAMS, CACHE_TTLS
+
+
+# Query params whose method argument isn't simply their snake_case form
+ARGUMENT_NAMES = {
+    'localityLanguage': 'lang',
+    'timeZoneId': 'timezone_id',
+}
+
+Endpoint = namedtuple('Endpoint', 'name category path args params needs_key validators ttl')
+Endpoint.__doc__ = """
+    Immutable description of an api endpoint
+
+    :param: :name: Name of the client method, e.g. 'ip_geolocation'
+    :param: :category: Api category, as in `config.MODES_AND_PARAMS`
+    :param: :path: Endpoint path, e.g. 'ip-geolocation'
+    :param: :args: Method arguments, in the order of `params`
+    :param: :params: Query params, without the api key
+    :param: :needs_key: Whether the api key is sent along
+    :param: :validators: ((`arg`, `validator`), ...) checking the arguments
+    :param: :ttl: Default cache lifetime of responses, in seconds
+    """
+
+
+def _argument_name(param:str):
+    return ARGUMENT_NAMES.get(param) or re.sub(r'(?<!^)([A-Z])', r'_\1', param).lower()
+
+
+def _build_registry():
+    """Builds the endpoint registry from `config.MODES_AND_PARAMS`"""
+
+    registry = {}
+
+    for category, endpoints in MODES_AND_PARAMS.items():
+        for path, query in endpoints.items():
+            params = tuple(p for p in query if p and p != 'key')
+            args = tuple(map(_argument_name, params))
+            name = path.replace('-', '_')
+
+            registry[name] = Endpoint(name=name, category=category, path=path, args=args, params=params,
+                                      needs_key='key' in query, validators=validators_for(args),
+                                      ttl=CACHE_TTLS.get(path, CACHE_TTLS.get(category, 0)))
+
+    return MappingProxyType(registry)
+
+
+# Every endpoint, keyed by client method name. Built once at import time
+ENDPOINTS = _build_registry()
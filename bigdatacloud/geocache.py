@@ -0,0 +1,199 @@
+import math, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+
+
+# Metres per degree of latitude, and of longitude at the equator
+METRES_PER_DEGREE = 111320.0
+EARTH_RADIUS = 6371008.8
+
+
+def distance(lat1:float, lon1:float, lat2:float, lon2:float):
+    """
+    :return: great-circle distance in metres between two points, in degrees
+    """
+
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+class ReverseGeocodeCache:
+    """
+    Spatial cache in front of `reverse_geocode`. Resolved points are kept in a grid
+    of cells `tolerance` metres high, and a new point is answered locally with the
+    response of the nearest resolved point within `tolerance` metres, if any.
+    Answers are thus never for a point further than `tolerance` away.
+
+    Dense tracks, e.g. GPS points along the same roads, mostly hit the cache
+
+    :param: :client: A `BigDataCloud` instance
+    :param: :tolerance: Maximum distance in metres between a point and the resolved point answering it
+    :param: :maxsize: Maximum number of grid cells kept, the least recently used being evicted
+    :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English
+    """
+
+    def __init__(self, client, *, tolerance:float=250, maxsize:int=100000, lang:str='en'):
+        if tolerance <= 0:
+            raise ValueError(f"`tolerance` should be positive, not {tolerance}")
+
+        self.client = client
+        self.tolerance = tolerance
+        self.maxsize = maxsize
+        self.lang = lang
+        self.hits = 0
+        self.misses = 0
+        # Side of a cell, in degrees of latitude
+        self._cell = tolerance / METRES_PER_DEGREE
+        self._columns = math.ceil(360 / self._cell)
+        self._cells = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, lat:float, lon:float):
+        return math.floor((lat + 90) / self._cell), math.floor((lon + 180) / self._cell) % self._columns
+
+    def _nearest(self, lat:float, lon:float):
+        """
+        Internal function that finds the nearest resolved (or pending) point within the tolerance
+
+        :return: its response, or a `Future` of it, or None
+        """
+
+        row, column = self._key(lat, lon)
+        # Cells narrow towards the poles, so more columns have to be looked at
+        spread = math.ceil(1 / max(math.cos(math.radians(lat)), 0.01))
+        best, best_distance = None, self.tolerance
+
+        for r in (row - 1, row, row + 1):
+            for c in range(column - spread, column + spread + 1):
+                points = self._cells.get((r, c % self._columns))
+                if not points:
+                    continue
+
+                self._cells.move_to_end((r, c % self._columns))
+                for point_lat, point_lon, value in points:
+                    d = distance(lat, lon, point_lat, point_lon)
+                    if d <= best_distance:
+                        best, best_distance = value, d
+
+        return best
+
+    def _add(self, lat:float, lon:float, value):
+        key = self._key(lat, lon)
+        points = self._cells.get(key)
+
+        if points is None:
+            points = self._cells[key] = []
+            if len(self._cells) > self.maxsize:
+                self._cells.popitem(last=False)
+
+        points.append((lat, lon, value))
+
+    def _replace(self, lat:float, lon:float, pending:Future, value):
+        points = self._cells.get(self._key(lat, lon))
+        if points is None:
+            return
+
+        for i, point in enumerate(points):
+            if point[2] is pending:
+                if value is None:
+                    del points[i]
+                else:
+                    points[i] = (lat, lon, value)
+                return
+
+    def _fetch(self, lat:float, lon:float):
+        return self.client.reverse_geocode(latitude=f"{lat:.6f}", longitude=f"{lon:.6f}", lang=self.lang)
+
+    def reverse_geocode(self, latitude, longitude):
+        """
+        Reverse geocodes a point, locally when a resolved point lies within the tolerance
+
+        :param: :latitude: Latitude as per WGS 84, as a number or string
+        :param: :longitude: Longitude as per WGS 84, as a number or string
+
+        :return: JSON response from the api, for a point within `tolerance` metres
+        """
+
+        lat, lon = float(latitude), float(longitude)
+
+        with self._lock:
+            found = self._nearest(lat, lon)
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if found is not None:
+            # A point still being resolved by `reverse_geocode_many` is waited for
+            return found.result() if isinstance(found, Future) else found
+
+        resp = self._fetch(lat, lon)
+        with self._lock:
+            self._add(lat, lon, resp)
+
+        return resp
+
+    def reverse_geocode_many(self, points, *, workers:int=8):
+        """
+        Reverse geocodes many points concurrently, points within the tolerance of a
+        resolved or pending one sharing its response rather than querying the api
+
+        :param: :points: Iterable of (`latitude`, `longitude`) pairs
+        :param: :workers: Number of concurrent lookups
+
+        :return: list of responses in the order of `points`. A failed lookup
+                 holds the raised exception in place of its response
+        """
+
+        answers = []
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for latitude, longitude in points:
+                lat, lon = float(latitude), float(longitude)
+
+                with self._lock:
+                    found = self._nearest(lat, lon)
+                    pending = found is None
+                    if pending:
+                        self.misses += 1
+                        found = pool.submit(self._fetch, lat, lon)
+                        self._add(lat, lon, found)
+                    else:
+                        self.hits += 1
+
+                if pending:
+                    found.add_done_callback(lambda future, lat=lat, lon=lon: self._resolved(lat, lon, future))
+                answers.append(found)
+
+        return [answer.exception() or answer.result() if isinstance(answer, Future) else answer
+                for answer in answers]
+
+    def _resolved(self, lat:float, lon:float, future:Future):
+        """Internal function that swaps a pending lookup for its response, or drops it if it failed"""
+
+        with self._lock:
+            self._replace(lat, lon, future, None if future.exception() else future.result())
+
+    def stats(self):
+        """
+        :return: dict of cache statistics
+        """
+
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'cells': len(self._cells),
+                    'points': sum(map(len, self._cells.values()))}
+
+    def clear(self):
+        """Forgets every resolved point"""
+
+        with self._lock:
+            self._cells.clear()
+
+    def __len__(self):
+        with self._lock:
+            return sum(map(len, self._cells.values()))
+
+    def __repr__(self):
+        return f"ReverseGeocodeCache(tolerance={self.tolerance}, points={len(self)})"
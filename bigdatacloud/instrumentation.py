@@ -0,0 +1,293 @@
+import warnings
+import threading
+from bisect import bisect_left
+from collections import deque
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+
+# Timing phases of a request, in seconds. `dns` and `connect` (which includes
+# the TLS handshake) are only measured by `AsyncBigDataCloud`, as `requests`
+# doesn't expose them; the sync client counts them in `response` instead
+PHASES = ('wait', 'dns', 'connect', 'response', 'transfer', 'decode')
+
+
+class RequestEvent:
+    """
+    Outcome of a call to an endpoint method, passed to the client's hooks
+
+    :attr: :endpoint: Name of the endpoint method, e.g. 'ip_geolocation'
+    :attr: :path: Endpoint path, e.g. 'ip-geolocation'
+    :attr: :params: Query params, without the api key
+    :attr: :started: Time the call started at, in seconds since the epoch
+    :attr: :duration: Duration of the whole call, in seconds
+    :attr: :cache_hit: Whether the response came from the cache, None without a cache
+    :attr: :coalesced: Whether the response was shared by an identical request in flight
+    :attr: :attempts: Number of requests sent to the api, 0 when none was
+    :attr: :status: HTTP status of the last response, if any
+    :attr: :bytes: Size of the response body
+    :attr: :wait: Time spent throttled by the rate limit or backing off before retries
+    :attr: :dns: Time spent resolving the host, None when not measured
+    :attr: :connect: Time spent opening connections (TCP and TLS), None when not measured
+    :attr: :response: Time from sending the request to receiving the response headers
+    :attr: :transfer: Time spent reading the response body
+    :attr: :decode: Time spent decoding the response
+    :attr: :error: Exception raised by the call, if any
+    """
+
+    __slots__ = ('endpoint', 'path', 'params', 'started', 'duration', 'cache_hit', 'coalesced', 'attempts',
+                 'status', 'bytes', 'wait', 'dns', 'connect', 'response', 'transfer', 'decode', 'error')
+
+    def __init__(self, endpoint:str, path:str, params:dict, started:float):
+        self.endpoint = endpoint
+        self.path = path
+        self.params = params
+        self.started = started
+        self.duration = 0.0
+        self.cache_hit = None
+        self.coalesced = False
+        self.attempts = 0
+        self.status = None
+        self.bytes = 0
+        self.wait = 0.0
+        self.dns = None
+        self.connect = None
+        self.response = 0.0
+        self.transfer = 0.0
+        self.decode = 0.0
+        self.error = None
+
+    @property
+    def outcome(self):
+        """'hit', 'error', 'coalesced' or 'ok'"""
+
+        if self.cache_hit:
+            return 'hit'
+        if self.error is not None:
+            return 'error'
+        return 'coalesced' if self.coalesced else 'ok'
+
+    def phases(self):
+        """
+        :return: dict of the measured phases and their durations
+        """
+
+        return {phase: getattr(self, phase) for phase in PHASES if getattr(self, phase) is not None}
+
+    def __repr__(self):
+        return (f"RequestEvent(endpoint={self.endpoint!r}, outcome={self.outcome!r}, "
+                f"status={self.status}, bytes={self.bytes}, duration={self.duration:.6f})")
+
+
+def emit(hooks, event:RequestEvent):
+    """Passes an event to every hook. A failing hook is reported, but never fails the call"""
+
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception as e:
+            warnings.warn(f"Instrumentation hook {hook!r} failed: {e!r}", RuntimeWarning)
+
+
+class _Metric:
+    """Minimal labelled counter or histogram, standing in for `prometheus_client`'s"""
+
+    def __init__(self, name:str, documentation:str, labelnames, kind:str, buckets=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        self.buckets = tuple(buckets)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        return _Child(self, values)
+
+    def _inc(self, values, amount):
+        with self._lock:
+            self.values[values] = self.values.get(values, 0) + amount
+
+    def _observe(self, values, amount):
+        with self._lock:
+            counts, total = self.values.get(values) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[bisect_left(self.buckets, amount)] += 1
+            self.values[values] = counts, total + amount
+
+    def _labels(self, values, extra=''):
+        pairs = [f'{name}="{value}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+        with self._lock:
+            items = sorted(self.values.items())
+
+        for values, value in items:
+            if self.kind == 'counter':
+                lines.append(f"{self.name}{self._labels(values)} {value}")
+                continue
+
+            counts, total = value
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                extra = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{self._labels(values, extra)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(values)} {total}")
+            lines.append(f"{self.name}_count{self._labels(values)} {cumulative}")
+
+        return '\n'.join(lines)
+
+
+class _Child:
+    __slots__ = ('metric', 'values')
+
+    def __init__(self, metric:_Metric, values):
+        self.metric = metric
+        self.values = tuple(map(str, values))
+
+    def inc(self, amount=1):
+        self.metric._inc(self.values, amount)
+
+    def observe(self, amount):
+        self.metric._observe(self.values, amount)
+
+
+class PrometheusHook:
+    """
+    Hook recording request counts, latencies, phases and payload sizes as Prometheus
+    metrics. Uses `prometheus_client` when installed, registering on `registry`, a new
+    registry of the hook's own by default, so hooks can be created many times over. Pass
+    `prometheus_client.REGISTRY` to expose the metrics with the process' default ones.
+    Without it, the metrics are kept in process and `render()` returns them in the
+    Prometheus text format
+
+    :param: :registry: `prometheus_client.CollectorRegistry` to register the metrics on
+    :param: :namespace: Prefix of the metric names
+    :param: :buckets: Upper bounds of the latency histogram buckets, in seconds
+    """
+
+    BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self, registry=None, *, namespace:str='bigdatacloud', buckets=BUCKETS):
+        if registry is None and prometheus_client is not None:
+            registry = prometheus_client.CollectorRegistry()
+
+        self.registry = registry
+        self._metrics = []
+
+        self.requests = self._metric(f"{namespace}_requests_total", "Calls to the api, by outcome",
+                                     ('endpoint', 'outcome', 'status'), 'counter')
+        self.duration = self._metric(f"{namespace}_request_duration_seconds", "Duration of calls to the api",
+                                     ('endpoint',), 'histogram', buckets)
+        self.phases = self._metric(f"{namespace}_request_phase_seconds", "Duration of each phase of api requests",
+                                   ('endpoint', 'phase'), 'histogram', buckets)
+        self.bytes = self._metric(f"{namespace}_response_bytes_total", "Size of the api responses received",
+                                  ('endpoint',), 'counter')
+        self.retries = self._metric(f"{namespace}_retries_total", "Requests retried after a failure",
+                                    ('endpoint',), 'counter')
+
+    def _metric(self, name:str, documentation:str, labelnames, kind:str, buckets=()):
+        if prometheus_client is None:
+            metric = _Metric(name, documentation, labelnames, kind, buckets)
+            self._metrics.append(metric)
+            return metric
+
+        if kind == 'counter':
+            # `prometheus_client` appends the _total suffix itself
+            return prometheus_client.Counter(name[:-len('_total')], documentation, labelnames, registry=self.registry)
+        return prometheus_client.Histogram(name, documentation, labelnames, buckets=buckets, registry=self.registry)
+
+    def __call__(self, event:RequestEvent):
+        endpoint = event.endpoint
+
+        self.requests.labels(endpoint, event.outcome, event.status or '').inc()
+        self.duration.labels(endpoint).observe(event.duration)
+
+        if event.attempts:
+            self.bytes.labels(endpoint).inc(event.bytes)
+            for phase, seconds in event.phases().items():
+                self.phases.labels(endpoint, phase).observe(seconds)
+            if event.attempts > 1:
+                self.retries.labels(endpoint).inc(event.attempts - 1)
+
+    def render(self):
+        """
+        :return: the metrics in the Prometheus text exposition format
+        """
+
+        if prometheus_client is not None:
+            return prometheus_client.generate_latest(self.registry).decode()
+
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+class OpenTelemetryHook:
+    """
+    Hook recording every call as an OpenTelemetry span, with its phases, status and
+    sizes as attributes. Uses `opentelemetry` when installed, through `tracer`
+    (the global tracer provider's otherwise). Without it, the latest spans are
+    kept as dicts in `spans`
+
+    :param: :tracer: `opentelemetry.trace.Tracer` starting the spans
+    :param: :maxlen: Number of spans kept without `opentelemetry`
+    """
+
+    def __init__(self, tracer=None, *, maxlen:int=1000):
+        if tracer is None and otel_trace is not None:
+            tracer = otel_trace.get_tracer('bigdatacloud')
+
+        self.tracer = tracer
+        self.spans = deque(maxlen=maxlen)
+
+    @staticmethod
+    def attributes(event:RequestEvent):
+        """
+        :return: dict of span attributes describing the event
+        """
+
+        attributes = {
+            'http.request.method': 'GET',
+            'url.path': f"/{event.path}",
+            'bigdatacloud.endpoint': event.endpoint,
+            'bigdatacloud.outcome': event.outcome,
+            'bigdatacloud.attempts': event.attempts,
+            'bigdatacloud.response_bytes': event.bytes,
+        }
+        if event.status is not None:
+            attributes['http.response.status_code'] = event.status
+        if event.cache_hit is not None:
+            attributes['bigdatacloud.cache_hit'] = event.cache_hit
+
+        attributes.update((f"bigdatacloud.phase.{phase}", seconds) for phase, seconds in event.phases().items())
+
+        return attributes
+
+    def __call__(self, event:RequestEvent):
+        name = f"bigdatacloud.{event.endpoint}"
+        attributes = self.attributes(event)
+
+        if self.tracer is None:
+            self.spans.append(dict(name=name, start=event.started, end=event.started + event.duration,
+                                   attributes=attributes, error=event.error))
+            return
+
+        start = int(event.started * 1e9)
+        span = self.tracer.start_span(name, start_time=start, attributes=attributes)
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, str(event.error)))
+        span.end(end_time=start + int(event.duration * 1e9))
@@ -0,0 +1,204 @@
+from sys import intern
+from typing import Optional
+
+from .response import LazyResponse, loads
+
+
+def _interned(value):
+    """Interns strings repeated across many results, e.g. country or time zone names"""
+
+    return intern(value) if isinstance(value, str) else value
+
+
+class Model:
+    """
+    Base of the compact, typed results. Subclasses list their attributes in
+    `__slots__` and map them to response fields in `FIELDS` as
+    (`attribute`, `field`, `interned`), `field` being a dotted path, and annotate
+    them, None standing for fields missing from the response.
+
+    The raw response is only kept when asked for, as raw JSON bytes. Results compare
+    and hash by their attributes, so they can be used in sets and as dict keys
+    """
+
+    __slots__ = ('_raw',)
+    FIELDS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Split the dotted paths once, rather than for every result
+        cls._PATHS = tuple((attr, tuple(field.split('.')), intern_value) for attr, field, intern_value in cls.FIELDS)
+
+    @classmethod
+    def from_response(cls, response, *, keep_raw:bool=False):
+        """
+        Builds a result from a decoded response, a `LazyResponse` or raw JSON bytes
+
+        :param: :keep_raw: Whether to keep the raw response, available from `raw`
+        """
+
+        raw = None
+        if isinstance(response, (bytes, LazyResponse)):
+            raw = response if isinstance(response, bytes) else response.raw
+            response = loads(raw)
+
+        model = cls._from_dict(response)
+        model._raw = raw if keep_raw else None
+
+        return model
+
+    @classmethod
+    def _from_dict(cls, data:dict):
+        model = cls.__new__(cls)
+
+        for attr, path, intern_value in cls._PATHS:
+            value = data
+            for part in path:
+                value = value.get(part) if isinstance(value, dict) else None
+            setattr(model, attr, _interned(value) if intern_value else value)
+
+        return model
+
+    @property
+    def raw(self):
+        """
+        :return: the decoded raw response, or None if it wasn't kept
+        """
+
+        return loads(self._raw) if self._raw is not None else None
+
+    def to_dict(self):
+        """
+        :return: dict of the result's attributes
+        """
+
+        return {attr: getattr(self, attr) for attr, _, _ in self.FIELDS}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash((type(self), tuple(getattr(self, attr) for attr, _, _ in self.FIELDS)))
+
+    def __repr__(self):
+        attrs = ', '.join(f"{attr}={getattr(self, attr)!r}" for attr, _, _ in self.FIELDS)
+        return f"{type(self).__name__}({attrs})"
+
+
+class Country(Model):
+    """Country of `country_info`"""
+
+    __slots__ = ('iso_alpha2', 'iso_alpha3', 'm49_code', 'name', 'calling_code', 'currency_code', 'un_region')
+
+    iso_alpha2:Optional[str]
+    iso_alpha3:Optional[str]
+    m49_code:Optional[int]
+    name:Optional[str]
+    calling_code:Optional[str]
+    currency_code:Optional[str]
+    un_region:Optional[str]
+
+    FIELDS = (
+        ('iso_alpha2', 'isoAlpha2', True),
+        ('iso_alpha3', 'isoAlpha3', True),
+        ('m49_code', 'm49Code', False),
+        ('name', 'name', True),
+        ('calling_code', 'callingCode', True),
+        ('currency_code', 'currency.code', True),
+        ('un_region', 'unRegion', True),
+    )
+
+
+class IPCountry(Model):
+    """Country of an IP address, from `country_by_ip`"""
+
+    __slots__ = ('ip', 'country_code', 'country_name', 'calling_code', 'currency_code', 'is_reachable_globally')
+
+    ip:Optional[str]
+    country_code:Optional[str]
+    country_name:Optional[str]
+    calling_code:Optional[str]
+    currency_code:Optional[str]
+    is_reachable_globally:Optional[bool]
+
+    FIELDS = (
+        ('ip', 'ip', False),
+        ('country_code', 'country.isoAlpha2', True),
+        ('country_name', 'country.name', True),
+        ('calling_code', 'country.callingCode', True),
+        ('currency_code', 'country.currency.code', True),
+        ('is_reachable_globally', 'isReachableGlobally', False),
+    )
+
+
+class TimeZone(Model):
+    """Time zone, from `timezone_by_ip`, `timezone_by_location` or `timezone_info`"""
+
+    __slots__ = ('iana_time_id', 'display_name', 'abbreviation', 'utc_offset_seconds',
+                 'is_daylight_saving_time', 'local_time')
+
+    iana_time_id:Optional[str]
+    display_name:Optional[str]
+    abbreviation:Optional[str]
+    utc_offset_seconds:Optional[int]
+    is_daylight_saving_time:Optional[bool]
+    local_time:Optional[str]
+
+    FIELDS = (
+        ('iana_time_id', 'ianaTimeId', True),
+        ('display_name', 'displayName', True),
+        ('abbreviation', 'effectiveTimeZoneShort', True),
+        ('utc_offset_seconds', 'utcOffsetSeconds', False),
+        ('is_daylight_saving_time', 'isDaylightSavingTime', False),
+        ('local_time', 'localTime', False),
+    )
+
+
+class IPGeolocation(Model):
+    """Geolocation of an IP address, from the `ip_geolocation` endpoints"""
+
+    __slots__ = ('ip', 'country_code', 'country_name', 'continent', 'continent_code', 'subdivision',
+                 'city', 'locality', 'postcode', 'latitude', 'longitude', 'timezone_id', 'confidence')
+
+    ip:Optional[str]
+    country_code:Optional[str]
+    country_name:Optional[str]
+    continent:Optional[str]
+    continent_code:Optional[str]
+    subdivision:Optional[str]
+    city:Optional[str]
+    locality:Optional[str]
+    postcode:Optional[str]
+    latitude:Optional[float]
+    longitude:Optional[float]
+    timezone_id:Optional[str]
+    confidence:Optional[str]
+
+    FIELDS = (
+        ('ip', 'ip', False),
+        ('country_code', 'country.isoAlpha2', True),
+        ('country_name', 'country.name', True),
+        ('continent', 'location.continent', True),
+        ('continent_code', 'location.continentCode', True),
+        ('subdivision', 'location.isoPrincipalSubdivision', True),
+        ('city', 'location.city', True),
+        ('locality', 'location.localityName', True),
+        ('postcode', 'location.postcode', True),
+        ('latitude', 'location.latitude', False),
+        ('longitude', 'location.longitude', False),
+        ('timezone_id', 'location.timeZone.ianaTimeId', True),
+        ('confidence', 'confidence', True),
+    )
+
+
+# Result model of each endpoint offering one, keyed by client method name
+MODELS = {
+    'ip_geolocation': IPGeolocation,
+    'ip_geolocation_full': IPGeolocation,
+    'ip_geolocation_with_confidence': IPGeolocation,
+    'country_by_ip': IPCountry,
+    'country_info': Country,
+    'timezone_by_ip': TimeZone,
+    'timezone_by_location': TimeZone,
+    'timezone_info': TimeZone,
+}
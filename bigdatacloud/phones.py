@@ -0,0 +1,365 @@
+import re, threading
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Numbering plans of common countries: ISO 3166-1 alpha-2 code to (calling code, national
+# trunk prefix, shortest and longest national significant number). The lengths are generous
+# bounds, covering freephone and other non-geographic ranges, so only impossible numbers are
+# rejected. Numbers of other countries are sent to the api after the length checks of E.164
+NUMBERING_PLANS = {
+    'AE': ('971', '0', 7, 12),
+    'AR': ('54', '0', 10, 11),
+    'AT': ('43', '0', 4, 13),
+    'AU': ('61', '0', 6, 10),
+    'BD': ('880', '0', 6, 10),
+    'BE': ('32', '0', 8, 9),
+    'BR': ('55', '0', 8, 11),
+    'CA': ('1', '1', 10, 10),
+    'CH': ('41', '0', 9, 12),
+    'CL': ('56', '', 8, 9),
+    'CN': ('86', '0', 7, 12),
+    'CO': ('57', '', 8, 10),
+    'DE': ('49', '0', 5, 15),
+    'DK': ('45', '', 8, 8),
+    'EG': ('20', '0', 8, 10),
+    'ES': ('34', '', 9, 9),
+    'FI': ('358', '0', 5, 12),
+    'FR': ('33', '0', 9, 9),
+    'GB': ('44', '0', 7, 10),
+    'GH': ('233', '0', 9, 9),
+    'HK': ('852', '', 8, 9),
+    'ID': ('62', '0', 7, 13),
+    'IE': ('353', '0', 7, 10),
+    'IL': ('972', '0', 8, 10),
+    'IN': ('91', '0', 8, 13),
+    'IT': ('39', '', 6, 12),
+    'JP': ('81', '0', 9, 10),
+    'KE': ('254', '0', 6, 10),
+    'KR': ('82', '0', 7, 10),
+    'MX': ('52', '', 10, 10),
+    'MY': ('60', '0', 8, 10),
+    'NG': ('234', '0', 7, 10),
+    'NL': ('31', '0', 7, 10),
+    'NO': ('47', '', 5, 8),
+    'NZ': ('64', '0', 8, 10),
+    'PE': ('51', '0', 8, 9),
+    'PH': ('63', '0', 8, 10),
+    'PK': ('92', '0', 8, 11),
+    'PL': ('48', '', 9, 9),
+    'PT': ('351', '', 9, 9),
+    'RU': ('7', '8', 10, 10),
+    'SA': ('966', '0', 8, 10),
+    'SE': ('46', '0', 6, 10),
+    'SG': ('65', '', 8, 11),
+    'TH': ('66', '0', 8, 10),
+    'TR': ('90', '0', 7, 10),
+    'US': ('1', '1', 10, 10),
+    'VN': ('84', '0', 8, 10),
+    'ZA': ('27', '0', 9, 9),
+}
+
+# ISO 3166-1 alpha-3 and numeric codes of the countries with a numbering plan
+COUNTRY_ALIASES = {
+    'ARE': 'AE', 'ARG': 'AR', 'AUT': 'AT', 'AUS': 'AU', 'BGD': 'BD', 'BEL': 'BE', 'BRA': 'BR', 'CAN': 'CA',
+    'CHE': 'CH', 'CHL': 'CL', 'CHN': 'CN', 'COL': 'CO', 'DEU': 'DE', 'DNK': 'DK', 'EGY': 'EG', 'ESP': 'ES',
+    'FIN': 'FI', 'FRA': 'FR', 'GBR': 'GB', 'GHA': 'GH', 'HKG': 'HK', 'IDN': 'ID', 'IRL': 'IE', 'ISR': 'IL',
+    'IND': 'IN', 'ITA': 'IT', 'JPN': 'JP', 'KEN': 'KE', 'KOR': 'KR', 'MEX': 'MX', 'MYS': 'MY', 'NGA': 'NG',
+    'NLD': 'NL', 'NOR': 'NO', 'NZL': 'NZ', 'PER': 'PE', 'PHL': 'PH', 'PAK': 'PK', 'POL': 'PL', 'PRT': 'PT',
+    'RUS': 'RU', 'SAU': 'SA', 'SWE': 'SE', 'SGP': 'SG', 'THA': 'TH', 'TUR': 'TR', 'USA': 'US', 'VNM': 'VN',
+    'ZAF': 'ZA',
+    '784': 'AE', '32': 'AR', '40': 'AT', '36': 'AU', '50': 'BD', '56': 'BE', '76': 'BR', '124': 'CA',
+    '756': 'CH', '152': 'CL', '156': 'CN', '170': 'CO', '276': 'DE', '208': 'DK', '818': 'EG', '724': 'ES',
+    '246': 'FI', '250': 'FR', '826': 'GB', '288': 'GH', '344': 'HK', '360': 'ID', '372': 'IE', '376': 'IL',
+    '356': 'IN', '380': 'IT', '392': 'JP', '404': 'KE', '410': 'KR', '484': 'MX', '458': 'MY', '566': 'NG',
+    '528': 'NL', '578': 'NO', '554': 'NZ', '604': 'PE', '608': 'PH', '586': 'PK', '616': 'PL', '620': 'PT',
+    '643': 'RU', '682': 'SA', '752': 'SE', '702': 'SG', '764': 'TH', '792': 'TR', '840': 'US', '704': 'VN',
+    '710': 'ZA',
+}
+
+# Country whose numbering plan applies to numbers of a calling code shared by several
+SHARED_CALLING_CODES = {'1': 'US', '7': 'RU'}
+
+# Calling codes assigned by the ITU, of one, two or three digits
+CALLING_CODES = frozenset(
+    ['1', '7']
+    + '20 27 30 31 32 33 34 36 39 40 41 43 44 45 46 47 48 49 51 52 53 54 55 56 57 58 60 61 62 63 64 65 66 '
+      '81 82 84 86 90 91 92 93 94 95 98'.split()
+    + [str(code) for code in (*range(210, 219), *range(220, 259), *range(260, 270), 290, 291, *range(297, 300),
+                              *range(350, 360), *range(370, 384), 385, 386, 387, 389, 420, 421, 423,
+                              *range(500, 510), *range(590, 600), 670, *range(672, 693), 800, 808, 850, 852, 853,
+                              855, 856, 870, 878, 880, 881, 882, 883, 886, 888, *range(960, 980), *range(992, 999))]
+)
+
+_BY_CALLING_CODE = {}
+for _country, (_code, *_) in sorted(NUMBERING_PLANS.items()):
+    _BY_CALLING_CODE.setdefault(_code, SHARED_CALLING_CODES.get(_code, _country))
+
+# Separators people write numbers with
+_SEPARATORS = re.compile(r"[\s\-\.\(\)/]")
+
+PhoneNumber = namedtuple('PhoneNumber', 'e164 calling_code national country_code')
+PhoneNumber.__doc__ = """
+    A normalized phone number
+
+    :param: :e164: Number in E.164 format, e.g. '+353871234567'. None for a national
+                   number of a country without a numbering plan, whose calling code isn't known
+    :param: :calling_code: Country calling code, e.g. '353', or None alike
+    :param: :national: National significant number, without trunk prefix, e.g. '871234567',
+                       or the number as written when the numbering plan isn't known
+    :param: :country_code: ISO 3166-1 code of the country, alpha-2 if its numbering plan is known
+    """
+
+
+def _country(country_code:str):
+    """:return: a country code as keyed in `NUMBERING_PLANS` if it's there, e.g. 'IE' for 'irl' or '372'"""
+
+    code = (country_code or '').strip().upper()
+    if code.isdigit():
+        code = str(int(code))
+
+    return COUNTRY_ALIASES.get(code, code)
+
+
+def _split_calling_code(digits:str):
+    for size in (1, 2, 3):
+        if digits[:size] in CALLING_CODES:
+            return digits[:size], digits[size:]
+    return None, None
+
+
+def normalize(number:str, country_code:str=''):
+    """
+    Parses a phone number written internationally ('+353 87 123 4567', '00353871234567')
+    or nationally, in the country of `country_code` ('087 123 4567'), and checks its
+    length against its country's numbering plan when known, or E.164's limits otherwise
+
+    :param: :number: Phone number, spaces, hyphens, dots, slashes and brackets being ignored
+    :param: :country_code: ISO 3166-1 alpha-2, alpha-3 or numeric code of the country national numbers are from
+
+    :return: the `PhoneNumber`, or None if the number can't be valid
+    """
+
+    number = _SEPARATORS.sub('', str(number))
+    country_code = _country(country_code)
+
+    if number.startswith('+'):
+        digits = number[1:]
+    elif number.startswith('00'):
+        digits = number[2:]
+    else:
+        plan = NUMBERING_PLANS.get(country_code)
+        if not country_code or not number.isdigit():
+            return None
+        if plan is None:
+            # Left to the api, which knows the country's calling code and trunk prefix
+            return PhoneNumber(None, None, number, country_code) if 4 <= len(number) <= 15 else None
+
+        calling_code, trunk = plan[0], plan[1]
+        national = number[len(trunk):] if trunk and number.startswith(trunk) else number
+        return _checked(calling_code, national, country_code)
+
+    if not digits.isdigit():
+        return None
+
+    calling_code, national = _split_calling_code(digits)
+    if calling_code is None:
+        return None
+
+    return _checked(calling_code, national, _BY_CALLING_CODE.get(calling_code))
+
+
+def _checked(calling_code:str, national:str, country_code:str=None):
+    # E.164 numbers are at most 15 digits long, and no national number is shorter than 4
+    if not 4 <= len(national) <= 15 - len(calling_code):
+        return None
+
+    plan = NUMBERING_PLANS.get(country_code)
+    if plan is not None and not plan[2] <= len(national) <= plan[3]:
+        return None
+
+    return PhoneNumber(f"+{calling_code}{national}", calling_code, national, country_code)
+
+
+# Response to numbers rejected locally, shaped like the api's
+REJECTED = {
+    'isValid': False,
+    'e164Format': None,
+    'internationalFormat': None,
+    'nationalFormat': None,
+    'location': None,
+    'lineType': 'UNKNOWN',
+    'country': None,
+}
+
+
+class PhoneValidator:
+    """
+    Validates phone numbers through `phone_number_validate`, rejecting numbers that
+    can't be valid locally and querying the api once per distinct E.164 number,
+    however it was written. Responses are cached by E.164 number and language, or by
+    country and number for national numbers of countries missing from `NUMBERING_PLANS`
+
+    :param: :client: A `BigDataCloud` instance
+    :param: :maxsize: Maximum number of responses cached
+    :param: :transit_country: Country the international numbers of countries missing from
+                              `NUMBERING_PLANS` are sent as dialled from, with the international prefix 00
+    """
+
+    def __init__(self, client, *, maxsize:int=100000, transit_country:str='GB'):
+        self.client = client
+        self.maxsize = maxsize
+        self.transit_country = transit_country
+        self.rejected = 0
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key):
+        with self._lock:
+            resp = self._cache.get(key)
+            if resp is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            return resp
+
+    def _store(self, key, resp):
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = resp
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _key(phone:PhoneNumber):
+        # National numbers of countries without a numbering plan are known by country and number
+        return phone.e164 or (phone.country_code, phone.national)
+
+    def _query(self, phone:PhoneNumber, lang:str):
+        plan = NUMBERING_PLANS.get(phone.country_code)
+
+        if plan is not None:
+            # Dialled nationally, with the trunk prefix
+            number, country_code = plan[1] + phone.national, phone.country_code
+        elif phone.e164 is None:
+            number, country_code = phone.national, phone.country_code
+        else:
+            number, country_code = f"00{phone.calling_code}{phone.national}", self.transit_country
+
+        return self.client.phone_number_validate(number=number, country_code=country_code, lang=lang)
+
+    def validate(self, number:str, country_code:str='', *, lang:str='en'):
+        """
+        Validates a phone number, locally when it can't be valid
+
+        :param: :number: Phone number, written internationally, or nationally in `country_code`
+        :param: :country_code: ISO 3166-1 alpha-2, alpha-3 or numeric code of the country national numbers are from
+        :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English
+
+        :return: JSON response from the api, or `REJECTED` for numbers rejected locally
+        """
+
+        phone = normalize(number, country_code)
+        if phone is None:
+            with self._lock:
+                self.rejected += 1
+            return dict(REJECTED)
+
+        key = (self._key(phone), lang)
+        resp = self._cached(key)
+        if resp is None:
+            resp = self._query(phone, lang)
+            self._store(key, resp)
+
+        return resp
+
+    def validate_many(self, numbers, country_code:str='', *, lang:str='en', workers:int=8):
+        """
+        Validates many phone numbers concurrently. Numbers rejected locally or
+        already cached aren't sent, and the rest are sent once per E.164 number
+
+        :param: :numbers: Iterable of phone numbers
+        :param: :country_code: ISO 3166-1 alpha-2, alpha-3 or numeric code of the country national numbers are from
+        :param: :workers: Number of concurrent lookups
+
+        :return: list of responses in the order of `numbers`. A failed lookup
+                 holds the raised exception in place of its response
+        """
+
+        phones = [normalize(number, country_code) for number in numbers]
+        known, pending = {}, {}
+
+        for phone in phones:
+            key = phone and self._key(phone)
+            if phone is None or key in known or key in pending:
+                continue
+
+            resp = self._cached((key, lang))
+            if resp is not None:
+                known[key] = resp
+            else:
+                pending[key] = phone
+
+        def query(phone):
+            try:
+                resp = self._query(phone, lang)
+            except Exception as e:
+                return e
+            self._store((self._key(phone), lang), resp)
+            return resp
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            known.update(zip(pending, pool.map(query, pending.values())))
+
+        with self._lock:
+            self.rejected += phones.count(None)
+
+        return [dict(REJECTED) if phone is None else known[self._key(phone)] for phone in phones]
+
+    def validate_by_ip(self, number:str, ip:str, *, lang:str='en'):
+        """
+        Validates a phone number through `phone_number_validate_by_ip`. Numbers written
+        internationally don't depend on the country of `ip`, so are validated as by `validate`.
+        Others are only checked against E.164's limits, and cached by number and IP address
+
+        :param: :number: Phone number
+        :param: :ip: IPv4 address in a string format, whose country national numbers are from
+        :param: :lang: Preferred language for locality names in ISO 639-1 format. Defaults to English
+
+        :return: JSON response from the api, or `REJECTED` for numbers rejected locally
+        """
+
+        digits = _SEPARATORS.sub('', str(number))
+        if digits.startswith(('+', '00')):
+            return self.validate(digits, lang=lang)
+
+        if not digits.isdigit() or not 4 <= len(digits) <= 15:
+            with self._lock:
+                self.rejected += 1
+            return dict(REJECTED)
+
+        key = (digits, ip, lang)
+        resp = self._cached(key)
+        if resp is None:
+            resp = self.client.phone_number_validate_by_ip(number=digits, ip=ip, lang=lang)
+            self._store(key, resp)
+
+        return resp
+
+    def stats(self):
+        """
+        :return: dict of the numbers rejected locally, answered from the cache, and sent to the api
+        """
+
+        with self._lock:
+            return {'rejected': self.rejected, 'hits': self.hits, 'misses': self.misses, 'size': len(self._cache)}
+
+    def clear(self):
+        """Forgets every cached response"""
+
+        with self._lock:
+            self._cache.clear()
+
+    def __repr__(self):
+        return f"PhoneValidator(cached={len(self._cache)})"
@@ -0,0 +1,248 @@
+import sys, json, bisect, ipaddress
+from array import array
+from collections import namedtuple
+
+
+# Fields describing the prefix itself, the rest of a record is its metadata
+PREFIX_FIELDS = ('bgpPrefix', 'bgpPrefixNetworkAddress', 'bgpPrefixLastAddress')
+
+_MAGIC = b'BDCPFX1\n'
+
+# Every array of an index, swapped in as a whole on rebuilds
+_Snapshot = namedtuple('_Snapshot', 'networks lengths meta_ids starts ends owners metadata')
+
+
+class PrefixIndex:
+    """
+    Offline index of announced IPv4 prefixes built from `BigDataCloud.prefixes_list`,
+    answering `network_by_ip`-style lookups locally.
+
+    Prefixes are kept in compact arrays, along with a flattened table of disjoint
+    address ranges each mapped to its most specific prefix, so a lookup is a
+    single binary search. Metadata shared by many prefixes (e.g. the same ASN)
+    is stored once.
+
+    Every change (`refresh`, `update`, `remove`) rebuilds the whole lookup table
+    """
+
+    def __init__(self):
+        self._snapshot = _Snapshot(array('I'), array('B'), array('I'), array('I'), array('I'), array('I'), [])
+
+    def _prefixes(self):
+        """Internal function that returns the indexed prefixes as a {(network, length): metadata} dict"""
+
+        snap = self._snapshot
+
+        return {(net, length): snap.metadata[meta_id]
+                for net, length, meta_id in zip(snap.networks, snap.lengths, snap.meta_ids)}
+
+    @classmethod
+    def build(cls, client, *, bogons_only:bool=False, batch_size:int=1000, lang:str='en'):
+        """
+        Builds an index by paging through the whole prefixes list
+
+        :param: :client: A `BigDataCloud` instance
+        :param: :bogons_only: Limit to bogon routes only or not
+        :param: :batch_size: Prefixes fetched per request. Maximum value = 1000
+        :param: :lang: Preferred language for locality names in ISO 639-1 format
+        """
+
+        index = cls()
+        index.refresh(client, bogons_only=bogons_only, batch_size=batch_size, lang=lang)
+
+        return index
+
+    def refresh(self, client, *, bogons_only:bool=False, batch_size:int=1000, lang:str='en'):
+        """
+        Rebuilds the index from the whole prefixes list, fetched again, so withdrawn
+        prefixes are dropped and the others updated. This is a full rebuild, taking
+        O(N log N) however few prefixes changed. Readers keep seeing the previous
+        index until the rebuilt one is swapped in
+
+        :param: :client: A `BigDataCloud` instance
+        :param: :bogons_only: Limit to bogon routes only or not
+        :param: :batch_size: Prefixes fetched per request. Maximum value = 1000
+        :param: :lang: Preferred language for locality names in ISO 639-1 format
+
+        :return: dict of the number of prefixes `added`, `changed` and `withdrawn` since the previous index
+        """
+
+        records = client.iter_prefixes(bogons_only=bogons_only, batch_size=batch_size, lang=lang)
+        prefixes = dict(filter(None, map(self._parse, records)))
+        previous = self._prefixes()
+
+        self._load(prefixes)
+
+        return {
+            'added': sum(prefix not in previous for prefix in prefixes),
+            'changed': sum(prefix in previous and previous[prefix] != meta for prefix, meta in prefixes.items()),
+            'withdrawn': sum(prefix not in prefixes for prefix in previous),
+        }
+
+    @staticmethod
+    def _parse(record:dict):
+        """
+        Internal function that parses a prefix record
+
+        :return: ((`network`, `length`), metadata), or None if the record has no valid prefix
+        """
+
+        try:
+            network = ipaddress.IPv4Network(record['bgpPrefix'], strict=False)
+        except (KeyError, ValueError):
+            return None
+
+        meta = {k: v for k, v in record.items() if k not in PREFIX_FIELDS}
+        return (int(network.network_address), network.prefixlen), meta
+
+    def update(self, records):
+        """
+        Adds or replaces prefixes, then rebuilds the lookup table
+
+        :param: :records: Iterable of prefix records as returned by `prefixes_list`
+        """
+
+        prefixes = self._prefixes()
+        prefixes.update(filter(None, map(self._parse, records)))
+
+        self._load(prefixes)
+
+    def remove(self, cidrs):
+        """
+        Removes prefixes, then rebuilds the lookup table
+
+        :param: :cidrs: Iterable of prefixes in a x.x.x.x/y format
+        """
+
+        drop = {(int(n.network_address), n.prefixlen) for n in map(ipaddress.IPv4Network, cidrs)}
+        prefixes = {prefix: meta for prefix, meta in self._prefixes().items() if prefix not in drop}
+
+        self._load(prefixes)
+
+    def _load(self, prefixes:dict):
+        """Internal function that rebuilds every array from a {(network, length): metadata} dict"""
+
+        networks, lengths, meta_ids, metadata = array('I'), array('B'), array('I'), []
+        seen = {}
+
+        for (net, length), meta in sorted(prefixes.items(), key=lambda item: (item[0][0], item[0][1])):
+            key = json.dumps(meta, sort_keys=True)
+            if key not in seen:
+                seen[key] = len(metadata)
+                metadata.append(meta)
+
+            networks.append(net)
+            lengths.append(length)
+            meta_ids.append(seen[key])
+
+        starts, ends, owners = self._flatten(networks, lengths)
+
+        # Swap everything in at once so concurrent readers never see a half-built index
+        self._snapshot = _Snapshot(networks, lengths, meta_ids, starts, ends, owners, metadata)
+
+    @staticmethod
+    def _flatten(networks, lengths):
+        """
+        Internal function that splits nested prefixes (sorted by network, then
+        length) into disjoint ranges, each owned by its most specific prefix
+        """
+
+        starts, ends, owners = array('I'), array('I'), array('I')
+        stack = []
+        cursor = 0
+
+        def emit(start, end, owner):
+            if start <= end:
+                starts.append(start)
+                ends.append(end)
+                owners.append(owner)
+
+        for i, (net, length) in enumerate(zip(networks, lengths)):
+            last = net + (1 << (32 - length)) - 1
+
+            while stack and stack[-1][0] < net:
+                end, owner = stack.pop()
+                emit(cursor, end, owner)
+                cursor = end + 1
+
+            if stack:
+                emit(cursor, net - 1, stack[-1][1])
+
+            stack.append((last, i))
+            cursor = net
+
+        while stack:
+            end, owner = stack.pop()
+            emit(cursor, end, owner)
+            cursor = end + 1
+
+        return starts, ends, owners
+
+    def network_by_ip(self, ip:str):
+        """
+        Looks up the most specific announced prefix containing an IPv4 address
+
+        :param: :ip: IPv4 IP address in a string format
+
+        :return: dict of the prefix and its metadata, or None when the address isn't covered
+        """
+
+        address = int(ipaddress.IPv4Address(ip))
+        snap = self._snapshot
+        i = bisect.bisect_right(snap.starts, address) - 1
+
+        if i < 0 or snap.ends[i] < address:
+            return None
+
+        owner = snap.owners[i]
+        net, length = snap.networks[owner], snap.lengths[owner]
+        network = ipaddress.IPv4Network((net, length))
+
+        result = {
+            'bgpPrefix': str(network),
+            'bgpPrefixNetworkAddress': str(network.network_address),
+            'bgpPrefixLastAddress': str(network.broadcast_address),
+        }
+        result.update(snap.metadata[snap.meta_ids[owner]])
+
+        return result
+
+    def __contains__(self, ip:str):
+        return self.network_by_ip(ip) is not None
+
+    def __len__(self):
+        return len(self._snapshot.networks)
+
+    def save(self, path:str):
+        """Saves the index to disk"""
+
+        *arrays, metadata = self._snapshot
+        header = dict(byteorder=sys.byteorder, sizes=[len(a) for a in arrays], metadata=metadata)
+
+        with open(path, 'wb') as f:
+            f.write(_MAGIC)
+            f.write(json.dumps(header, separators=(',', ':')).encode() + b'\n')
+            for a in arrays:
+                a.tofile(f)
+
+    @classmethod
+    def load(cls, path:str):
+        """Loads an index previously saved with `save()`"""
+
+        index = cls()
+
+        with open(path, 'rb') as f:
+            if f.readline() != _MAGIC:
+                raise ValueError(f"{path} is not a prefix index file")
+
+            header = json.loads(f.readline())
+            arrays = (array('I'), array('B'), array('I'), array('I'), array('I'), array('I'))
+
+            for a, size in zip(arrays, header['sizes']):
+                a.fromfile(f, size)
+                if header['byteorder'] != sys.byteorder:
+                    a.byteswap()
+
+        index._snapshot = _Snapshot(*arrays, header['metadata'])
+
+        return index
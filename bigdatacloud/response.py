@@ -0,0 +1,85 @@
+import json
+from collections.abc import Mapping
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Fastest available JSON decoder, `orjson` when installed
+loads = orjson.loads if orjson is not None else json.loads
+
+
+class LazyResponse(Mapping):
+    """
+    Read-only view of an api response that keeps the raw JSON bytes and only
+    decodes them the first time a field is accessed. The raw bytes can be passed
+    through as-is without ever being decoded
+
+    :param: :raw: JSON body of the response
+    """
+
+    __slots__ = ('raw', '_data')
+
+    def __init__(self, raw:bytes):
+        self.raw = raw
+        self._data = None
+
+    def json(self):
+        """
+        :return: the decoded response
+        """
+
+        if self._data is None:
+            self._data = loads(self.raw)
+
+        return self._data
+
+    @property
+    def decoded(self):
+        """Whether the raw bytes have been decoded yet"""
+
+        return self._data is not None
+
+    def __getitem__(self, key):
+        return self.json()[key]
+
+    def __iter__(self):
+        return iter(self.json())
+
+    def __len__(self):
+        return len(self.json())
+
+    def __repr__(self):
+        if self._data is None:
+            return f"LazyResponse(raw={self.raw!r})"
+        return f"LazyResponse({self._data!r})"
+
+
+def project(response, fields):
+    """
+    Picks a subset of fields from a response. Nested fields are given as
+    dotted paths, e.g. 'location.timeZone.ianaTimeId'. Fields of other 
+    objects, such as `bigdatacloud.models`, are read from their attributes
+
+    :return: dict of the fields present in the response, keyed as requested
+    """
+
+    projected = {}
+
+    for field in fields:
+        value = response
+        for part in field.split('.'):
+            if isinstance(value, Mapping):
+                if part not in value:
+                    break
+                value = value[part]
+            elif hasattr(value, part) and not part.startswith('_'):
+                value = getattr(value, part)
+            else:
+                break
+        else:
+            projected[field] = value
+
+    return projected
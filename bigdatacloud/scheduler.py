@@ -0,0 +1,131 @@
+import time, random, threading
+from email.utils import parsedate_to_datetime
+
+
+# Status codes worth retrying: throttling and transient server errors
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+
+    :param: :rate: Tokens (requests) added per second
+    :param: :burst: Maximum number of tokens that can accumulate. Defaults to `rate`
+    """
+
+    def __init__(self, rate:float, burst:float=0):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Takes a token, borrowing against future refills when the bucket is empty
+
+        :return: seconds the caller has to wait before using the token
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            return max(0.0, -self._tokens / self.rate)
+
+    def pause(self, seconds:float):
+        """Drains the bucket so that no token is handed out for `seconds`"""
+
+        with self._lock:
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class RequestScheduler:
+    """
+    Decides when requests are sent: timeouts, retries with exponential backoff and
+    jitter, `Retry-After` support and an optional rate limit. A scheduler can be
+    shared by several clients (and threads) to share one rate limit
+
+    :param: :connect_timeout: Seconds to wait for a connection to the api
+    :param: :read_timeout: Seconds to wait for the api to respond
+    :param: :retries: Maximum number of retries of a failed request
+    :param: :backoff: Base delay in seconds, doubled on every retry
+    :param: :max_backoff: Maximum delay in seconds between retries, unless the api asks for longer
+    :param: :rate: Maximum number of requests per second. 0 means no limit
+    :param: :burst: Number of requests that can be sent at once before `rate` applies
+    :param: :retry_statuses: HTTP status codes that are retried
+    """
+
+    def __init__(self, *, connect_timeout:float=3.05, read_timeout:float=30, retries:int=3, backoff:float=0.5,
+                 max_backoff:float=30, rate:float=0, burst:float=0, retry_statuses=RETRYABLE_STATUSES):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.bucket = TokenBucket(rate, burst) if rate else None
+
+    @property
+    def timeout(self):
+        """(`connect`, `read`) timeouts as accepted by `requests`"""
+
+        return (self.connect_timeout, self.read_timeout)
+
+    def reserve(self):
+        """
+        Reserves a slot for the next request
+
+        :return: seconds to wait before sending it
+        """
+
+        return self.bucket.reserve() if self.bucket is not None else 0.0
+
+    def retry_delay(self, attempt:int, status:int=None, retry_after:str=None):
+        """
+        Decides whether a failed request is retried
+
+        :param: :attempt: Number of retries made so far
+        :param: :status: HTTP status code of the response, None if no response was received
+        :param: :retry_after: `Retry-After` header of the response, if any
+
+        :return: seconds to wait before retrying, or None if the request shouldn't be retried
+        """
+
+        if attempt >= self.retries or (status is not None and status not in self.retry_statuses):
+            return None
+
+        delay = _parse_retry_after(retry_after)
+
+        if delay is None:
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            delay = delay / 2 + random.uniform(0, delay / 2)
+        elif self.bucket is not None:
+            # The api is throttling us, hold back every other request too
+            self.bucket.pause(delay)
+
+        return delay
+
+
+def _parse_retry_after(value:str):
+    """
+    Parses a `Retry-After` header, given either in seconds or as an HTTP date
+
+    :return: seconds to wait, or None if absent or invalid
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
@@ -0,0 +1,94 @@
+import asyncio, threading
+
+
+class _Call:
+    """A request in flight, awaited by every caller sharing it"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls across threads: the first caller runs
+    the call while the others wait for, and share, its result or exception
+
+    :attr: :coalesced: Number of calls answered by another caller's request
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key:str, fn):
+        """
+        Runs `fn()` unless a call with the same `key` is already in flight,
+        in which case its outcome is awaited instead
+
+        :return: the result of `fn()`
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces concurrent identical calls within an event loop: the first caller
+    starts the call while the others await, and share, its outcome. A cancelled
+    caller doesn't cancel the call for the others
+
+    :attr: :coalesced: Number of calls answered by another caller's request
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+
+    async def do(self, key:str, fn):
+        """
+        Awaits `fn()` unless a call with the same `key` is already in flight,
+        in which case its outcome is awaited instead
+
+        :return: the result of `fn()`
+        """
+
+        task = self._calls.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
@@ -0,0 +1,223 @@
+import time, threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:
+    try:
+        from backports.zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    except ImportError:
+        ZoneInfo = ZoneInfoNotFoundError = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Timestamps are converted by buckets of this many seconds, sharing an offset
+# when the zone has no transition within the bucket
+BUCKET = 3600
+
+
+def _format_offset(seconds:int):
+    sign = '-' if seconds < 0 else '+'
+    hours, minutes = divmod(abs(seconds) // 60, 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
+class LocalTimeZones:
+    """
+    Answers time zone queries from the system tz database, without calling the api.
+    Requires `zoneinfo` (Python 3.9+) or `backports.zoneinfo`.
+
+    The time zones `timezone_by_ip` and `timezone_by_location` resolve are remembered,
+    so later conversions for the same IP address or location stay local too
+
+    :param: :client: Optional `BigDataCloud` instance, resolving the time zones of
+                     IP addresses and locations not seen yet
+    :param: :maxsize: Maximum number of IP addresses and locations remembered
+    """
+
+    def __init__(self, client=None, *, maxsize:int=100000):
+        if ZoneInfo is None:
+            raise ImportError("LocalTimeZones requires `zoneinfo`. Install it with `pip install backports.zoneinfo`")
+
+        self.client = client
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._zones = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def zone(timezone_id:str):
+        """
+        :return: the `ZoneInfo` of an IANA time zone, e.g. 'Australia/Sydney'
+        """
+
+        try:
+            return ZoneInfo(timezone_id)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"{timezone_id} is not a known IANA time zone")
+
+    def timezone_info(self, *, timezone_id:str='', utc_reference:int=0):
+        """
+        Local equivalent of `BigDataCloud.timezone_info`. The tz database has no full
+        zone names, e.g. 'Australian Eastern Daylight Time', so `effectiveTimeZoneFull`
+        is left out; `effectiveTimeZoneShort` holds the abbreviation, e.g. 'AEDT'
+
+        :param: :timezone_id: Time Zone name in IANA format e.g 'Australia/Sydney'
+        :param: :utc_reference: UTC time reference in Unix Time Seconds format.
+                                When omitted, the current time is assumed
+
+        :return: dict shaped like the api's response
+        """
+
+        utc_reference = int(utc_reference or time.time())
+        local = datetime.fromtimestamp(utc_reference, self.zone(timezone_id))
+        offset = int(local.utcoffset().total_seconds())
+
+        return {
+            'ianaTimeId': timezone_id,
+            'displayName': f"(UTC{_format_offset(offset)}) {timezone_id}",
+            'effectiveTimeZoneShort': local.tzname(),
+            'utcOffsetSeconds': offset,
+            'utcOffset': _format_offset(offset),
+            'isDaylightSavingTime': bool(local.dst()),
+            'localTime': local.replace(tzinfo=None).isoformat(),
+            'utcTime': datetime.fromtimestamp(utc_reference, timezone.utc).replace(tzinfo=None).isoformat(),
+        }
+
+    def _resolve(self, key, query, utc_reference:int):
+        """
+        Internal function that answers locally for a remembered `key`, or through
+        `query()` otherwise, remembering the time zone it resolves to
+        """
+
+        with self._lock:
+            timezone_id = self._zones.get(key)
+            if timezone_id is not None:
+                self._zones.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if timezone_id is not None:
+            return self.timezone_info(timezone_id=timezone_id, utc_reference=utc_reference)
+        if self.client is None:
+            raise LookupError(f"The time zone of {key[1]} isn't known, and there's no client to resolve it")
+
+        resp = query()
+        timezone_id = resp.get('ianaTimeId') if hasattr(resp, 'get') else getattr(resp, 'iana_time_id', None)
+        if timezone_id:
+            self.remember(key, timezone_id)
+
+        return resp
+
+    def remember(self, key, timezone_id:str):
+        """
+        Remembers the time zone of an IP address, keyed ('ip', `ip`),
+        or of a location, keyed ('location', (`latitude`, `longitude`))
+        """
+
+        with self._lock:
+            self._zones[key] = timezone_id
+            self._zones.move_to_end(key)
+            if len(self._zones) > self.maxsize:
+                self._zones.popitem(last=False)
+
+    def timezone_by_ip(self, *, ip:str, utc_reference:int=0):
+        """
+        Local equivalent of `BigDataCloud.timezone_by_ip`, querying the api
+        only for addresses whose time zone isn't known yet
+
+        :return: dict shaped like the api's response
+        """
+
+        query = lambda: self.client.timezone_by_ip(ip=ip, utc_reference=utc_reference)
+        return self._resolve(('ip', ip), query, utc_reference)
+
+    def timezone_by_location(self, *, latitude:str, longitude:str, utc_reference:int=0):
+        """
+        Local equivalent of `BigDataCloud.timezone_by_location`, querying the api
+        only for locations whose time zone isn't known yet
+
+        :return: dict shaped like the api's response
+        """
+
+        query = lambda: self.client.timezone_by_location(latitude=latitude, longitude=longitude,
+                                                         utc_reference=utc_reference)
+        return self._resolve(('location', (str(latitude), str(longitude))), query, utc_reference)
+
+    def utc_offsets(self, timezone_id:str, timestamps):
+        """
+        Converts many UTC timestamps at once. Timestamps are bucketed by the hour,
+        and a bucket without a transition is converted with a single lookup
+
+        :param: :timezone_id: Time Zone name in IANA format e.g 'Australia/Sydney'
+        :param: :timestamps: Iterable of UTC times in Unix Time Seconds, or a NumPy array
+
+        :return: UTC offsets in seconds, as a list, or a NumPy array for an array
+        """
+
+        zone = self.zone(timezone_id)
+        buckets = {}
+
+        def offset_at(ts):
+            return int(datetime.fromtimestamp(ts, zone).utcoffset().total_seconds())
+
+        def bucket_offset(bucket):
+            start = bucket * BUCKET
+            # Only shared if the zone doesn't change offset within the bucket
+            offset = offset_at(start)
+            buckets[bucket] = offset if offset == offset_at(start + BUCKET - 1) else None
+            return buckets[bucket]
+
+        if numpy is not None and isinstance(timestamps, numpy.ndarray):
+            values = timestamps.astype('int64')
+            indices = values // BUCKET
+            offsets = numpy.empty(len(values), dtype='int64')
+
+            for bucket in numpy.unique(indices):
+                mask = indices == bucket
+                offset = bucket_offset(int(bucket))
+                offsets[mask] = offset if offset is not None else list(map(offset_at, values[mask].tolist()))
+            return offsets
+
+        offsets = []
+        for ts in timestamps:
+            ts = int(ts)
+            bucket = ts // BUCKET
+            offset = buckets[bucket] if bucket in buckets else bucket_offset(bucket)
+            offsets.append(offset if offset is not None else offset_at(ts))
+
+        return offsets
+
+    def local_times(self, timezone_id:str, timestamps):
+        """
+        Converts many UTC timestamps to local wall-clock times at once
+
+        :return: local times in Unix Time Seconds (i.e. shifted by the UTC offset),
+                 as a list, or a NumPy array for an array
+        """
+
+        if numpy is not None and isinstance(timestamps, numpy.ndarray):
+            return timestamps.astype('int64') + self.utc_offsets(timezone_id, timestamps)
+
+        timestamps = list(timestamps)
+        offsets = self.utc_offsets(timezone_id, timestamps)
+
+        return [int(ts) + offset for ts, offset in zip(timestamps, offsets)]
+
+    def stats(self):
+        """
+        :return: dict of statistics of the remembered time zones
+        """
+
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._zones)}
+
+    def __repr__(self):
+        return f"LocalTimeZones(remembered={len(self._zones)})"
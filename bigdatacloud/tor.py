@@ -0,0 +1,194 @@
+import os, sys, json, time, socket, warnings, threading, ipaddress
+from array import array
+
+from .config import CACHE_TTLS
+
+
+_MAGIC = b'BDCTOR1\n'
+
+# IPv6 addresses are offset past every IPv4 address, so both share one set of ints
+_IPV6_OFFSET = 1 << 32
+
+
+def _ip_key(ip:str):
+    """
+    :return: the int an IP address is kept as
+    """
+
+    try:
+        # Dotted-quad IPv4 addresses skip the (much slower) full parse
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, ip), 'big')
+    except (OSError, TypeError):
+        address = ipaddress.ip_address(ip)
+        return int(address) + (_IPV6_OFFSET if address.version == 6 else 0)
+
+
+class TorExitNodes:
+    """
+    Local set of the active TOR exit nodes, paged from `tor_exit_nodes_list`, answering
+    `is_tor_exit(ip)` with a single set lookup. Addresses are kept as ints.
+
+    `start()` refreshes the set in a background thread every `interval` seconds.
+    A refreshed set is built aside and swapped in whole, so readers never wait,
+    and keep seeing the previous set should a refresh fail.
+
+    Given a `snapshot` path, the set is loaded from it at creation, so checks are
+    answered right away on cold starts, and saved to it after every refresh
+
+    :param: :client: A `BigDataCloud` instance
+    :param: :interval: Seconds between refreshes
+    :param: :snapshot: Optional path of the snapshot file
+    :param: :batch_size: Nodes fetched per request. Maximum value = 1000
+    """
+
+    def __init__(self, client, *, interval:float=CACHE_TTLS['insights'], snapshot:str=None, batch_size:int=1000):
+        self.client = client
+        self.interval = interval
+        self.snapshot = snapshot
+        self.batch_size = batch_size
+        self.updated = 0
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+        self._nodes = frozenset()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        if snapshot is not None and os.path.exists(snapshot):
+            self.load(snapshot)
+
+    def is_tor_exit(self, ip:str):
+        """
+        :param: :ip: IPv4 or IPv6 address in a string format
+
+        :return: whether the address is an active TOR exit node
+        """
+
+        return _ip_key(ip) in self._nodes
+
+    __contains__ = is_tor_exit
+
+    def refresh(self):
+        """
+        Pages through the whole exit node list, then swaps the new set in
+
+        :return: number of exit nodes
+        """
+
+        nodes = set()
+        for node in self.client.iter_tor_exit_nodes(batch_size=self.batch_size):
+            try:
+                nodes.add(_ip_key(node['ip']))
+            except (KeyError, ValueError):
+                continue
+
+        with self._lock:
+            self._nodes = frozenset(nodes)
+            self.updated = time.time()
+            self.refreshes += 1
+
+        if self.snapshot is not None:
+            self.save(self.snapshot)
+
+        return len(nodes)
+
+    def _run(self):
+        # A snapshot fresh enough delays the first refresh
+        wait = max(0, self.updated + self.interval - time.time())
+
+        while not self._stop.wait(wait):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = e
+                warnings.warn(f"Refreshing the TOR exit nodes failed: {e!r}", RuntimeWarning)
+            wait = self.interval
+
+    def start(self):
+        """
+        Starts refreshing the set in a background thread. The first refresh starts right
+        away, unless the set loaded from the snapshot is fresh, in which case it waits until
+        the set is `interval` seconds old
+        """
+
+        if self._thread is not None and self._thread.is_alive():
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='tor-exit-nodes', daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        """Stops the background refreshes, waiting for one in progress"""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def save(self, path:str):
+        """Saves the set to disk"""
+
+        nodes, updated = self._nodes, self.updated
+        v4 = array('I', sorted(key for key in nodes if key < _IPV6_OFFSET))
+        v6 = sorted(key - _IPV6_OFFSET for key in nodes if key >= _IPV6_OFFSET)
+        header = dict(byteorder=sys.byteorder, updated=updated, ipv4=len(v4), ipv6=len(v6))
+
+        with open(f"{path}.tmp", 'wb') as f:
+            f.write(_MAGIC)
+            f.write(json.dumps(header, separators=(',', ':')).encode() + b'\n')
+            v4.tofile(f)
+            f.write(b''.join(key.to_bytes(16, 'big') for key in v6))
+        os.replace(f"{path}.tmp", path)
+
+    def load(self, path:str):
+        """
+        Loads a set previously saved with `save()`, keeping its age
+
+        :return: number of exit nodes
+        """
+
+        with open(path, 'rb') as f:
+            if f.readline() != _MAGIC:
+                raise ValueError(f"{path} is not a TOR exit node snapshot")
+
+            header = json.loads(f.readline())
+            v4 = array('I')
+            v4.fromfile(f, header['ipv4'])
+            if header['byteorder'] != sys.byteorder:
+                v4.byteswap()
+
+            data = f.read(16 * header['ipv6'])
+            v6 = (int.from_bytes(data[i:i + 16], 'big') + _IPV6_OFFSET for i in range(0, len(data), 16))
+
+            nodes = frozenset(v4).union(v6)
+
+        with self._lock:
+            self._nodes = nodes
+            self.updated = header['updated']
+
+        return len(nodes)
+
+    def stats(self):
+        """
+        :return: dict of the set's size, age in seconds, and refreshes
+        """
+
+        return {'size': len(self._nodes), 'age': time.time() - self.updated if self.updated else None,
+                'refreshes': self.refreshes, 'failures': self.failures}
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __repr__(self):
+        return f"TorExitNodes(size={len(self._nodes)})"
@@ -0,0 +1,143 @@
+import hashlib, threading
+from collections import OrderedDict
+
+
+def ua_key(user_agent:str):
+    """
+    :return: the 16-byte digest a user agent string is keyed by, however long the string
+    """
+
+    return hashlib.blake2b(user_agent.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class UserAgentCache:
+    """
+    Bounded LRU of parsed `user_agent_info` responses, keyed by a digest of the
+    raw user agent string rather than by the string itself.
+
+    `BigDataCloud.user_agent_info_many` keeps one per client
+
+    :param: :maxsize: Maximum number of user agents cached, the least recently used being evicted
+    """
+
+    def __init__(self, *, maxsize:int=10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_agent:str):
+        """
+        :return: the cached response for a user agent string, or None
+        """
+
+        return self._get(ua_key(user_agent))
+
+    def _get(self, key:bytes):
+        """Internal function that returns the cached response for a `ua_key` digest, or None"""
+
+        with self._lock:
+            resp = self._data.get(key)
+            if resp is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+            return resp
+
+    def put(self, user_agent:str, resp):
+        """Caches the response for a user agent string"""
+
+        self._put(ua_key(user_agent), resp)
+
+    def _put(self, key:bytes, resp):
+        """Internal function that caches the response for a `ua_key` digest"""
+
+        with self._lock:
+            self._data[key] = resp
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def batch(self, user_agents):
+        """:return: a `UserAgentBatch` parsing `user_agents` against the cache"""
+
+        return UserAgentBatch(self, user_agents)
+
+    def stats(self):
+        """
+        :return: dict of cache statistics
+        """
+
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data)}
+
+    def clear(self):
+        """Forgets every user agent"""
+
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, user_agent:str):
+        return ua_key(user_agent) in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"UserAgentCache(size={len(self._data)}, maxsize={self.maxsize})"
+
+
+class UserAgentBatch:
+    """
+    Parsing of many user agent strings. User agents are told apart by their
+    `ua_key`, as in the cache: each distinct one is looked up in the cache once,
+    and only those not cached are left in `unseen`, to be sent to the api
+
+    :param: :cache: The `UserAgentCache`
+    :param: :user_agents: Iterable of raw user agent strings
+    """
+
+    def __init__(self, cache:UserAgentCache, user_agents):
+        self.cache = cache
+        self.user_agents = list(user_agents)
+        self.keys = [ua_key(user_agent) for user_agent in self.user_agents]
+        self.known = {}
+
+        # The first string of each key stands for it
+        distinct = {}
+        for key, user_agent in zip(self.keys, self.user_agents):
+            distinct.setdefault(key, user_agent)
+
+        for key in distinct:
+            resp = cache._get(key)
+            if resp is not None:
+                self.known[key] = resp
+
+        self._unseen = [key for key in distinct if key not in self.known]
+        self.unseen = [distinct[key] for key in self._unseen]
+
+    def results(self, responses):
+        """
+        Takes the api's responses to `unseen`, in their order, caching the successful ones
+
+        :return: list of responses in the order of the user agents. A failed lookup
+                 holds the raised exception in place of its response
+        """
+
+        for key, resp in zip(self._unseen, responses):
+            if not isinstance(resp, Exception):
+                self.cache._put(key, resp)
+            self.known[key] = resp
+
+        return [self.known[key] for key in self.keys]
+
+
+def read_user_agents(path:str):
+    """
+    :return: the distinct user agent strings of a file, one per line, blank lines being skipped
+    """
+
+    with open(path, encoding='utf-8') as f:
+        return list(dict.fromkeys(line.strip() for line in f if line.strip()))
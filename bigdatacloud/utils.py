@@ -1,64 +1,109 @@
 
-
-import re, ipaddress
+import re, ipaddress, inspect
 from functools import wraps
 
+from .config import ISO_639_1_CODES
+from .response import project
 from .exceptions import UnsupportedLanguageError, InvalidGeolocationError
 
 
+SUPPORTED_LANGUAGES = frozenset(ISO_639_1_CODES.values())
+
+IPV4_PATTERN = re.compile(r"^(?:(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\.){3}(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\Z")
+EMAIL_PATTERN = re.compile(r"^[A-Za-z0-9\.\+_-]+@[A-Za-z0-9\._-]+\.[a-zA-Z]*$")
+COORDINATE_PATTERN = re.compile(r"^(\+|-)?(?:90(?:(?:\.0{1,6})?)|(?:[0-9]|[1-8][0-9])(?:(?:\.[0-9]{1,6})?))$")
+
+
+def _check_ip(ip, client):
+    # Dotted-quad IPv4 addresses skip the (much slower) full parse
+    if not (isinstance(ip, str) and IPV4_PATTERN.match(ip)):
+        ipaddress.ip_address(ip)
+
+def _check_cidr(cidr, client):
+    ipaddress.ip_network(cidr)
+
+def _check_lang(lang, client):
+    if lang not in client.SUPPORTED_LANGUAGES:
+        raise UnsupportedLanguageError(f"BigDataCloud currently doesn't support `localityLanguage`, {lang}.")
+
+def _check_email(email, client):
+    if not EMAIL_PATTERN.match(email):
+        raise ValueError(f"{email} is not a valid email address")
+
+def _check_utc_reference(utc_ref, client):
+    try:
+        int(utc_ref)
+    except (ValueError, TypeError, OverflowError):
+        raise ValueError(f"{utc_ref} is not a valid unix timestamp")
+
+def _check_number(number, client):
+    if not isinstance(number, str) or (number and not number.isdecimal()):
+        raise ValueError(f"{number} is not a valid phone number.\
+                         The phone number should be without hyphens or spaces")
+
+def _check_latitude(lat, client):
+    if not COORDINATE_PATTERN.match(lat):
+        raise InvalidGeolocationError(f"{lat} is not a valid WGS 84 reference system latitude coordinate")
+
+def _check_longitude(long, client):
+    if not COORDINATE_PATTERN.match(long):
+        raise InvalidGeolocationError(f"{long} is not a valid WGS 84 reference system longitude coordinate")
+
+
+# Maps parameters to their validators, in the order they're checked. Validators
+# are passed the argument and the client, whose `SUPPORTED_LANGUAGES` apply
+VALIDATORS = dict(
+    ip=_check_ip,
+    cidr=_check_cidr,
+    lang=_check_lang,
+    email_address=_check_email,
+    utc_reference=_check_utc_reference,
+    number=_check_number,
+    latitude=_check_latitude,
+    longitude=_check_longitude,
+)
+
+
+def validators_for(args):
+    """
+    :return: ((`arg`, `validator`), ...) for the arguments of `args` that are validated
+    """
+
+    return tuple((name, check) for name, check in VALIDATORS.items() if name in args)
+
+
+async def _project_awaited(resp, fields):
+    return project(await resp, fields)
+
+
 def validate_args(func):
-    """Utility to validate the different parameters"""
-    
+    """
+    Utility to validate the different parameters of an endpoint method. Its validators
+    are those of its `bigdatacloud.endpoints.Endpoint`, and languages are checked against the
+    client's `SUPPORTED_LANGUAGES`. Skipped when the client's `validate` is False.
+
+    Also adds the `fields` option to the method, projecting the response
+    onto the given fields (see `bigdatacloud.response.project`)
+    """
+
+    # Imported here, as the registry is built with `validators_for`
+    from .endpoints import ENDPOINTS
+
+    validators = ENDPOINTS[func.__name__].validators
+
     @wraps(func)
-    def wrapper(self, **kwargs):
-        to_validate = kwargs.keys()
-
-        if 'ip' in to_validate:
-            try:
-                ipaddress.ip_address(kwargs['ip'])
-            except ValueError:
-                raise
-
-        if 'cidr' in to_validate:
-            try:
-                ipaddress.ip_network(kwargs['cidr'])
-            except ValueError:
-                raise
-        
-        if 'lang' in to_validate:
-            lang = kwargs['lang']
-            if lang not in self.SUPPORTED_LANGUAGES:
-                raise UnsupportedLanguageError(f"BigDataCloud currently doesn't support `localityLanguage`, {lang}.")
-        
-        if 'email_address' in to_validate:
-            email = kwargs['email_address']
-            if not re.match(r"^[A-Za-z0-9\.\+_-]+@[A-Za-z0-9\._-]+\.[a-zA-Z]*$", email):
-                raise ValueError(f"{email} is not a valid email address")
-
-        if 'utc_reference' in to_validate:
-            utc_ref = kwargs['utc_reference']
-            try:
-                int(utc_ref)
-            except (ValueError, TypeError, OverflowError):
-                raise ValueError(f"{utc_ref} is not a valid unix timestamp")
-
-        if 'number' in to_validate:
-            number = kwargs['number']
-            try:
-                [int(i) for i in number]
-            except (ValueError):
-                raise ValueError(f"{number} is not a valid phone number.\
-                                 The phone number should be without hyphens or spaces")
-        
-        if 'latitude' in to_validate:
-            lat = kwargs['latitude']
-            if not re.match(r"^(\+|-)?(?:90(?:(?:\.0{1,6})?)|(?:[0-9]|[1-8][0-9])(?:(?:\.[0-9]{1,6})?))$", lat):
-                raise InvalidGeolocationError(f"{lat} is not a valid WGS 84 reference system latitude coordinate")
-
-        if 'longitude' in to_validate:
-            long = kwargs['longitude']
-            if not re.match(r"^(\+|-)?(?:90(?:(?:\.0{1,6})?)|(?:[0-9]|[1-8][0-9])(?:(?:\.[0-9]{1,6})?))$", long):
-                raise InvalidGeolocationError(f"{long} is not a valid WGS 84 reference system longitude coordinate")
-
-        return func(self, **kwargs)
-    return wrapper
\ No newline at end of file
+    def wrapper(self, *, fields=None, **kwargs):
+        if self.validate:
+            for name, check in validators:
+                if name in kwargs:
+                    check(kwargs[name], self)
+
+        resp = func(self, **kwargs)
+
+        if fields is None:
+            return resp
+        if inspect.isawaitable(resp):
+            return _project_awaited(resp, fields)
+
+        return project(resp, fields)
+    return wrapper
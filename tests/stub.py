@@ -0,0 +1,76 @@
+import json, threading
+from urllib.parse import urlsplit, parse_qsl
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Echoes the requested endpoint and query params back as JSON"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def handle(self):
+        with self.server.lock:
+            self.server.connections += 1
+        super().handle()
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        endpoint = parts.path.rsplit('/', 1)[-1]
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+
+        with self.server.lock:
+            self.server.requests.append((endpoint, params))
+
+        status, body = self.server.responder(endpoint, params)
+        payload = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def echo(endpoint, params):
+    return 200, {'endpoint': endpoint, 'params': params}
+
+
+class StubServer:
+    """
+    Local HTTP server standing in for the BigDataCloud API in offline tests
+
+    :param: :responder: Callable taking (`endpoint`, `params`) and returning (`status`, `body`)
+    """
+
+    def __init__(self, responder=echo):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self._server.daemon_threads = True
+        self._server.lock = threading.Lock()
+        self._server.connections = 0
+        self._server.requests = []
+        self._server.responder = responder
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/data"
+
+    @property
+    def connections(self):
+        return self._server.connections
+
+    @property
+    def requests(self):
+        return self._server.requests
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
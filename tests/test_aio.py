@@ -0,0 +1,81 @@
+import asyncio, threading, time
+
+import pytest
+
+from . import *
+from .stub import StubServer, echo
+
+from aiohttp import ClientResponseError
+from bigdatacloud.aio import AsyncBigDataCloud
+from bigdatacloud.cache import SQLiteCache
+from bigdatacloud.exceptions import UnsupportedLanguageError
+
+
+def _run(server, coro_fn, **kwargs):
+    async def main():
+        async with AsyncBigDataCloud(api_key='API_KEY', **kwargs) as client:
+            client.API_BASE_URL = server.url
+            return await coro_fn(client)
+
+    return asyncio.run(main())
+
+
+def test_async_endpoint():
+    with StubServer() as server:
+        resp = _run(server, lambda c: c.reverse_geocode(latitude=LATITUDE, longitude=LONGITUDE, lang=LANGUAGE))
+
+        assert resp['endpoint'] == 'reverse-geocode'
+        assert resp['params']['latitude'] == LATITUDE
+
+def test_async_concurrency_cap():
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def slow(endpoint, params):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return echo(endpoint, params)
+
+    async def many(client):
+        return await asyncio.gather(*(client.ip_geolocation(ip=IP) for _ in range(12)))
+
+    with StubServer(slow) as server:
+        results = _run(server, many, max_concurrency=3)
+
+    assert len(results) == 12
+    assert in_flight[1] <= 3
+
+def test_async_blocking_cache_off_the_loop(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), compact_interval=0)
+    threads = []
+
+    def recorded(method):
+        def wrapper(*args):
+            threads.append(threading.get_ident())
+            return method(*args)
+        return wrapper
+
+    cache.get, cache.set = recorded(cache.get), recorded(cache.set)
+
+    async def twice(client):
+        return [await client.country_info(code=CODE), await client.country_info(code=CODE)]
+
+    with StubServer() as server:
+        first, second = _run(server, twice, cache=cache)
+
+    assert first == second and len(server.requests) == 1
+    assert len(threads) == 3 and threading.get_ident() not in threads
+    cache.close()
+
+def test_async_http_error():
+    with StubServer(lambda e, p: (403, {})) as server:
+        with pytest.raises(ClientResponseError):
+            _run(server, lambda c: c.country_info(code=CODE))
+
+def test_async_validation():
+    with pytest.raises(UnsupportedLanguageError):
+        AsyncBigDataCloud(api_key='API_KEY').ip_geolocation(ip=IP, lang='yy')
@@ -0,0 +1,119 @@
+import time, threading
+
+import pytest
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.asns import ASNStore, normalize_asn
+from bigdatacloud.cache import MemoryCache
+from bigdatacloud.scheduler import RequestScheduler
+
+
+def asn_info(endpoint, params):
+    number = int(params['asn'][2:])
+    if number == 666:
+        return 503, {}
+    return 200, {'asn': f"AS{number}", 'asnNumeric': number, 'organisation': 'AT&T Services, Inc.',
+                 'receivingFrom': [{'asn': 'AS3356'}] * 50, 'endpoint': endpoint}
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud(api_key='API_KEY', **kwargs)
+    client.API_BASE_URL = server.url
+    return client
+
+
+def test_normalize_asn():
+    assert normalize_asn(ASN) == normalize_asn('asn7018') == normalize_asn(' 7018 ') == normalize_asn(7018) == 7018
+
+    for asn in ('AS', 'ASX7018', '-1', 2 ** 32, True):
+        with pytest.raises(ValueError):
+            normalize_asn(asn)
+
+def test_asn_forms_share_an_entry():
+    with StubServer(asn_info) as server, _client(server) as client:
+        store = ASNStore(client)
+
+        assert store.asn_info(ASN)['asnNumeric'] == 7018
+        assert store.asn_info('ASN7018') == store.asn_info(7018)
+        assert len(server.requests) == 1
+
+        store = ASNStore(client, full=True)
+        assert store.asn_info(ASN)['endpoint'] == 'asn-info-full'
+
+def test_preload_and_get_asn():
+    with StubServer(asn_info) as server, _client(server, scheduler=RequestScheduler(retries=0)) as client:
+        store = ASNStore(client, workers=4, hot=2)
+
+        failures = store.preload(['AS1', 'ASN2', '3', 3, 666])
+        assert [number for number, _ in failures] == [666]
+        assert len(server.requests) == 4
+
+        # Stored compressed, and decoded again once evicted from the hot responses
+        assert store.stats()['bytes'] < 3 * len(str(store.get_asn(1)))
+        assert [store.get_asn(n)['asnNumeric'] for n in (1, 2, 3, 1)] == [1, 2, 3, 1]
+
+        # Stored ASNs aren't fetched again
+        store.preload([1, 2, 3])
+        assert len(server.requests) == 4
+
+def test_get_asn_never_waits():
+    release = threading.Event()
+
+    def slow(endpoint, params):
+        release.wait(5)
+        return asn_info(endpoint, params)
+
+    with StubServer(slow) as server, _client(server) as client:
+        store = ASNStore(client)
+
+        started = time.perf_counter()
+        assert store.get_asn(7018) is None
+        assert store.get_asn(7018) is None
+        assert time.perf_counter() - started < 1
+
+        release.set()
+        store.close()
+        assert store.get_asn(7018)['asnNumeric'] == 7018
+        assert len(server.requests) == 1
+
+def test_stale_responses_are_refreshed():
+    # Past the response cache, which holds ASNs as long as the store
+    with StubServer(asn_info) as server, _client(server, cache=MemoryCache()) as client:
+        store = ASNStore(client, max_age=0)
+        store.preload([7018])
+        time.sleep(.01)
+
+        # Served while refreshed in the background
+        assert store.get_asn(7018)['asnNumeric'] == 7018
+        store.close()
+        assert len(server.requests) == 2
+
+        assert store.refresh() == []
+        assert len(server.requests) == 3
+
+def test_background_failures_are_recorded():
+    with StubServer(asn_info) as server, _client(server, scheduler=RequestScheduler(retries=0)) as client:
+        store = ASNStore(client)
+
+        with pytest.warns(RuntimeWarning):
+            assert store.get_asn(666) is None
+            store.close()
+
+        assert store.stats()['failures'] == 1 and store.last_error is not None
+        assert store.stats()['misses'] == 1 and 666 not in store
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'asns.bdc')
+
+    with StubServer(asn_info) as server, _client(server) as client:
+        store = ASNStore(client)
+        store.preload([1, 2, 7018])
+        store.save(path)
+
+        loaded = ASNStore(None)
+        assert loaded.load(path) == 3
+        assert loaded.get_asn(ASN) == store.get_asn(ASN)
+        assert 2 in loaded and 3 not in loaded
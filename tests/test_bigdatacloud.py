@@ -1,9 +1,13 @@
 
+import inspect
+
 import pytest
 
 from . import *
+from .stub import StubServer
 
 from bigdatacloud import BigDataCloud
+from bigdatacloud.endpoints import ENDPOINTS
 from requests.exceptions import HTTPError
 from bigdatacloud.exceptions import UnsupportedLanguageError, InvalidGeolocationError
 
@@ -240,6 +244,17 @@ def test_language_validation():
     with pytest.raises(UnsupportedLanguageError):
         bdc_valid.ip_geolocation(ip=IP, lang='yy')
 
+def test_subclass_languages():
+    class EnglishOnly(BigDataCloud):
+        SUPPORTED_LANGUAGES = frozenset({'en'})
+
+    with pytest.raises(UnsupportedLanguageError):
+        EnglishOnly(api_key='API_KEY').ip_geolocation(ip=IP, lang='fr')
+
+    with StubServer() as server, EnglishOnly(api_key='API_KEY') as client:
+        client.API_BASE_URL = server.url
+        assert client.ip_geolocation(ip=IP, lang='en')['params']['localityLanguage'] == 'en'
+
 def test_ip_validation():
     with pytest.raises(ValueError):
         bdc_valid.ip_geolocation(ip='192.168', lang=LANGUAGE)
@@ -263,3 +278,24 @@ def test_longitude_validation():
 def test_representation():
     assert "BigDataCloud(api_key='API_KEY')" == repr(bdc_invalid)        
 
+
+def test_ip_validation_trailing_newline():
+    with pytest.raises(ValueError):
+        bdc_valid.ip_geolocation(ip=IP + '\n', lang=LANGUAGE)
+
+def test_number_validation_type():
+    with pytest.raises(ValueError):
+        bdc_valid.phone_number_validate(number=8794425261, country_code=COUNTRY_CODE)
+
+def test_trusted_input_skips_validation():
+    with StubServer() as server, BigDataCloud(api_key='API_KEY', validate=False) as client:
+        client.API_BASE_URL = server.url
+        assert client.ip_geolocation(ip='192.168', lang='yy')['params']['ip'] == '192.168'
+
+def test_endpoint_registry():
+    assert len(ENDPOINTS) == 24
+
+    for name, endpoint in ENDPOINTS.items():
+        params = inspect.signature(getattr(BigDataCloud, name)).parameters
+        assert tuple(params)[1:] == endpoint.args
+        assert len(endpoint.args) == len(endpoint.params)
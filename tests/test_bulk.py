@@ -0,0 +1,56 @@
+import asyncio
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.aio import AsyncBigDataCloud
+from bigdatacloud.scheduler import RequestScheduler
+from requests.exceptions import HTTPError
+
+
+IPS = ['1.1.1.1', '8.8.8.8', '1.1.1.1', '9.9.9.9', '8.8.8.8']
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud(api_key='API_KEY', **kwargs)
+    client.API_BASE_URL = server.url
+    return client
+
+
+def test_many_preserves_order_and_dedups():
+    with StubServer() as server, _client(server) as client:
+        results = client.ip_geolocation_many(IPS, lang=LANGUAGE, workers=4)
+
+        assert [r['params']['ip'] for r in results] == IPS
+        assert len(server.requests) == 3
+
+def test_many_per_item_errors():
+    def responder(endpoint, params):
+        status = 500 if params['ip'] == '8.8.8.8' else 200
+        return status, {'ip': params['ip']}
+
+    with StubServer(responder) as server, _client(server, scheduler=RequestScheduler(retries=0)) as client:
+        results = client.country_by_ip_many(IPS + ['not-an-ip'])
+
+        assert results[0] == {'ip': '1.1.1.1'}
+        assert isinstance(results[1], HTTPError)
+        assert isinstance(results[5], ValueError)
+
+def test_many_variants():
+    with StubServer() as server, _client(server) as client:
+        assert client.network_by_ip_many(IPS)[3]['endpoint'] == 'network-by-ip'
+        assert client.timezone_by_ip_many(IPS, utc_reference=UTC_REF)[0]['params']['utcReference'] == str(UTC_REF)
+
+def test_async_many():
+    async def main(server):
+        async with AsyncBigDataCloud(api_key='API_KEY') as client:
+            client.API_BASE_URL = server.url
+            return await client.ip_geolocation_many(IPS + ['not-an-ip'])
+
+    with StubServer() as server:
+        results = asyncio.run(main(server))
+
+        assert [r['params']['ip'] for r in results[:-1]] == IPS
+        assert isinstance(results[-1], ValueError)
+        assert len(server.requests) == 3
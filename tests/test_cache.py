@@ -0,0 +1,119 @@
+import json, time
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.cache import MemoryCache, SQLiteCache
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud(api_key='API_KEY', **kwargs)
+    client.API_BASE_URL = server.url
+    return client
+
+
+def test_memory_cache_lru():
+    cache = MemoryCache(maxsize=2)
+    cache.set('a', 1, 60)
+    cache.set('b', 2, 60)
+    cache.get('a')
+    cache.set('c', 3, 60)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats() == dict(hits=2, misses=1, evictions=1, size=2)
+
+def test_memory_cache_ttl():
+    cache = MemoryCache()
+    cache.set('a', 1, 0.01)
+    time.sleep(0.02)
+
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+def test_client_cache():
+    cache = MemoryCache()
+
+    with StubServer() as server, _client(server, cache=cache) as client:
+        first = client.country_info(code=CODE, lang=LANGUAGE)
+        second = client.country_info(code=CODE, lang=LANGUAGE)
+        client.country_info(code='gb', lang=LANGUAGE)
+
+        assert first == second
+        assert len(server.requests) == 2
+        assert cache.stats()['hits'] == 1
+        assert 'key' not in next(iter(cache._data))
+
+def test_client_cache_disabled_endpoint():
+    with StubServer() as server, _client(server, cache=MemoryCache(), cache_ttls={'country_info': 0}) as client:
+        client.country_info(code=CODE, lang=LANGUAGE)
+        client.country_info(code=CODE, lang=LANGUAGE)
+
+        assert len(server.requests) == 2
+
+def test_client_cache_skips_changing_responses():
+    with StubServer() as server, _client(server, cache=MemoryCache()) as client:
+        for _ in range(2):
+            client.client_ip()
+            client.timezone_info(timezone_id=TIMEZONE_ID, utc_reference=UTC_REF)
+            client.tor_exit_nodes_list(batch_size=10, offset=0, lang=LANGUAGE)
+            client.prefixes_list(bogons_only=False, batch_size=10, offset=0, lang=LANGUAGE)
+
+        assert len(server.requests) == 8 and len(client.cache) == 0
+
+def test_sqlite_cache_shared(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    writer = SQLiteCache(path, compact_interval=0)
+    reader = SQLiteCache(path, compact_interval=0)
+
+    writer.set('a', {'countryCode': 'IE'}, 60)
+    writer.set('b', {'countryCode': 'GB'}, -1)
+
+    assert json.loads(reader.get('a')) == {'countryCode': 'IE'}
+    assert reader.get('b') is None
+    assert reader.stats() == dict(hits=1, misses=1, evictions=0, size=2)
+
+    writer.compact()
+    assert len(reader) == 1
+
+    writer.close()
+    reader.close()
+
+def test_sqlite_cache_bounded(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), max_bytes=2000, compact_interval=0)
+
+    for i in range(100):
+        cache.set(str(i), {'payload': 'x' * 80}, 60 + i)
+    cache.compact()
+
+    assert 0 < len(cache) < 25
+    assert cache.get('99') is not None
+    assert cache.get('0') is None
+    cache.close()
+
+def test_client_sqlite_cache_survives_restart(tmp_path):
+    path = str(tmp_path / 'cache.db')
+
+    with StubServer() as server:
+        for _ in range(2):
+            cache = SQLiteCache(path)
+            with _client(server, cache=cache) as client:
+                client.asn_info(asn=ASN, lang=LANGUAGE)
+            cache.close()
+
+        assert len(server.requests) == 1
+
+def test_sqlite_cache_connections_bounded(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), compact_interval=0, pool_size=4)
+
+    with StubServer() as server, _client(server, cache=cache) as client:
+        for i in range(30):
+            client.ip_geolocation_many([f"10.0.{i}.{j}" for j in range(16)], workers=8)
+
+        # Every bulk call runs on new threads, which mustn't leave connections behind
+        assert cache.connections <= 4
+        assert client.ip_geolocation_many(['10.0.0.1'])[0]['params']['ip'] == '10.0.0.1'
+
+    cache.close()
+    assert cache.connections == 0
@@ -0,0 +1,49 @@
+import csv
+import json
+
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.cli import main
+
+
+def country(endpoint, params):
+    if params.get('ip') == '8.8.8.8':
+        return 400, {}
+    return 200, {'ip': params['ip'], 'country': {'isoAlpha2': 'AU'}}
+
+
+def test_csv_enrichment(tmp_path, monkeypatch):
+    source, output = tmp_path / 'visits.csv', tmp_path / 'out.csv'
+    source.write_text('address,page\n1.1.1.1,/\n8.8.8.8,/a\n1.1.1.1,/b\n')
+
+    with StubServer(country) as server:
+        monkeypatch.setattr(BigDataCloud, 'API_BASE_URL', server.url)
+        code = main(['country_by_ip', '-i', str(source), '-o', str(output), '-a', 'ip=address',
+                     '-s', 'lang=fr', '--fields', 'country.isoAlpha2', '--retries', '0'])
+
+        assert code == 0
+        assert len(server.requests) == 2
+
+    rows = list(csv.DictReader(output.open()))
+    assert [row['page'] for row in rows] == ['/', '/a', '/b']
+    assert [row['bigdatacloud.country.isoAlpha2'] for row in rows] == ['AU', '', 'AU']
+    assert rows[1]['bigdatacloud.error']
+
+def test_jsonl_resumes_from_checkpoint(tmp_path, monkeypatch):
+    source, output, checkpoint = tmp_path / 'ips.jsonl', tmp_path / 'out.jsonl', tmp_path / 'run.ckpt'
+    source.write_text(''.join(json.dumps({'ip': f"1.1.1.{i}"}) + '\n' for i in range(5)))
+    # A run interrupted after 2 rows, having written a third one since
+    output.write_text('{"ip": "1.1.1.0"}\n{"ip": "1.1.1.1"}\n{"ip": "1.1.1.2"}\n')
+    checkpoint.write_text(json.dumps({'rows': 2, 'offset': 36}))
+
+    with StubServer(country) as server:
+        monkeypatch.setattr(BigDataCloud, 'API_BASE_URL', server.url)
+        assert main(['country_by_ip', '-i', str(source), '-o', str(output), '--checkpoint', str(checkpoint)]) == 0
+
+        assert len(server.requests) == 3
+
+    rows = [json.loads(line) for line in output.open()]
+    assert [row['ip'] for row in rows] == [f"1.1.1.{i}" for i in range(5)]
+    assert rows[-1]['bigdatacloud']['country'] == {'isoAlpha2': 'AU'}
+    assert not checkpoint.exists()
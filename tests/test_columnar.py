@@ -0,0 +1,127 @@
+import math, time
+
+import pytest
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud, columnar
+from bigdatacloud.columnar import Column, REVERSE_GEOCODE_SCHEMA, ip_geolocation_columns, reverse_geocode_columns
+from bigdatacloud.scheduler import RequestScheduler
+
+
+def geolocation(endpoint, params):
+    if params.get('ip') == '8.8.8.8':
+        return 500, {}
+    if endpoint == 'reverse-geocode':
+        return 200, {'countryCode': 'NG', 'city': 'Lagos', 'postcode': None}
+    return 200, {'ip': params['ip'], 'confidence': 'high',
+                 'country': {'isoAlpha2': 'AU'},
+                 'location': {'latitude': -33.5, 'longitude': 151.25, 'city': 'Sydney'},
+                 'network': {'carriers': [{'asnNumeric': 13335}]}}
+
+
+def _client(server):
+    client = BigDataCloud(api_key='API_KEY', scheduler=RequestScheduler(retries=0))
+    client.API_BASE_URL = server.url
+    return client
+
+
+def test_ip_geolocation_columns():
+    ips = ['1.1.1.1', '8.8.8.8', '1.1.1.1']
+
+    with StubServer(geolocation) as server, _client(server) as client:
+        columns = ip_geolocation_columns(client, ips, full=True)
+
+        assert len(server.requests) == 2
+        assert columns['ip'] == ips
+        assert list(columns['latitude'])[::2] == [-33.5, -33.5]
+        assert math.isnan(columns['latitude'][1])
+        assert columns['countryCode'] == ['AU', None, 'AU']
+        assert columns['asn'] == [13335, None, 13335]
+        assert columns['error'][0] is None and columns['error'][1]
+
+def test_custom_schema_and_coordinates():
+    schema = (Column('city', 'city', 'str'), Column('postcode', 'postcode', 'str'))
+
+    with StubServer(geolocation) as server, _client(server) as client:
+        columns = reverse_geocode_columns(client, [(LATITUDE, LONGITUDE)], schema=schema)
+
+        assert set(columns) == {'latitude', 'longitude', 'city', 'postcode', 'error'}
+        assert list(columns['latitude']) == [float(LATITUDE)] and list(columns['longitude']) == [float(LONGITUDE)]
+        assert columns['city'] == ['Lagos'] and columns['postcode'] == [None]
+
+def test_numpy_format():
+    numpy = pytest.importorskip('numpy')
+
+    with StubServer(geolocation) as server, _client(server) as client:
+        columns = ip_geolocation_columns(client, numpy.array(['1.1.1.1', '8.8.8.8']), fmt='numpy', full=True)
+        assert columns['ip'].shape == (2,) and columns['asn'][0] == 13335 and numpy.isnan(columns['asn'][1])
+
+        columns = reverse_geocode_columns(client, [(LATITUDE, LONGITUDE)] * 2, fmt='numpy')
+        assert all(column.shape == (2,) for column in columns.values())
+        assert columns['latitude'].dtype == float and list(columns['city']) == ['Lagos', 'Lagos']
+
+def test_pandas_format():
+    pytest.importorskip('pandas')
+
+    with StubServer(geolocation) as server, _client(server) as client:
+        frame = ip_geolocation_columns(client, ['1.1.1.1', '8.8.8.8'], fmt='pandas')
+        assert frame['countryCode'][0] == 'AU' and frame['countryCode'].isna()[1] and frame['error'][1]
+
+        frame = reverse_geocode_columns(client, [(LATITUDE, LONGITUDE), ('6.5', '3.4')], fmt='pandas')
+        assert list(frame.columns[:2]) == ['latitude', 'longitude']
+        assert list(frame['longitude']) == [float(LONGITUDE), 3.4] and list(frame['city']) == ['Lagos', 'Lagos']
+
+def test_arrow_format():
+    pyarrow = pytest.importorskip('pyarrow')
+
+    with StubServer(geolocation) as server, _client(server) as client:
+        table = ip_geolocation_columns(client, ['1.1.1.1', '8.8.8.8'], fmt='arrow', full=True)
+        assert table.column('asn').to_pylist() == [13335, None]
+        assert table.schema.field('asn').type == pyarrow.int64()
+
+        table = reverse_geocode_columns(client, [(LATITUDE, LONGITUDE)], fmt='arrow')
+        assert table.schema.field('latitude').type == pyarrow.float64()
+        assert table.column('city').to_pylist() == ['Lagos'] and table.column('postcode').to_pylist() == [None]
+
+def test_non_numeric_values_are_nan():
+    def odd(endpoint, params):
+        return 200, {'countryCode': 'NG', 'city': 'Lagos', 'postcode': '100001', 'latitude': 'n/a'}
+
+    schema = REVERSE_GEOCODE_SCHEMA + (Column('reported', 'latitude', 'float'),)
+
+    with StubServer(odd) as server, _client(server) as client:
+        columns = reverse_geocode_columns(client, [(None, LONGITUDE), (LATITUDE, LONGITUDE)], schema=schema)
+
+        assert math.isnan(columns['latitude'][0]) and columns['error'][0]
+        assert columns['latitude'][1] == float(LATITUDE) and columns['city'] == [None, 'Lagos']
+        assert math.isnan(columns['reported'][1])
+
+def test_bounded_submissions(monkeypatch):
+    queued, most = [0], [0]
+
+    class Pool(columnar.ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            queued[0] += 1
+            most[0] = max(most[0], queued[0])
+            future = super().submit(*args, **kwargs)
+            future.add_done_callback(lambda _: queued.__setitem__(0, queued[0] - 1))
+            return future
+
+    class Client:
+        @staticmethod
+        def ip_geolocation(ip, lang):
+            time.sleep(.001)
+            return {'ip': ip}
+
+    monkeypatch.setattr(columnar, 'ThreadPoolExecutor', Pool)
+    columns = ip_geolocation_columns(Client(), [f"10.0.{i // 256}.{i % 256}" for i in range(500)], workers=2)
+
+    assert columns['error'] == [None] * 500
+    assert most[0] <= 8
+
+def test_unknown_format():
+    with StubServer() as server, _client(server) as client:
+        with pytest.raises(ValueError):
+            ip_geolocation_columns(client, ['1.1.1.1'], fmt='csv')
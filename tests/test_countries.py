@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from requests.exceptions import ConnectionError
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.aio import AsyncBigDataCloud
+from bigdatacloud.cache import MemoryCache
+from bigdatacloud.countries import CountrySnapshot
+from bigdatacloud.models import Country
+from bigdatacloud.scheduler import RequestScheduler
+
+
+COUNTRIES = {
+    'IE': {'isoAlpha2': 'IE', 'isoAlpha3': 'IRL', 'm49Code': 372, 'name': 'Ireland', 'callingCode': '353'},
+    'NG': {'isoAlpha2': 'NG', 'isoAlpha3': 'NGA', 'm49Code': 566, 'name': 'Nigeria', 'callingCode': '234'},
+}
+
+
+def country(endpoint, params):
+    found = COUNTRIES.get(params['code'])
+    return (200, dict(found, lang=params['localityLanguage'])) if found else (400, {})
+
+
+def _snapshot(server, tmp_path, lang='en'):
+    snapshot = CountrySnapshot(str(tmp_path))
+    with BigDataCloud(api_key='API_KEY') as client:
+        client.API_BASE_URL = server.url
+        assert snapshot.build(client, lang=lang, codes=['IE', 'NG', 'ZZ']) == 2
+    return snapshot
+
+
+def test_lookups_by_any_code(tmp_path):
+    with StubServer(country) as server:
+        snapshot = _snapshot(server, tmp_path)
+
+    assert snapshot.country_info(code='ie')['name'] == 'Ireland'
+    assert snapshot.country_info(code='NGA') == snapshot.country_info(code=566) == snapshot.country_info(code='566')
+    assert snapshot.country_info(code='ZZ') is None
+    assert snapshot.country_info(code='IE', lang='fr') is None
+    assert snapshot.expand({'ip': IP, 'country': {'isoAlpha2': 'IE'}})['country']['callingCode'] == '353'
+
+    snapshot.close()
+
+def test_rebuild_fetches_from_the_api(tmp_path):
+    with StubServer(country) as server:
+        snapshot = _snapshot(server, tmp_path)
+        table = snapshot._table('en')
+
+        with BigDataCloud(api_key='API_KEY', countries=snapshot, cache=MemoryCache()) as client:
+            client.API_BASE_URL = server.url
+            client.country_info(code='IE', lang='fr')
+            COUNTRIES['IE']['name'] = 'Éire'
+
+            try:
+                # Neither the snapshot nor the cached response answer
+                assert snapshot.build(client, codes=['IE']) == 1
+                assert snapshot.build(client, lang='fr', codes=['IE']) == 1
+            finally:
+                COUNTRIES['IE']['name'] = 'Ireland'
+
+        assert snapshot.country_info(code='IE')['name'] == snapshot.country_info(code='IE', lang='fr')['name'] == 'Éire'
+        # A reader still holding the previous table keeps reading it
+        assert b'Ireland' in table.get('IE')
+
+    snapshot.close()
+
+def test_failed_build_keeps_snapshot(tmp_path):
+    with StubServer(country) as server:
+        snapshot = _snapshot(server, tmp_path)
+
+    with BigDataCloud(api_key='API_KEY', scheduler=RequestScheduler(retries=0)) as client:
+        client.API_BASE_URL = 'http://127.0.0.1:9'
+        with pytest.raises(ConnectionError):
+            snapshot.build(client, codes=['IE', 'NG'])
+
+    assert snapshot.country_info(code='NG')['name'] == 'Nigeria'
+    snapshot.close()
+
+    with pytest.raises(TypeError):
+        snapshot.build(AsyncBigDataCloud(api_key='API_KEY'))
+
+def test_client_answers_locally(tmp_path):
+    with StubServer(country) as server:
+        snapshot = _snapshot(server, tmp_path)
+        # Loaded lazily by another instance, as after a restart
+        snapshot = CountrySnapshot(str(tmp_path))
+
+        with BigDataCloud(api_key='API_KEY', countries=snapshot, response_mode='model') as client:
+            client.API_BASE_URL = server.url
+            requests = len(server.requests)
+
+            assert client.country_info(code='IRL') == Country.from_response(dict(COUNTRIES['IE'], lang='en'))
+            assert client.country_info(code='IE', lang='fr').name == 'Ireland'
+            assert len(server.requests) == requests + 1
+
+        async def main():
+            async with AsyncBigDataCloud(api_key='API_KEY', countries=snapshot) as client:
+                return await client.country_info(code='NG')
+
+        assert asyncio.run(main())['name'] == 'Nigeria'
@@ -0,0 +1,86 @@
+import asyncio
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.aio import AsyncBigDataCloud
+from bigdatacloud.emails import EmailDomainCache, split_address
+from bigdatacloud.scheduler import RequestScheduler
+
+
+def verify(endpoint, params):
+    address = params['emailAddress']
+    domain = address.rpartition('@')[2]
+    if domain == 'down.com':
+        return 503, {}
+
+    disposable = domain == 'mailinator.com'
+    return 200, {'inputData': address, 'isValid': not disposable, 'isSyntaxValid': not address.startswith('x'),
+                 'isMailServerDefined': True, 'isKnownSpammerDomain': False, 'isDisposable': disposable}
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud(api_key='API_KEY', **kwargs)
+    client.API_BASE_URL = server.url
+    return client
+
+
+def test_split_address():
+    assert split_address(' Josiah.Akinremi@GMail.com. ') == ('Josiah.Akinremi@gmail.com', 'gmail.com')
+
+    for address in ('josiah', 'josiah@', '@gmail.com', 'jo..siah@gmail.com', '.josiah@gmail.com', 'josiah@gmail',
+                    'josiah@-gmail.com', 'josiah@gmail.c0m', 'jo siah@gmail.com', f"{'j' * 65}@gmail.com", None):
+        assert split_address(address) is None
+
+def test_one_call_per_domain():
+    with StubServer(verify) as server, _client(server) as client:
+        addresses = [EMAIL_ADDRESS, 'invalid', 'ada@gmail.com', 'Ada@GMAIL.com', 'temp@mailinator.com', 'bob@gmail.com']
+
+        results = client.email_verify_many(addresses)
+
+        assert sorted(params['emailAddress'] for _, params in server.requests) == [EMAIL_ADDRESS, 'temp@mailinator.com']
+        assert results[1]['isSyntaxValid'] is False
+        assert results[2] == {'inputData': 'ada@gmail.com', 'isSyntaxValid': True, 'isValid': True,
+                              'isMailServerDefined': True, 'isKnownSpammerDomain': False, 'isDisposable': False}
+        assert results[3]['inputData'] == 'Ada@gmail.com'
+        assert results[4]['isDisposable'] is True and results[4]['isValid'] is False
+
+        # Domains are remembered across batches
+        client.email_verify_many(['carol@gmail.com'])
+        assert len(server.requests) == 2
+        assert client.email_domains.stats()['size'] == 2
+
+def test_domain_known_from_first_valid_address():
+    with StubServer(verify) as server, _client(server) as client:
+        results = client.email_verify_many(['xavier@gmail.com', 'xena@gmail.com', 'ada@gmail.com', 'bob@gmail.com'])
+
+        assert len(server.requests) == 3
+        assert [result['isSyntaxValid'] for result in results] == [False, False, True, True]
+
+def test_failed_domains():
+    with StubServer(verify) as server, _client(server, scheduler=RequestScheduler(retries=0)) as client:
+        results = client.email_verify_many(['ada@down.com', 'bob@down.com', 'ada@gmail.com'])
+
+        assert isinstance(results[0], Exception) and results[1] is results[0]
+        assert results[2]['isValid'] is True
+        assert len(client.email_domains) == 1
+
+def test_expired_domains_are_verified_again():
+    with StubServer(verify) as server, _client(server, email_domains=EmailDomainCache(ttl=0)) as client:
+        client.email_verify_many(['ada@gmail.com'])
+        client.email_verify_many(['bob@gmail.com'])
+
+        assert len(server.requests) == 2
+
+def test_async_email_verify_many():
+    async def main():
+        async with AsyncBigDataCloud(api_key='API_KEY') as client:
+            client.API_BASE_URL = server.url
+            return await client.email_verify_many(['ada@gmail.com', 'bob@gmail.com', 'invalid'])
+
+    with StubServer(verify) as server:
+        results = asyncio.run(main())
+
+        assert len(server.requests) == 1
+        assert [result['isSyntaxValid'] for result in results] == [True, True, False]
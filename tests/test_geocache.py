@@ -0,0 +1,59 @@
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.geocache import ReverseGeocodeCache, distance
+
+
+def locality(endpoint, params):
+    return 200, {'latitude': float(params['latitude']), 'longitude': float(params['longitude']), 'city': 'Dublin'}
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud(api_key='API_KEY', **kwargs)
+    client.API_BASE_URL = server.url
+    return client
+
+
+def test_points_within_tolerance_hit():
+    with StubServer(locality) as server, _client(server) as client:
+        cache = ReverseGeocodeCache(client, tolerance=100)
+
+        first = cache.reverse_geocode('53.349804', '-6.260310')
+        # ~55m away, across a cell boundary or not
+        assert cache.reverse_geocode(53.3503, -6.2603) is first
+        # ~550m away
+        assert cache.reverse_geocode(53.3548, -6.2603) is not first
+
+        assert len(server.requests) == 2
+        assert cache.stats()['hits'] == 1
+
+def test_answers_stay_within_tolerance():
+    with StubServer(locality) as server, _client(server) as client:
+        cache = ReverseGeocodeCache(client, tolerance=50)
+        track = [(53.35 + i * 0.0001, -6.26 + i * 0.0001) for i in range(200)]
+
+        for (lat, lon), resp in zip(track, cache.reverse_geocode_many(track, workers=4)):
+            assert distance(lat, lon, resp['latitude'], resp['longitude']) <= 50
+
+        assert len(server.requests) < len(track) / 3
+        assert len(cache) == len(server.requests)
+
+def test_failed_lookups_are_not_cached():
+    with StubServer(lambda endpoint, params: (400, {})) as server, _client(server) as client:
+        cache = ReverseGeocodeCache(client)
+        results = cache.reverse_geocode_many([(10, 10), (10, 10)])
+
+        assert all(isinstance(result, Exception) for result in results)
+        assert len(cache) == 0
+
+def test_antimeridian_and_poles():
+    # Longitudes past 90 don't pass the client's coordinate validation
+    with StubServer(locality) as server, _client(server, validate=False) as client:
+        cache = ReverseGeocodeCache(client, tolerance=1000)
+
+        cache.reverse_geocode(0, 179.9999)
+        cache.reverse_geocode(0, -179.9999)
+        cache.reverse_geocode(89.99, 0)
+        cache.reverse_geocode(89.99, 0.5)
+
+        assert len(server.requests) == 2
@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.aio import AsyncBigDataCloud
+from bigdatacloud.cache import MemoryCache
+from bigdatacloud.scheduler import RequestScheduler
+from bigdatacloud.instrumentation import PrometheusHook, OpenTelemetryHook, prometheus_client, otel_trace
+
+
+def test_events_report_phases_and_cache():
+    events = []
+
+    with StubServer() as server, BigDataCloud(api_key='API_KEY', cache=MemoryCache(), hooks=[events.append]) as client:
+        client.API_BASE_URL = server.url
+        client.ip_geolocation(ip=IP)
+        client.ip_geolocation(ip=IP)
+
+    miss, hit = events
+    assert (miss.endpoint, miss.outcome, miss.cache_hit, miss.status, miss.attempts) == ('ip_geolocation', 'ok', False, 200, 1)
+    assert miss.bytes > 0 and miss.duration >= miss.response > 0
+    assert 'key' not in miss.params
+    assert set(miss.phases()) == {'wait', 'response', 'transfer', 'decode'}
+    assert (hit.outcome, hit.attempts) == ('hit', 0)
+
+def test_errors_and_failing_hooks():
+    events = []
+
+    def broken(event):
+        raise RuntimeError
+
+    responder = lambda endpoint, params: (503, {})
+    client = BigDataCloud(api_key='API_KEY', scheduler=RequestScheduler(retries=1, backoff=0), hooks=[broken, events.append])
+
+    with StubServer(responder) as server, client:
+        client.API_BASE_URL = server.url
+        with pytest.warns(RuntimeWarning):
+            try:
+                client.country_by_ip(ip=IP)
+            except Exception as e:
+                error = e
+
+    assert events[0].error is error
+    assert (events[0].outcome, events[0].status, events[0].attempts) == ('error', 503, 2)
+
+def test_async_events():
+    events = []
+
+    async def main(server):
+        async with AsyncBigDataCloud(api_key='API_KEY', hooks=[events.append]) as client:
+            client.API_BASE_URL = server.url
+            await asyncio.gather(*(client.ip_geolocation(ip=IP) for _ in range(3)))
+
+    with StubServer() as server:
+        asyncio.run(main(server))
+
+    assert sorted(event.outcome for event in events) == ['coalesced', 'coalesced', 'ok']
+    leader = next(event for event in events if event.outcome == 'ok')
+    assert leader.connect is not None and leader.status == 200
+
+def test_adapters_without_libraries():
+    with StubServer() as server:
+        prometheus, tracing = PrometheusHook(), OpenTelemetryHook()
+        with BigDataCloud(api_key='API_KEY', hooks=[prometheus, tracing]) as client:
+            client.API_BASE_URL = server.url
+            client.country_by_ip(ip=IP)
+
+    if prometheus_client is None:
+        assert 'bigdatacloud_requests_total{endpoint="country_by_ip",outcome="ok",status="200"} 1' in prometheus.render()
+    if otel_trace is None:
+        assert tracing.spans[0]['attributes']['http.response.status_code'] == 200
+
+def test_prometheus_hooks_are_independent():
+    with StubServer() as server:
+        first, second = PrometheusHook(), PrometheusHook()
+        with BigDataCloud(api_key='API_KEY', hooks=[first]) as client:
+            client.API_BASE_URL = server.url
+            client.country_by_ip(ip=IP)
+
+    assert 'endpoint="country_by_ip"' in first.render() and 'endpoint="country_by_ip"' not in second.render()
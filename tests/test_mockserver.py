@@ -0,0 +1,46 @@
+from . import *
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.endpoints import ENDPOINTS
+from bigdatacloud.scheduler import RequestScheduler
+from benchmarks.mockserver import MockServer, PAYLOADS
+from benchmarks.suite import compare
+
+
+CALLS = {
+    'ip': IP, 'lang': LANGUAGE, 'latitude': LATITUDE, 'longitude': LONGITUDE, 'user_agent_raw': USER_AGENT,
+    'utc_reference': UTC_REF, 'timezone_id': TIMEZONE_ID, 'code': CODE, 'asn': ASN, 'cidr': CIDR,
+    'number': NUMBER, 'country_code': COUNTRY_CODE, 'email_address': EMAIL_ADDRESS,
+}
+
+
+def test_every_endpoint_is_emulated():
+    assert set(PAYLOADS) == {endpoint.path for endpoint in ENDPOINTS.values()}
+
+    with MockServer() as server, BigDataCloud(api_key='API_KEY') as client:
+        client.API_BASE_URL = server.url
+
+        for name, endpoint in ENDPOINTS.items():
+            kwargs = {arg: CALLS[arg] for arg in endpoint.args if arg in CALLS}
+            assert getattr(client, name)(**kwargs), name
+
+        assert client.ip_geolocation_full(ip=IP)['network']['carriers'][0]['asnNumeric'] == 15169
+        assert len(list(client.iter_tor_exit_nodes(batch_size=500))) == 1200
+
+def test_injected_errors_are_retried():
+    scheduler = RequestScheduler(retries=10, backoff=0)
+
+    with MockServer(error_rate=.5, seed=1) as server, BigDataCloud(api_key='API_KEY', scheduler=scheduler) as client:
+        client.API_BASE_URL = server.url
+        results = client.country_by_ip_many([f"10.0.0.{i}" for i in range(20)])
+
+        assert all(result['country']['isoAlpha2'] for result in results)
+        assert server.requests > 20
+
+def test_compare_flags_regressions():
+    metric = lambda value, higher: {'value': value, 'unit': '', 'higher_is_better': higher}
+    baseline = {'metrics': {'latency': metric(10, False), 'throughput': metric(100, True)}}
+    results = {'metrics': {'latency': metric(12, False), 'throughput': metric(105, True), 'new': metric(1, True)}}
+
+    rows = {name: regressed for name, _, _, _, regressed in compare(results, baseline, threshold=.1)}
+    assert rows == {'latency': True, 'throughput': False}
@@ -0,0 +1,66 @@
+import json
+from typing import Optional
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.cache import MemoryCache, SQLiteCache
+from bigdatacloud.models import IPGeolocation, TimeZone
+from bigdatacloud.response import LazyResponse
+
+
+GEOLOCATION = {
+    'ip': IP,
+    'country': {'isoAlpha2': 'IE', 'name': 'Ireland'},
+    'location': {'continent': 'Europe', 'city': 'Dublin', 'latitude': 53.35, 
+                 'timeZone': {'ianaTimeId': 'Europe/Dublin'}},
+}
+
+
+def responder(endpoint, params):
+    if endpoint == 'timezone-by-ip':
+        return 200, {'ianaTimeId': 'Europe/Dublin', 'utcOffsetSeconds': 3600, 'isDaylightSavingTime': True}
+    return 200, GEOLOCATION
+
+
+def test_model_from_response():
+    raw = json.dumps(GEOLOCATION).encode()
+    first = IPGeolocation.from_response(raw)
+    second = IPGeolocation.from_response(LazyResponse(raw), keep_raw=True)
+
+    assert first == second
+    assert first.country_code == 'IE' and first.timezone_id == 'Europe/Dublin'
+    assert first.postcode is None
+    assert first.continent is second.continent
+    assert first.raw is None
+    assert second.raw == GEOLOCATION
+    assert not hasattr(first, '__dict__')
+
+def test_model_typing_and_hashing():
+    assert IPGeolocation.__annotations__['latitude'] == Optional[float]
+    assert set(IPGeolocation.__annotations__) == set(IPGeolocation.__slots__)
+
+    raw = json.dumps(GEOLOCATION).encode()
+    first, second = IPGeolocation.from_response(raw), IPGeolocation.from_response(GEOLOCATION)
+    assert len({first, second}) == 1 and {first: 'Dublin'}[second] == 'Dublin'
+    assert hash(first) != hash(IPGeolocation.from_response(dict(GEOLOCATION, ip='1.1.1.1')))
+
+def test_model_mode(tmp_path):
+    for cache in (MemoryCache(), SQLiteCache(str(tmp_path / 'cache.db'))):
+        with StubServer(responder) as server, BigDataCloud(api_key='API_KEY', response_mode='model', cache=cache) as client:
+            client.API_BASE_URL = server.url
+
+            for _ in range(2):
+                assert client.ip_geolocation(ip=IP).city == 'Dublin'
+                assert isinstance(client.timezone_by_ip(ip=IP, utc_reference=UTC_REF), TimeZone)
+
+            assert client.ip_geolocation(ip=IP, fields=['city', 'country_code']) == {'city': 'Dublin', 'country_code': 'IE'}
+            assert client.network_by_ip(ip=IP) == GEOLOCATION
+            # Time zones, holding the local time, aren't cached
+            assert len(server.requests) == 4
+            assert client.ip_geolocation(ip=IP).raw is None
+
+        with StubServer(responder) as server, BigDataCloud(api_key='API_KEY', response_mode='model', keep_raw=True) as client:
+            client.API_BASE_URL = server.url
+            assert client.ip_geolocation(ip=IP).raw == GEOLOCATION
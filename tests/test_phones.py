@@ -0,0 +1,85 @@
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.phones import PhoneValidator, normalize, REJECTED
+
+
+def valid(endpoint, params):
+    return 200, {'isValid': True, 'number': params['number'], 'countryCode': params.get('countryCode')}
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud(api_key='API_KEY', **kwargs)
+    client.API_BASE_URL = server.url
+    return client
+
+
+def test_normalize():
+    for written in ('+353 87 123 4567', '00353871234567', '(087) 123-4567', '087.123.4567'):
+        phone = normalize(written, 'ie')
+        assert phone.e164 == '+353871234567'
+        assert (phone.calling_code, phone.national, phone.country_code) == ('353', '871234567', 'IE')
+
+    assert normalize('+1 (415) 555-2671').country_code == 'US'
+    # Calling code without a numbering plan: E.164's limits only
+    assert normalize('+372 5123 4567').e164 == '+37251234567'
+    # Alpha-3 and numeric country codes
+    assert normalize('0871234567', 'IRL').e164 == normalize('0871234567', '372').e164 == '+353871234567'
+    # Non-geographic ranges
+    assert normalize('0300 123 4567', 'gb').e164 == '+443001234567'
+    assert normalize('+1 015 555 2671').e164 == '+10155552671'
+    # National number of a country without a numbering plan, left to the api
+    assert normalize('621 123 456', 'lu') == (None, None, '621123456', 'LU')
+
+def test_normalize_rejects():
+    assert normalize('087944252611', 'ie') is None       # too long
+    assert normalize('0871234', 'ie') is None            # too short
+    assert normalize('871234567') is None                # national, with no country
+    assert normalize('12', 'lu') is None                 # shorter than any number
+    assert normalize('+999 1234567') is None             # unassigned calling code
+    assert normalize('+372 1234567890123') is None       # over 15 digits
+    assert normalize('my phone number', 'ie') is None
+
+def test_only_plausible_distinct_numbers_are_sent():
+    with StubServer(valid) as server, _client(server) as client:
+        validator = PhoneValidator(client)
+        numbers = ['+353 87 123 4567', '087 123 4567', '00353871234567', '12', '+353 87 765 4321', '087 123 4567']
+
+        results = validator.validate_many(numbers, 'ie', workers=4)
+
+        assert results[3] == REJECTED
+        assert results[0] is results[1] is results[2] is results[5]
+        assert sorted(params['number'] for _, params in server.requests) == ['0871234567', '0877654321']
+        assert validator.stats() == {'rejected': 1, 'hits': 0, 'misses': 2, 'size': 2}
+
+        # Cached by E.164, however the number is written next
+        assert validator.validate('+353871234567') is results[0]
+        assert len(server.requests) == 2
+
+def test_numbers_without_plan_are_sent_internationally():
+    with StubServer(valid) as server, _client(server) as client:
+        resp = PhoneValidator(client).validate('+372 5123 4567')
+
+        assert resp['number'] == '0037251234567'
+        assert resp['countryCode'] == 'GB'
+
+def test_national_numbers_without_plan_are_sent_as_written():
+    with StubServer(valid) as server, _client(server) as client:
+        validator = PhoneValidator(client)
+        results = validator.validate_many(['621 123 456', '621123456', '621123457'], 'lu')
+
+        assert results[0] is results[1] and results[0]['countryCode'] == 'LU'
+        assert sorted(params['number'] for _, params in server.requests) == ['621123456', '621123457']
+        assert validator.validate('621123456', 'lu') is results[0]
+
+def test_validate_by_ip():
+    with StubServer(valid) as server, _client(server) as client:
+        validator = PhoneValidator(client)
+
+        assert validator.validate_by_ip('abc', '37.228.253.39') == REJECTED
+        validator.validate_by_ip('087 123 4567', '37.228.253.39')
+        validator.validate_by_ip('0871234567', '37.228.253.39')
+        # Written internationally, the number doesn't depend on the IP address
+        validator.validate_by_ip('+353 87 123 4567', '37.228.253.39')
+
+        assert [endpoint for endpoint, _ in server.requests] == ['phone-number-validate-by-ip', 'phone-number-validate']
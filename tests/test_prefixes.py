@@ -0,0 +1,106 @@
+import asyncio
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.aio import AsyncBigDataCloud
+from bigdatacloud.prefixes import PrefixIndex
+
+
+PREFIXES = [
+    {'bgpPrefix': '8.0.0.0/8', 'asn': 3356, 'registry': 'ARIN', 'isBogon': False},
+    {'bgpPrefix': '8.8.8.0/24', 'asn': 15169, 'registry': 'ARIN', 'isBogon': False},
+    {'bgpPrefix': '8.8.0.0/16', 'asn': 3356, 'registry': 'ARIN', 'isBogon': False},
+    {'bgpPrefix': '10.0.0.0/8', 'asn': 0, 'registry': 'IANA', 'isBogon': True},
+    {'bgpPrefix': '37.228.224.0/19', 'asn': 15502, 'registry': 'RIPE', 'isBogon': False},
+]
+
+
+NODES = [{'ip': f'185.220.101.{i}'} for i in range(7)]
+
+
+def paged(endpoint, params):
+    offset, size = int(params['offset']), int(params['batchSize'])
+
+    if endpoint == 'tor-exit-nodes-list':
+        return 200, {'total': len(NODES), 'nodes': NODES[offset:offset + size]}
+    return 200, {'total': len(PREFIXES), 'prefixes': PREFIXES[offset:offset + size]}
+
+
+def _index(**kwargs):
+    with StubServer(paged) as server, BigDataCloud(api_key='API_KEY') as client:
+        client.API_BASE_URL = server.url
+        return PrefixIndex.build(client, batch_size=2, **kwargs), server
+
+
+def test_most_specific_prefix():
+    index, server = _index()
+
+    assert len(server.requests) == 3
+    assert len(index) == 5
+    assert index.network_by_ip('8.8.8.8')['asn'] == 15169
+    assert index.network_by_ip('8.8.9.1')['bgpPrefix'] == '8.8.0.0/16'
+    assert index.network_by_ip('8.9.0.1')['bgpPrefix'] == '8.0.0.0/8'
+    assert index.network_by_ip(IP)['bgpPrefixLastAddress'] == '37.228.255.255'
+    assert index.network_by_ip('9.0.0.1') is None
+
+def test_update_and_remove():
+    index, _ = _index()
+
+    index.update([{'bgpPrefix': '8.8.4.0/24', 'asn': 15169, 'registry': 'ARIN', 'isBogon': False}])
+    index.remove(['8.8.8.0/24'])
+
+    assert index.network_by_ip('8.8.4.4')['asn'] == 15169
+    assert index.network_by_ip('8.8.8.8')['bgpPrefix'] == '8.8.0.0/16'
+    assert len(index._snapshot.metadata) == 4
+
+def test_refresh_drops_withdrawn_prefixes():
+    index, _ = _index()
+    withdrawn = PREFIXES.pop(1)
+    PREFIXES[0] = dict(PREFIXES[0], asn=174)
+
+    try:
+        with StubServer(paged) as server, BigDataCloud(api_key='API_KEY') as client:
+            client.API_BASE_URL = server.url
+            assert index.refresh(client, batch_size=2) == {'added': 0, 'changed': 1, 'withdrawn': 1}
+    finally:
+        PREFIXES[0] = dict(PREFIXES[0], asn=3356)
+        PREFIXES.insert(1, withdrawn)
+
+    assert len(index) == 4
+    assert index.network_by_ip('8.8.8.8')['bgpPrefix'] == '8.8.0.0/16'
+    assert index.network_by_ip('8.9.0.1')['asn'] == 174
+
+def test_save_and_load(tmp_path):
+    index, _ = _index()
+    path = str(tmp_path / 'prefixes.idx')
+    index.save(path)
+
+    loaded = PrefixIndex.load(path)
+
+    assert len(loaded) == len(index)
+    assert loaded.network_by_ip('10.1.2.3') == index.network_by_ip('10.1.2.3')
+    assert '1.1.1.1' not in loaded
+
+def test_iter_pages():
+    with StubServer(paged) as server, BigDataCloud(api_key='API_KEY') as client:
+        client.API_BASE_URL = server.url
+
+        assert list(client.iter_prefixes(batch_size=2)) == PREFIXES
+        assert list(client.iter_tor_exit_nodes(batch_size=3, offset=2)) == NODES[2:]
+
+        # Abandoning a walk early stops fetching
+        nodes = client.iter_tor_exit_nodes(batch_size=2)
+        next(nodes)
+        nodes.close()
+        assert len(server.requests) <= 3 + 2 + 2
+
+def test_async_iter_pages():
+    async def walk(server):
+        async with AsyncBigDataCloud(api_key='API_KEY') as client:
+            client.API_BASE_URL = server.url
+            return [node async for node in client.iter_tor_exit_nodes(batch_size=2, offset=1)]
+
+    with StubServer(paged) as server:
+        assert asyncio.run(walk(server)) == NODES[1:]
@@ -0,0 +1,75 @@
+import json, asyncio
+
+import pytest
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.aio import AsyncBigDataCloud
+from bigdatacloud.cache import SQLiteCache
+from bigdatacloud.response import LazyResponse, project
+
+
+GEOLOCATION = {
+    'ip': IP,
+    'country': {'isoAlpha2': 'IE', 'name': 'Ireland'},
+    'location': {'city': 'Dublin', 'timeZone': {'ianaTimeId': 'Europe/Dublin'}},
+}
+
+
+def geolocation(endpoint, params):
+    return 200, GEOLOCATION
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud(api_key='API_KEY', **kwargs)
+    client.API_BASE_URL = server.url
+    return client
+
+
+def test_lazy_response():
+    resp = LazyResponse(json.dumps(GEOLOCATION).encode())
+
+    assert not resp.decoded
+    assert resp['country']['isoAlpha2'] == 'IE'
+    assert resp.decoded
+    assert dict(resp) == GEOLOCATION
+
+def test_project():
+    fields = ['ip', 'country.isoAlpha2', 'location.timeZone.ianaTimeId', 'location.postcode', 'ip.nope']
+
+    assert project(GEOLOCATION, fields) == {
+        'ip': IP,
+        'country.isoAlpha2': 'IE',
+        'location.timeZone.ianaTimeId': 'Europe/Dublin',
+    }
+
+def test_lazy_mode_keeps_raw_bytes(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+
+    with StubServer(geolocation) as server, _client(server, response_mode='lazy', cache=cache) as client:
+        first = client.ip_geolocation_full(ip=IP)
+        second = client.ip_geolocation_full(ip=IP)
+
+        assert isinstance(first, LazyResponse) and isinstance(second, LazyResponse)
+        assert json.loads(first.raw) == GEOLOCATION
+        assert second.raw == first.raw
+        assert len(server.requests) == 1
+    cache.close()
+
+def test_fields_option():
+    with StubServer(geolocation) as server, _client(server) as client:
+        assert client.ip_geolocation(ip=IP, fields=['country.isoAlpha2']) == {'country.isoAlpha2': 'IE'}
+
+    async def main(server):
+        async with AsyncBigDataCloud(api_key='API_KEY', response_mode='lazy') as client:
+            client.API_BASE_URL = server.url
+            return await client.ip_geolocation(ip=IP, fields=['location.city'])
+
+    with StubServer(geolocation) as server:
+        assert asyncio.run(main(server)) == {'location.city': 'Dublin'}
+
+def test_invalid_response_mode():
+    with pytest.raises(ValueError):
+        BigDataCloud(api_key='API_KEY', response_mode='xml')
@@ -0,0 +1,95 @@
+import time, asyncio, threading
+
+import pytest
+
+from . import *
+from .stub import StubServer, echo
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.aio import AsyncBigDataCloud
+from bigdatacloud.scheduler import RequestScheduler, TokenBucket, _parse_retry_after
+from requests.exceptions import HTTPError, ReadTimeout
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud(api_key='API_KEY', scheduler=RequestScheduler(**kwargs))
+    client.API_BASE_URL = server.url
+    return client
+
+
+def flaky(*statuses):
+    """Responds with each of `statuses` in turn, then succeeds"""
+
+    remaining = list(statuses)
+    lock = threading.Lock()
+
+    def responder(endpoint, params):
+        with lock:
+            if remaining:
+                return remaining.pop(0), {}
+        return echo(endpoint, params)
+
+    return responder
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=100, burst=2)
+    waits = [bucket.reserve() for _ in range(4)]
+
+    assert waits[:2] == [0, 0]
+    assert 0.015 < waits[3] <= 0.02
+
+    bucket.pause(1)
+    assert bucket.reserve() > 0.99
+
+def test_retry_delay():
+    scheduler = RequestScheduler(retries=2, backoff=1)
+
+    assert scheduler.retry_delay(0, 404) is None
+    assert 0.5 <= scheduler.retry_delay(0, 503) <= 1
+    assert 1 <= scheduler.retry_delay(1) <= 2
+    assert scheduler.retry_delay(2, 503) is None
+    assert scheduler.retry_delay(0, 429, '7') == 7
+    assert _parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+    assert _parse_retry_after('soon') is None
+
+def test_retries_throttled_requests():
+    with StubServer(flaky(429, 503)) as server, _client(server, backoff=0.01) as client:
+        resp = client.ip_geolocation(ip=IP)
+
+        assert resp['endpoint'] == 'ip-geolocation'
+        assert len(server.requests) == 3
+
+def test_gives_up_after_retries():
+    with StubServer(flaky(503, 503, 503)) as server, _client(server, retries=1, backoff=0.01) as client:
+        with pytest.raises(HTTPError):
+            client.ip_geolocation(ip=IP)
+
+        assert len(server.requests) == 2
+
+def test_read_timeout():
+    def slow(endpoint, params):
+        time.sleep(0.3)
+        return echo(endpoint, params)
+
+    with StubServer(slow) as server, _client(server, read_timeout=0.05, retries=0) as client:
+        with pytest.raises(ReadTimeout):
+            client.client_ip()
+
+def test_rate_limit():
+    with StubServer() as server, _client(server, rate=50, burst=1) as client:
+        start = time.monotonic()
+        client.ip_geolocation_many([f'1.1.1.{i}' for i in range(11)], workers=4)
+
+        assert time.monotonic() - start >= 0.19
+
+def test_async_retries():
+    async def main(server):
+        scheduler = RequestScheduler(backoff=0.01)
+        async with AsyncBigDataCloud(api_key='API_KEY', scheduler=scheduler) as client:
+            client.API_BASE_URL = server.url
+            return await client.client_ip()
+
+    with StubServer(flaky(429, 500)) as server:
+        assert asyncio.run(main(server))['endpoint'] == 'client-ip'
+        assert len(server.requests) == 3
@@ -0,0 +1,76 @@
+import time, asyncio, threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from . import *
+from .stub import StubServer, echo
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.aio import AsyncBigDataCloud
+from bigdatacloud.scheduler import RequestScheduler
+from bigdatacloud.singleflight import SingleFlight
+
+
+def slow(endpoint, params):
+    time.sleep(0.2)
+    return echo(endpoint, params)
+
+
+def test_single_flight_shares_errors():
+    flights = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise KeyError('boom')
+
+    def follow():
+        started.wait()
+        return flights.do('k', fail)
+
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(flights.do, 'k', fail), pool.submit(follow)]
+
+    for future in futures:
+        with pytest.raises(KeyError):
+            future.result()
+    assert flights.coalesced == 1
+
+def test_threads_coalesce():
+    with StubServer(slow) as server, BigDataCloud(api_key='API_KEY') as client:
+        client.API_BASE_URL = server.url
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: client.ip_geolocation(ip=IP), range(8)))
+
+        assert len(server.requests) == 1
+        assert client.coalesced == 7
+        assert all(r == results[0] for r in results)
+
+def test_threads_coalesce_disabled():
+    with StubServer(slow) as server, BigDataCloud(api_key='API_KEY', coalesce=False) as client:
+        client.API_BASE_URL = server.url
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(lambda _: client.ip_geolocation(ip=IP), range(4)))
+
+        assert len(server.requests) == 4
+        assert client.coalesced == 0
+
+def test_async_coalesce():
+    async def main(server):
+        scheduler = RequestScheduler(retries=0)
+        async with AsyncBigDataCloud(api_key='API_KEY', scheduler=scheduler) as client:
+            client.API_BASE_URL = server.url
+            results = await asyncio.gather(*(client.client_ip() for _ in range(5)), return_exceptions=True)
+            return client, results
+
+    with StubServer(lambda e, p: (503, {})) as server:
+        client, results = asyncio.run(main(server))
+
+        assert len(server.requests) == 1
+        assert client.coalesced == 4
+        assert len(results) == 5
+        assert all(isinstance(r, Exception) for r in results)
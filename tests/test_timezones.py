@@ -0,0 +1,53 @@
+import pytest
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.timezones import LocalTimeZones
+
+
+# 2021-01-15T00:00:00Z, in the southern hemisphere's summer
+SUMMER = 1610668800
+# 2021-04-03T16:00:00Z, Sydney leaving daylight saving time
+TRANSITION = 1617465600
+
+
+def test_timezone_info():
+    zones = LocalTimeZones()
+    info = zones.timezone_info(timezone_id=TIMEZONE_ID, utc_reference=SUMMER)
+
+    assert info['utcOffsetSeconds'] == 39600 and info['utcOffset'] == '+11:00'
+    assert info['isDaylightSavingTime'] and info['effectiveTimeZoneShort'] == 'AEDT'
+    assert info['localTime'] == '2021-01-15T11:00:00' and info['utcTime'] == '2021-01-15T00:00:00'
+    # Full zone names aren't in the tz database
+    assert 'effectiveTimeZoneFull' not in info
+
+    with pytest.raises(ValueError):
+        zones.timezone_info(timezone_id='Mars/Olympus_Mons')
+
+def test_remembers_zones_of_ips():
+    responder = lambda endpoint, params: (200, {'ianaTimeId': TIMEZONE_ID, 'utcOffsetSeconds': 39600})
+
+    with StubServer(responder) as server, BigDataCloud(api_key='API_KEY', coalesce=False) as client:
+        client.API_BASE_URL = server.url
+        zones = LocalTimeZones(client)
+
+        zones.timezone_by_ip(ip=IP, utc_reference=SUMMER)
+        local = zones.timezone_by_ip(ip=IP, utc_reference=TRANSITION)
+        zones.timezone_by_location(latitude=LATITUDE, longitude=LONGITUDE)
+
+        assert len(server.requests) == 2
+        assert local['utcOffsetSeconds'] == 36000 and not local['isDaylightSavingTime']
+        assert zones.stats() == {'hits': 1, 'misses': 2, 'size': 2}
+
+def test_vectorized_conversion_across_transition():
+    zones = LocalTimeZones()
+    timestamps = range(TRANSITION - 7200, TRANSITION + 7200, 600)
+
+    offsets = zones.utc_offsets(TIMEZONE_ID, timestamps)
+
+    assert offsets == [zones.timezone_info(timezone_id=TIMEZONE_ID, utc_reference=ts)['utcOffsetSeconds']
+                       for ts in timestamps]
+    assert offsets[0] == 39600 and offsets[-1] == 36000
+    assert zones.local_times('UTC', [SUMMER]) == [SUMMER]
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.scheduler import RequestScheduler
+from bigdatacloud.tor import TorExitNodes
+
+
+NODES = [f"185.220.{i // 256}.{i % 256}" for i in range(2500)] + ['2a0b:f4c2::1', 'not an ip']
+
+
+def pages(nodes):
+    def responder(endpoint, params):
+        offset, size = int(params['offset']), int(params['batchSize'])
+        return 200, {'nodes': [{'ip': ip, 'country': 'DE'} for ip in nodes[offset:offset + size]], 'total': len(nodes)}
+    return responder
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud(api_key='API_KEY', **kwargs)
+    client.API_BASE_URL = server.url
+    return client
+
+
+def test_refresh_and_lookups():
+    with StubServer(pages(NODES)) as server, _client(server) as client:
+        tor = TorExitNodes(client)
+
+        assert not tor.is_tor_exit('185.220.0.1')
+        assert tor.refresh() == 2501
+        assert len(server.requests) == 3
+
+        assert tor.is_tor_exit('185.220.0.1') and '185.220.9.195' in tor
+        assert tor.is_tor_exit('2a0b:f4c2:0:0::1')
+        assert not tor.is_tor_exit('185.220.9.196') and not tor.is_tor_exit('::1') and not tor.is_tor_exit('0.0.0.1')
+
+        with pytest.raises(ValueError):
+            tor.is_tor_exit('185.220.0')
+
+def test_snapshot_answers_cold_starts(tmp_path):
+    path = str(tmp_path / 'tor.bdc')
+
+    with StubServer(pages(NODES)) as server, _client(server) as client:
+        TorExitNodes(client, snapshot=path).refresh()
+
+        cold = TorExitNodes(None, snapshot=path)
+        assert len(cold) == 2501
+        assert cold.is_tor_exit('185.220.0.1') and cold.is_tor_exit('2a0b:f4c2::1')
+        assert cold.stats()['age'] < 60
+
+def test_background_refresh_swaps_atomically():
+    nodes = list(NODES[:10])
+
+    with StubServer(pages(nodes)) as server, _client(server) as client:
+        with TorExitNodes(client, interval=.05, batch_size=5) as tor:
+            deadline = time.time() + 5
+            while not tor.refreshes and time.time() < deadline:
+                time.sleep(.01)
+            assert tor.is_tor_exit('185.220.0.9')
+
+            nodes[9] = '10.0.0.1'
+            refreshes = tor.refreshes
+            while tor.refreshes == refreshes and time.time() < deadline:
+                # Either the previous set or the new one, never a partial one
+                assert len(tor) == 10
+            assert tor.is_tor_exit('10.0.0.1') and not tor.is_tor_exit('185.220.0.9')
+
+def test_failed_refresh_keeps_previous_set():
+    with StubServer(pages(NODES[:10])) as server, _client(server, scheduler=RequestScheduler(retries=0)) as client:
+        tor = TorExitNodes(client)
+        tor.refresh()
+        tor.updated = 0
+        client.API_BASE_URL = 'http://127.0.0.1:9'
+
+        with pytest.warns(RuntimeWarning), tor:
+            deadline = time.time() + 10
+            while not tor.failures and time.time() < deadline:
+                time.sleep(.01)
+
+        assert tor.failures == 1 and len(tor) == 10
@@ -0,0 +1,36 @@
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud(api_key='API_KEY', **kwargs)
+    client.API_BASE_URL = server.url
+    return client
+
+
+def test_connection_is_reused():
+    with StubServer() as server, _client(server) as client:
+        for _ in range(5):
+            client.ip_geolocation(ip=IP, lang=LANGUAGE)
+
+        assert len(server.requests) == 5
+        assert server.connections == 1
+
+def test_close_releases_pool():
+    with StubServer() as server:
+        client = _client(server)
+        client.client_ip()
+        client.close()
+
+        # A closed session opens a fresh connection on the next call
+        client.client_ip()
+        assert server.connections == 2
+
+def test_query_params():
+    with StubServer() as server, _client(server) as client:
+        resp = client.ip_geolocation(ip=IP, lang=LANGUAGE)
+
+        assert resp['endpoint'] == 'ip-geolocation'
+        assert resp['params'] == {'ip': IP, 'localityLanguage': LANGUAGE, 'key': 'API_KEY'}
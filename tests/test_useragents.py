@@ -0,0 +1,92 @@
+import asyncio
+
+from . import *
+from .stub import StubServer
+
+from bigdatacloud import BigDataCloud
+from bigdatacloud.aio import AsyncBigDataCloud
+from bigdatacloud.scheduler import RequestScheduler
+from bigdatacloud.useragents import UserAgentCache, ua_key
+
+
+def parse(endpoint, params):
+    user_agent = params['userAgentRaw']
+    if user_agent == 'broken':
+        return 503, {}
+    return 200, {'userAgentRaw': user_agent, 'device': 'iPhone' if 'iPhone' in user_agent else 'Other'}
+
+
+def _client(server, **kwargs):
+    client = BigDataCloud(api_key='API_KEY', **kwargs)
+    client.API_BASE_URL = server.url
+    return client
+
+
+def test_ua_key():
+    assert len(ua_key(USER_AGENT)) == len(ua_key(USER_AGENT * 100)) == 16
+    assert ua_key(USER_AGENT) != ua_key(USER_AGENT + ' ') != ua_key(USER_AGENT.lower())
+
+    cache = UserAgentCache()
+    cache.put(USER_AGENT, {})
+    assert list(cache._data) == [ua_key(USER_AGENT)]
+
+def test_batch_is_keyed_like_the_cache():
+    cache = UserAgentCache()
+    batch = cache.batch([USER_AGENT, 'curl/7.68.0', USER_AGENT[:50] + USER_AGENT[50:], 'curl/7.68.0'])
+
+    assert batch.unseen == [USER_AGENT, 'curl/7.68.0']
+    results = batch.results([{'device': 'iPhone'}, {'device': 'Other'}])
+    assert [r['device'] for r in results] == ['iPhone', 'Other', 'iPhone', 'Other']
+
+    batch = cache.batch(['curl/7.68.0', 'python-requests/2.25', USER_AGENT])
+    assert batch.unseen == ['python-requests/2.25']
+    assert cache.stats() == {'hits': 2, 'misses': 3, 'size': 2}
+
+def test_only_unseen_user_agents_are_sent():
+    with StubServer(parse) as server, _client(server) as client:
+        results = client.user_agent_info_many([USER_AGENT, 'curl/7.68.0', USER_AGENT, USER_AGENT])
+
+        assert len(server.requests) == 2
+        assert results[0] is results[2] is results[3]
+        assert results[0]['device'] == 'iPhone'
+
+        results = client.user_agent_info_many(['curl/7.68.0', 'python-requests/2.25'])
+        assert len(server.requests) == 3
+        assert results[0]['device'] == 'Other'
+        assert client.user_agents.stats() == {'hits': 1, 'misses': 3, 'size': 3}
+
+def test_failures_are_not_cached():
+    with StubServer(parse) as server, _client(server, scheduler=RequestScheduler(retries=0)) as client:
+        results = client.user_agent_info_many(['broken', 'curl/7.68.0'])
+
+        assert isinstance(results[0], Exception)
+        assert 'broken' not in client.user_agents and 'curl/7.68.0' in client.user_agents
+
+def test_lru_is_bounded():
+    with StubServer(parse) as server, _client(server, user_agents=UserAgentCache(maxsize=2)) as client:
+        client.user_agent_info_many(['a/1', 'b/1', 'c/1'])
+
+        assert len(client.user_agents) == 2
+        assert 'a/1' not in client.user_agents
+
+def test_prewarm(tmp_path):
+    path = tmp_path / 'agents.txt'
+    path.write_text(f"{USER_AGENT}\n\ncurl/7.68.0\n{USER_AGENT}\n")
+
+    with StubServer(parse) as server, _client(server) as client:
+        assert client.prewarm_user_agents(str(path)) == 2
+        client.user_agent_info_many([USER_AGENT, 'curl/7.68.0'])
+
+        assert len(server.requests) == 2
+
+def test_async_user_agent_info_many():
+    async def main():
+        async with AsyncBigDataCloud(api_key='API_KEY') as client:
+            client.API_BASE_URL = server.url
+            return await client.user_agent_info_many([USER_AGENT, USER_AGENT, 'curl/7.68.0'])
+
+    with StubServer(parse) as server:
+        results = asyncio.run(main())
+
+        assert len(server.requests) == 2
+        assert results[0] is results[1]